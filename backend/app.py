@@ -1,7 +1,16 @@
 # backend/app.py
+import os
+
 from flask import Flask
 from flask_cors import CORS
 from app.config import Config
+from app.db import init_db
+from app.utils.auth import init_auth
+from app.utils.cache import init_cache
+from app.utils.json_provider import init_json
+from app.utils.sql_profiler import init_sql_profiler
+from app.utils.metrics import init_metrics
+from app.services.password_hasher import init_password_hasher
 from app.controllers.user_controller import user_bp
 from app.controllers.game_session_controller import game_session_bp
 from app.controllers.question_controller import question_bp
@@ -9,13 +18,23 @@ from app.controllers.category_controller import category_bp
 from app.controllers.round_controller import round_bp
 from app.controllers.stats_controller import stats_bp
 from app.controllers.admin_controller import admin_bp
+from app.controllers.health_controller import health_bp
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    init_auth(app)
+    
+    # Pooled database connections shared by every DAO
+    init_db(app)
+    init_json(app)
+    init_sql_profiler(app)
+    init_metrics(app)
+    init_cache(app)
+    init_password_hasher(app)
     
     # Enable CORS for all routes
-    CORS(app)
+    CORS(app, expose_headers=["X-Next-Cursor", "Link"])
     
     # Register blueprints
     app.register_blueprint(user_bp, url_prefix="/api/users")
@@ -25,9 +44,16 @@ def create_app():
     app.register_blueprint(round_bp, url_prefix="/api/rounds")
     app.register_blueprint(stats_bp, url_prefix="/api/stats")
     app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    app.register_blueprint(health_bp)
     
     return app
 
+# Development server only; production runs gunicorn -c gunicorn.conf.py asgi:app
 if __name__ == "__main__":
-    app = create_app()
-    app.run(debug=True)
\ No newline at end of file
+    import uvicorn
+
+    # Debug mode, which also lets .env's placeholder SECRET_KEY through
+    os.environ.setdefault("FLASK_DEBUG", "1")
+    # Served through the ASGI app, like production, for the game event stream
+    # Open event streams would otherwise hold up every reload
+    uvicorn.run("asgi:app", port=5000, reload=True, timeout_graceful_shutdown=1)
\ No newline at end of file
@@ -0,0 +1,230 @@
+# app/asgi.py
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app.async_db import AsyncDatabase
+from app.dao import async_dao
+from app.services import events
+from app.utils import metrics
+
+
+async def _rounds_by_game(db, s_id):
+    return await async_dao.get_rounds_by_game_session(db, s_id), 200
+
+
+async def _current_round(db, s_id):
+    current_round = await async_dao.get_current_round(db, s_id)
+    if not current_round:
+        return {"error": "No active round found"}, 404
+    return current_round, 200
+
+
+async def _round_status(db, s_id, round_number):
+    round_status = await async_dao.get_round_status(db, s_id, round_number)
+    if not round_status:
+        return {"error": "Round not found"}, 404
+    return round_status, 200
+
+
+async def _user_stats(db, user_id):
+    try:
+        stats = await async_dao.get_user_stats(db, user_id)
+    except Exception as e:
+        return {"error": "Failed to retrieve user stats"}, 500
+    if stats:
+        return stats, 200
+    return {"error": "User not found"}, 404
+
+
+async def _user_active_games(db, user_id):
+    try:
+        return await async_dao.get_user_active_games(db, user_id), 200
+    except Exception as e:
+        return {"error": "Failed to retrieve active games"}, 500
+
+
+# Read-heavy GET endpoints answered on the event loop, with the Flask
+# endpoint each one stands in for. Everything else except the game event
+# stream, including writes, goes through the Flask app.
+ASYNC_ROUTES = [
+    (re.compile(r"^/api/rounds/game/(\d+)$"), _rounds_by_game, "round.get_rounds_by_game"),
+    (re.compile(r"^/api/rounds/games/(\d+)/current-round$"), _current_round, "round.get_current_round"),
+    (re.compile(r"^/api/rounds/games/(\d+)/current-round-quiz$"), _current_round,
+     "round.get_current_round_for_quiz"),
+    (re.compile(r"^/api/rounds/games/(\d+)/round/(\d+)/status$"), _round_status, "round.get_round_status"),
+    (re.compile(r"^/api/stats/user/(\d+)$"), _user_stats, "stats.get_user_stats"),
+    (re.compile(r"^/api/games/user/(\d+)/active$"), _user_active_games, "game_session.get_user_active_games"),
+]
+
+EVENTS_ROUTE = re.compile(r"^/api/games/(\d+)/events$")
+
+
+class _PooledWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs the WSGI app thread_sensitive, which puts every request
+    # of the process on one shared thread
+    _run_wsgi_app = WsgiToAsgiInstance.__dict__["run_wsgi_app"].func
+
+    def __init__(self, wsgi_application, duplicate_header_limit, executor):
+        super().__init__(wsgi_application, duplicate_header_limit)
+        self.run_wsgi_app = sync_to_async(self._run_wsgi_app, thread_sensitive=False, executor=executor)
+
+
+class PooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi that runs requests concurrently on its own thread pool"""
+
+    def __init__(self, wsgi_application, max_workers):
+        super().__init__(wsgi_application)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        await _PooledWsgiInstance(self.wsgi_application, self.duplicate_header_limit, self.executor)(
+            scope, receive, send
+        )
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+
+class QuizMastersASGI:
+    """ASGI entry point for production serving.
+
+    GET requests matching ``ASYNC_ROUTES`` are served by the asyncpg DAO
+    layer, so one process can hold many requests in flight while they wait
+    on Postgres. All other requests run the Flask app, unchanged, on a pool
+    of ``ASGI_WSGI_THREADS`` threads, so slow requests do not hold up the
+    others.
+
+    Flask's request hooks never see the async requests, so their HTTP
+    metrics are recorded here under the labels of the Flask route they
+    replace. Their statements run on asyncpg and are not timed.
+
+    Game event streams (server-sent events: round_started, player_submitted,
+    round_complete and game_ended) are served here as well, straight from
+    the event broker, so an open stream holds no thread and no connection.
+    """
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi = PooledWsgiToAsgi(flask_app, flask_app.config["ASGI_WSGI_THREADS"])
+        self.db = AsyncDatabase(flask_app.config, flask_app.logger)
+        self.metrics_enabled = flask_app.config["METRICS_ENABLED"]
+        self.labels = {
+            endpoint: (endpoint.split(".", 1)[0], next(flask_app.url_map.iter_rules(endpoint)).rule)
+            for _, _, endpoint in ASYNC_ROUTES
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] == "http" and scope["method"] == "GET":
+            match = EVENTS_ROUTE.match(scope["path"])
+            if match:
+                await self._stream_events(scope, receive, send, int(match.group(1)))
+                return
+            for pattern, handler, endpoint in ASYNC_ROUTES:
+                match = pattern.match(scope["path"])
+                if match:
+                    args = [int(group) for group in match.groups()]
+                    if self.metrics_enabled:
+                        body, status = await self._observed(handler, endpoint, args)
+                    else:
+                        body, status = await handler(self.db, *args)
+                    await self._send_json(scope, send, body, status)
+                    return
+
+        await self.wsgi(scope, receive, send)
+
+    async def _observed(self, handler, endpoint, args):
+        blueprint, route = self.labels[endpoint]
+        metrics.registry.ensure_flusher()
+        metrics.http_requests_in_flight.inc((blueprint,))
+        started = time.perf_counter()
+        try:
+            body, status = await handler(self.db, *args)
+        except Exception as e:
+            metrics.http_request_exceptions.inc((blueprint, route, type(e).__name__))
+            raise
+        finally:
+            metrics.http_requests_in_flight.dec((blueprint,))
+        metrics.http_request_duration.observe(time.perf_counter() - started, (blueprint, route, "GET"))
+        metrics.http_requests.inc((blueprint, route, "GET", str(status)))
+        return body, status
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.db.close()
+                self.wsgi.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _stream_events(self, scope, receive, send, s_id):
+        with self.flask_app.app_context():
+            subscription = events.subscribe(s_id, asyncio.get_running_loop())
+        heartbeat = self.flask_app.config["EVENTS_HEARTBEAT_SECONDS"]
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        try:
+            headers = [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ] + _cors_headers(scope)
+            await send({"type": "http.response.start", "status": 200, "headers": headers})
+            await send({"type": "http.response.body", "body": b"retry: 3000\n\n", "more_body": True})
+            while True:
+                message = asyncio.ensure_future(subscription.get(heartbeat))
+                await asyncio.wait((message, disconnected), return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    message.cancel()
+                    return
+                message = message.result()
+                if message is None:
+                    await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+                    continue
+                event, data = message
+                await send({
+                    "type": "http.response.body",
+                    "body": events.format_event(event, data).encode("utf-8"),
+                    "more_body": event != "game_ended",
+                })
+                if event == "game_ended":
+                    return
+        finally:
+            disconnected.cancel()
+            subscription.close()
+
+    async def _wait_for_disconnect(self, receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _send_json(self, scope, send, body, status):
+        # Same encoder as jsonify, so dates and decimals render identically
+        payload = (self.flask_app.json.dumps(body, separators=(",", ":")) + "\n").encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(payload)).encode("latin-1")),
+        ] + _cors_headers(scope)
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+
+def _cors_headers(scope):
+    # Match flask-cors, which reflects the request origin
+    for name, value in scope.get("headers", ()):
+        if name == b"origin":
+            return [(b"access-control-allow-origin", value), (b"vary", b"Origin")]
+    return []
+
+
+def create_asgi_app(flask_app):
+    return QuizMastersASGI(flask_app)
@@ -0,0 +1,61 @@
+# app/async_db.py
+import asyncio
+
+import asyncpg
+
+from app.utils.json_provider import dumps, loads
+
+
+async def _init_connection(conn):
+    # Decode json/jsonb like psycopg2 does so async and sync DAOs return the same shapes
+    for type_name in ("json", "jsonb"):
+        await conn.set_type_codec(type_name, encoder=dumps, decoder=loads, schema="pg_catalog")
+
+
+class AsyncDatabase:
+    """asyncpg pool used by the ASGI serving mode.
+
+    The pool is created lazily inside the running event loop, since asyncpg
+    pools are bound to the loop that created them.
+    """
+
+    def __init__(self, config, logger):
+        self.config = config
+        # The Flask app's logger; async requests run outside its app context
+        self.logger = logger
+        self._pool = None
+        self._lock = None
+
+    async def get_pool(self):
+        if self._pool is None:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        host=self.config["DB_HOST"],
+                        port=int(self.config["DB_PORT"]),
+                        database=self.config["DB_NAME"],
+                        user=self.config["DB_USER"],
+                        password=self.config["DB_PASSWORD"],
+                        min_size=1,
+                        max_size=self.config["ASYNC_DB_POOL_MAX_SIZE"],
+                        timeout=self.config["DB_POOL_TIMEOUT"],
+                        init=_init_connection,
+                    )
+        return self._pool
+
+    async def fetch(self, query, *args):
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetch(query, *args)
+
+    async def fetchrow(self, query, *args):
+        pool = await self.get_pool()
+        async with pool.acquire() as conn:
+            return await conn.fetchrow(query, *args)
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
@@ -9,3 +9,113 @@ class Config:
     DB_NAME = os.getenv("DB_NAME")
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
+
+    # Signing key and lifetime of login tokens. Outside debug mode the app
+    # refuses to start when SECRET_KEY is unset or a known placeholder
+    SECRET_KEY = os.getenv("SECRET_KEY", "")
+    JWT_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", "1440"))
+
+    # bcrypt runs on a bounded worker pool ("process" or "thread"); calls
+    # beyond workers + queue size are rejected with 429
+    PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+    PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))
+    PASSWORD_HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+    PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "process")
+
+    # Connection pool
+    DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+    DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+    DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+    DB_POOL_MAX_LIFETIME = float(os.getenv("DB_POOL_MAX_LIFETIME", "3600"))
+
+    # asyncpg pool size per process for the ASGI serving mode (asgi.py)
+    ASYNC_DB_POOL_MAX_SIZE = int(os.getenv("ASYNC_DB_POOL_MAX_SIZE", "20"))
+    # Threads running the Flask app under ASGI; like gunicorn's threads, keep
+    # them at or below DB_POOL_MAX_SIZE
+    ASGI_WSGI_THREADS = int(os.getenv("ASGI_WSGI_THREADS", str(DB_POOL_MAX_SIZE)))
+
+    # Seconds before a category's sampling index is reloaded from the database
+    QUESTION_INDEX_TTL = float(os.getenv("QUESTION_INDEX_TTL", "300"))
+
+    # Question packs prepared per game at creation: categories prefetched,
+    # questions per category, worker threads, and LRU/idle eviction limits
+    QUESTION_PACK_CATEGORIES = int(os.getenv("QUESTION_PACK_CATEGORIES", "8"))
+    QUESTION_PACK_SIZE = int(os.getenv("QUESTION_PACK_SIZE", "6"))
+    QUESTION_PACK_WORKERS = int(os.getenv("QUESTION_PACK_WORKERS", "2"))
+    QUESTION_PACK_MAX_GAMES = int(os.getenv("QUESTION_PACK_MAX_GAMES", "1000"))
+    QUESTION_PACK_TTL = float(os.getenv("QUESTION_PACK_TTL", "3600"))
+
+    # Page size of keyset-paginated list endpoints (?limit=), and its cap
+    PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+    PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+    # Rows per multi-row INSERT when bulk importing questions
+    QUESTION_IMPORT_BATCH_SIZE = int(os.getenv("QUESTION_IMPORT_BATCH_SIZE", "1000"))
+
+    # Leaderboards: seconds rows are cached, minimum seconds between
+    # materialized view refreshes, and maximum age of the views
+    LEADERBOARD_CACHE_TTL = float(os.getenv("LEADERBOARD_CACHE_TTL", "30"))
+    LEADERBOARD_REFRESH_INTERVAL = float(os.getenv("LEADERBOARD_REFRESH_INTERVAL", "10"))
+    LEADERBOARD_MAX_STALENESS = float(os.getenv("LEADERBOARD_MAX_STALENESS", "300"))
+
+    # Random-opponent matchmaking: seconds a player stays queued after their
+    # last activity, XP per skill bucket (0 disables bucketing), cap on
+    # concurrent ongoing games per player (0 disables) and random picks
+    # tried per bucket
+    MATCHMAKING_ACTIVE_TTL = float(os.getenv("MATCHMAKING_ACTIVE_TTL", "900"))
+    MATCHMAKING_XP_BUCKET = int(os.getenv("MATCHMAKING_XP_BUCKET", "500"))
+    MATCHMAKING_MAX_ACTIVE_GAMES = int(os.getenv("MATCHMAKING_MAX_ACTIVE_GAMES", "10"))
+    MATCHMAKING_MAX_ATTEMPTS = int(os.getenv("MATCHMAKING_MAX_ATTEMPTS", "5"))
+
+    # Game event push: "local" (in-process broker, single process) or
+    # "postgres" (LISTEN/NOTIFY fan-out to every worker)
+    EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "local")
+    EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    EVENTS_MAX_PENDING = int(os.getenv("EVENTS_MAX_PENDING", "100"))
+
+    # API response encoder: "orjson" (fast, ISO 8601 dates) or "default"
+    # (Flask's stdlib encoder, HTTP dates)
+    JSON_PROVIDER = os.getenv("JSON_PROVIDER", "orjson")
+
+    # SQL instrumentation: per-request query count, DB time and connection
+    # wait in a Server-Timing header and at /api/admin/sql-profile (last
+    # SQL_PROFILE_HISTORY requests, SQL_PROFILE_SLOWEST statements each).
+    # Statements slower than SQL_SLOW_QUERY_MS are logged (0 disables), and
+    # so is any statement shape run more than SQL_N_PLUS_ONE_THRESHOLD times
+    # in one request (0 disables). Off by default, since the header reaches
+    # every client and reveals query counts and timings
+    SQL_PROFILING = os.getenv("SQL_PROFILING", "false").lower() in ("1", "true", "yes")
+    SQL_SLOW_QUERY_MS = float(os.getenv("SQL_SLOW_QUERY_MS", "200"))
+    SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "10"))
+    SQL_PROFILE_HISTORY = int(os.getenv("SQL_PROFILE_HISTORY", "200"))
+    SQL_PROFILE_SLOWEST = int(os.getenv("SQL_PROFILE_SLOWEST", "5"))
+
+    # Prometheus metrics at /metrics. Under gunicorn set METRICS_MULTIPROC_DIR
+    # to a directory private to this deployment: every worker writes its
+    # samples there each METRICS_FLUSH_INTERVAL seconds and a scrape of any
+    # worker reports the sum over all of them. Under the ASGI entry point the
+    # async routes report HTTP metrics but not db_query_duration_seconds
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+    METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+    # Read cache: "memory" (per process) or "sqlite" (shared by every
+    # process on the host). Namespaces map to (ttl seconds, max entries).
+    CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+    CACHE_SQLITE_PATH = os.getenv("CACHE_SQLITE_PATH", "/tmp/quiz_masters_cache.sqlite3")
+
+    # Seconds a game's snapshot (session, rounds, scores) is cached; 0 disables.
+    # Off by default with the memory backend, whose invalidations other
+    # workers never see
+    GAME_SNAPSHOT_CACHE_TTL = float(os.getenv(
+        "GAME_SNAPSHOT_CACHE_TTL", "5" if CACHE_BACKEND == "sqlite" else "0"
+    ))
+    CACHE_NAMESPACES = {
+        "categories": (300, 256),
+        "users": (60, 10000),
+        "user_banned": (30, 10000),
+        "auth_state": (30, 10000),
+        "questions": (600, 20000),
+        "game_snapshot": (GAME_SNAPSHOT_CACHE_TTL, 5000),
+    }
@@ -1,6 +1,12 @@
 # app/controllers/admin_controller.py
 from flask import Blueprint, jsonify, request
-from app.dao import admin_dao, question_dao
+from app.dao import admin_dao, question_dao, user_dao
+from app.db import get_pool_stats, transactional
+from app.utils.cache import cache
+from app.utils.export import EXPORT_FORMATS, encode_rows, export_response
+from app.utils import sql_profiler
+from app.utils.pagination import InvalidCursorError, page_args, paginated_response
+from app.services import leaderboards, matchmaking, password_hasher, question_packs, question_bank
 
 admin_bp = Blueprint("admin", __name__)
 
@@ -16,6 +22,8 @@ def ban_user():
     
     try:
         admin_dao.ban_user(user_id, ban_reason)
+        matchmaking.remove(user_id)
+        leaderboards.request_refresh()
         return jsonify({"message": "User banned successfully"}), 200
     except Exception as e:
         return jsonify({"error": "Failed to ban user or user already banned"}), 500
@@ -31,25 +39,32 @@ def unban_user():
     
     try:
         admin_dao.unban_user(user_id)
+        leaderboards.request_refresh()
         return jsonify({"message": "User unbanned successfully"}), 200
     except Exception as e:
         return jsonify({"error": "Failed to unban user"}), 500
 
 @admin_bp.route("/users/banned", methods=["GET"])
 def get_banned_users():
-    """Get list of all banned users"""
+    """Get banned users, one page at a time (?limit=, ?cursor=)"""
     try:
-        banned_users = admin_dao.get_banned_users()
-        return jsonify(banned_users), 200
+        limit, after_id = page_args()
+        banned_users = admin_dao.get_banned_users(limit, after_id)
+        return paginated_response(banned_users, limit, lambda user: user["u_id"]), 200
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to retrieve banned users"}), 500
 
 @admin_bp.route("/questions/pending", methods=["GET"])
 def get_pending_questions():
-    """Get all questions pending approval"""
+    """Get questions pending approval, one page at a time (?limit=, ?cursor=)"""
     try:
-        questions = question_dao.get_pending_questions()
-        return jsonify(questions), 200
+        limit, after_id = page_args()
+        questions = question_dao.get_pending_questions(limit, after_id)
+        return paginated_response(questions, limit, lambda question: question["q_id"]), 200
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to retrieve pending questions"}), 500
 
@@ -72,16 +87,140 @@ def confirm_question(q_id):
     except Exception as e:
         return jsonify({"error": "Failed to update question status"}), 500
 
+@admin_bp.route("/questions/import", methods=["POST"])
+@transactional
+def import_questions():
+    """Bulk import questions from a CSV or JSONL upload.
+
+    Send the file as multipart field "file" or as the raw request body.
+    ?format=csv|jsonl (default from the file name), ?confirm=true to publish
+    the questions immediately instead of queueing them for review.
+    """
+    upload = request.files.get("file")
+    stream = upload.stream if upload else request.stream
+    fmt = request.args.get("format")
+    if not fmt:
+        filename = upload.filename if upload else ""
+        fmt = "csv" if filename.endswith(".csv") else "jsonl"
+    confirmed = request.args.get("confirm", "false").lower() == "true"
+
+    try:
+        result = question_bank.import_questions(stream, fmt, confirmed)
+        return jsonify(result), 201 if result["imported"] else 400
+    except question_bank.ImportFormatError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": "Failed to import questions"}), 500
+
+@admin_bp.route("/questions/bulk-review", methods=["POST"])
+@transactional
+def bulk_review_questions():
+    """Confirm or reject pending questions by id list or by category.
+
+    Body: {"status": true|false, "q_ids": [...]} or {"status": ..., "c_id": n}
+    or {"status": ..., "all_pending": true}.
+    """
+    data = request.get_json()
+    status = data.get("status")
+    q_ids = data.get("q_ids")
+    c_id = data.get("c_id")
+
+    if not isinstance(status, bool):
+        return jsonify({"error": "status must be boolean"}), 400
+    if q_ids is None and c_id is None and not data.get("all_pending"):
+        return jsonify({"error": "q_ids, c_id or all_pending is required"}), 400
+    if q_ids is not None and (not isinstance(q_ids, list) or not all(isinstance(q_id, int) for q_id in q_ids)):
+        return jsonify({"error": "q_ids must be a list of integers"}), 400
+
+    try:
+        changed = question_dao.bulk_review_questions(status, q_ids, c_id)
+        return jsonify({
+            "message": "Questions confirmed" if status else "Questions rejected and deleted",
+            "count": len(changed),
+            "q_ids": [row[0] for row in changed]
+        }), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to update question status"}), 500
+
+@admin_bp.route("/questions/export", methods=["GET"])
+def export_questions():
+    """Stream the question bank as CSV or JSONL.
+
+    ?format=csv|jsonl (default jsonl), ?status=confirmed|pending|all
+    (default all), ?c_id= to limit to one category.
+    """
+    fmt = request.args.get("format", "jsonl")
+    status = {"confirmed": True, "pending": False, "all": None}.get(request.args.get("status", "all"), "invalid")
+    c_id = request.args.get("c_id", type=int)
+
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    if status == "invalid":
+        return jsonify({"error": "status must be confirmed, pending or all"}), 400
+
+    return export_response(question_bank.export_questions(fmt, status, c_id), fmt, "questions")
+
+@admin_bp.route("/users/export", methods=["GET"])
+def export_users():
+    """Stream all users as CSV or JSONL (?format=csv|jsonl, default jsonl)"""
+    fmt = request.args.get("format", "jsonl")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    rows = encode_rows(fmt, user_dao.USER_EXPORT_COLUMNS, user_dao.iter_users())
+    return export_response(rows, fmt, "users")
+
+@admin_bp.route("/users/banned/export", methods=["GET"])
+def export_banned_users():
+    """Stream all banned users as CSV or JSONL (?format=csv|jsonl, default jsonl)"""
+    fmt = request.args.get("format", "jsonl")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "format must be csv or jsonl"}), 400
+    rows = encode_rows(fmt, admin_dao.BANNED_USER_EXPORT_COLUMNS, admin_dao.iter_banned_users())
+    return export_response(rows, fmt, "banned_users")
+
 @admin_bp.route("/dashboard", methods=["GET"])
 def get_admin_dashboard():
     """Get admin dashboard summary"""
     try:
-        pending_questions = len(question_dao.get_pending_questions())
-        banned_users = len(admin_dao.get_banned_users())
+        category_counts = question_dao.get_question_counts_by_category()
+        pending_questions = sum(c["pending_question_count"] for c in category_counts)
+        banned_users = admin_dao.get_banned_user_count()
         
         return jsonify({
             "pending_questions_count": pending_questions,
-            "banned_users_count": banned_users
+            "banned_users_count": banned_users,
+            "category_question_counts": category_counts
         }), 200
     except Exception as e:
-        return jsonify({"error": "Failed to retrieve dashboard data"}), 500
\ No newline at end of file
+        return jsonify({"error": "Failed to retrieve dashboard data"}), 500
+
+@admin_bp.route("/db-pool", methods=["GET"])
+def get_db_pool_stats():
+    """Get database connection pool metrics"""
+    return jsonify(get_pool_stats()), 200
+
+@admin_bp.route("/cache", methods=["GET"])
+def get_cache_stats():
+    """Get read cache hit/miss counters per namespace"""
+    return jsonify(cache.stats()), 200
+
+@admin_bp.route("/password-hasher", methods=["GET"])
+def get_password_hasher_stats():
+    """Get password hashing queue depth and latency"""
+    return jsonify(password_hasher.get_stats()), 200
+
+@admin_bp.route("/matchmaking", methods=["GET"])
+def get_matchmaking_stats():
+    """Get matchmaking queue size, match counts and queue wait times"""
+    return jsonify(matchmaking.get_stats()), 200
+
+@admin_bp.route("/question-packs", methods=["GET"])
+def get_question_pack_stats():
+    """Get question pack hit ratio, prefetch and eviction counters"""
+    return jsonify(question_packs.get_stats()), 200
+
+@admin_bp.route("/sql-profile", methods=["GET"])
+def get_sql_profile():
+    """Get per-endpoint SQL counts and timings and the most recent request profiles (?limit=)"""
+    limit = request.args.get("limit", 50, type=int)
+    return jsonify(sql_profiler.get_stats(limit)), 200
@@ -1,10 +1,13 @@
 # app/controllers/game_session_controller.py
 from flask import Blueprint, request, jsonify
 from app.dao import game_session_dao, user_dao
+from app.db import transactional, after_commit
+from app.services import matchmaking, question_packs
 
 game_session_bp = Blueprint("game_session", __name__)
 
 @game_session_bp.route("/start/random", methods=["POST"])
+@transactional
 def start_game_with_random_opponent():
     data = request.get_json()
     player1_id = data.get("player1_id")
@@ -20,15 +23,21 @@ def start_game_with_random_opponent():
         return jsonify({"error": "Player is banned"}), 403
 
     try:
-        session_id = game_session_dao.create_game_session_with_random_opponent(player1_id)
-        if session_id:
-            return jsonify({"session_id": session_id}), 201
-        else:
+        if not matchmaking.has_capacity(player1_id):
+            return jsonify({"error": "Too many active games"}), 409
+
+        opponent_id = matchmaking.find_opponent(player1_id)
+        if not opponent_id:
             return jsonify({"error": "No available opponent found"}), 404
+
+        session_id = game_session_dao.create_game_session(player1_id, opponent_id)
+        after_commit(lambda: question_packs.prefetch(session_id))
+        return jsonify({"session_id": session_id}), 201
     except Exception as e:
         return jsonify({"error": "Failed to create game session"}), 500
 
 @game_session_bp.route("/start/selected", methods=["POST"])
+@transactional
 def start_game_with_selected_opponent():
     data = request.get_json()
     player1_id = data.get("player1_id")
@@ -47,6 +56,7 @@ def start_game_with_selected_opponent():
     try:
         session_id = game_session_dao.create_game_session_with_selected_opponent(player1_id, opponent_username)
         if session_id:
+            after_commit(lambda: question_packs.prefetch(session_id))
             return jsonify({"session_id": session_id}), 201
         else:
             return jsonify({"error": "Opponent not found or unavailable"}), 404
@@ -0,0 +1,41 @@
+# app/controllers/health_controller.py
+import os
+from flask import Blueprint, current_app, jsonify
+from app.db import get_db_connection, get_pool_stats
+from app.utils.metrics import metrics_response
+
+health_bp = Blueprint("health", __name__)
+
+@health_bp.route("/healthz", methods=["GET"])
+def liveness():
+    """Liveness probe: the worker is up and serving requests"""
+    return jsonify({"status": "ok", "pid": os.getpid()}), 200
+
+@health_bp.route("/readyz", methods=["GET"])
+def readiness():
+    """Readiness probe: this worker can check out a pooled connection and reach Postgres"""
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1;")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+    except Exception as e:
+        return jsonify({
+            "status": "unavailable",
+            "pid": os.getpid(),
+            "error": str(e),
+            "db_pool": get_pool_stats()
+        }), 503
+
+    return jsonify({"status": "ready", "pid": os.getpid(), "db_pool": get_pool_stats()}), 200
+
+@health_bp.route("/metrics", methods=["GET"])
+def metrics():
+    """Prometheus scrape endpoint: request, database, pool and gameplay metrics"""
+    if not current_app.config["METRICS_ENABLED"]:
+        return jsonify({"error": "Metrics are disabled"}), 404
+    return metrics_response()
@@ -1,6 +1,8 @@
 # app/controllers/question_controller.py
 from flask import Blueprint, jsonify, request
 from app.dao import question_dao, category_dao
+from app.services import question_sampler
+from app.utils.pagination import InvalidCursorError, page_args, paginated_response
 
 question_bp = Blueprint("question", __name__)
 
@@ -50,7 +52,7 @@ def get_questions_by_category(c_id):
         return jsonify({"error": "limit must be between 1 and 20"}), 400
     
     try:
-        questions = question_dao.get_confirmed_questions_by_category(c_id, limit)
+        questions = question_sampler.sample_questions(c_id, limit)
         # Remove correct_answer for client
         for question in questions:
             question.pop("correct_answer", None)
@@ -63,8 +65,11 @@ def get_questions_by_category(c_id):
 def get_pending_questions():
     """Admin endpoint to get questions awaiting confirmation"""
     try:
-        questions = question_dao.get_pending_questions()
-        return jsonify(questions), 200
+        limit, after_id = page_args()
+        questions = question_dao.get_pending_questions(limit, after_id)
+        return paginated_response(questions, limit, lambda question: question["q_id"]), 200
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": "Failed to retrieve pending questions"}), 500
 
@@ -91,11 +96,19 @@ def confirm_question(q_id):
 def get_confirmed_question_count(c_id):
     """Get count of confirmed questions in a category"""
     try:
-        questions = question_dao.get_confirmed_questions_by_category(c_id, 1000)  # Get all
-        count = len(questions)
+        count = question_dao.get_confirmed_question_count(c_id)
         return jsonify({"category_id": c_id, "confirmed_question_count": count}), 200
     except Exception as e:
         return jsonify({"error": "Failed to get question count"}), 500
+
+@question_bp.route("/counts", methods=["GET"])
+def get_question_counts():
+    """Get confirmed and pending question counts for every category"""
+    try:
+        counts = question_dao.get_question_counts_by_category()
+        return jsonify(counts), 200
+    except Exception as e:
+        return jsonify({"error": "Failed to get question counts"}), 500
     
 # Add this to your question_controller.py
 @question_bp.route("/category/<int:c_id>/random/<int:count>", methods=["GET"])
@@ -109,15 +122,10 @@ def get_random_questions_by_category(c_id, count):
         return jsonify({"error": "Category not found"}), 404
     
     try:
-        # Get more questions than needed and randomly select
-        all_questions = question_dao.get_confirmed_questions_by_category(c_id, 100)
-        
-        if len(all_questions) < count:
-            return jsonify({"error": f"Not enough questions in category. Available: {len(all_questions)}"}), 400
+        selected_questions = question_sampler.sample_questions(c_id, count)
         
-        # Randomly select the requested count
-        import random
-        selected_questions = random.sample(all_questions, count)
+        if len(selected_questions) < count:
+            return jsonify({"error": f"Not enough questions in category. Available: {len(selected_questions)}"}), 400
         
         # Include correct_answer for quiz gameplay (but remove in other endpoints)
         return jsonify(selected_questions), 200
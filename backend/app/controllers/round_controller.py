@@ -1,18 +1,34 @@
 from flask import Blueprint, jsonify, request
-from app.dao import round_dao, question_dao, game_session_dao
+from app.dao import round_dao, game_session_dao
+from app.db import transactional, after_commit
+from app.services import question_packs, leaderboards, events, matchmaking
+from app.utils import metrics
 
 round_bp = Blueprint("round", __name__)
 
+def latest_round(s_id):
+    """Most recent round of a game, taken from its snapshot when that is
+    cached and otherwise read on its own"""
+    if not game_session_dao.is_snapshot_cached():
+        return round_dao.get_current_round(s_id)
+    game = game_session_dao.get_game_snapshot(s_id)
+    if not game or not game['rounds']:
+        return None
+    return game['rounds'][-1]
+
 @round_bp.route("/game/<int:s_id>", methods=["GET"])
 def get_rounds_by_game(s_id):
     """Get all rounds for a specific game session"""
     try:
-        rounds = round_dao.get_rounds_by_game_session(s_id)
-        return jsonify(rounds), 200
+        if not game_session_dao.is_snapshot_cached():
+            return jsonify(round_dao.get_rounds_by_game_session(s_id)), 200
+        game = game_session_dao.get_game_snapshot(s_id)
+        return jsonify(game['rounds'] if game else []), 200
     except Exception as e:
         return jsonify({"error": "Failed to fetch rounds"}), 500
 
 @round_bp.route("/game/<int:s_id>/start", methods=["POST"])
+@transactional
 def start_new_round(s_id):
     """Start a new round (legacy endpoint)"""
     data = request.get_json()
@@ -39,18 +55,25 @@ def start_new_round(s_id):
         
         round_number = round_count + 1
         
-        # Get 3 random questions from the selected category
-        all_questions = question_dao.get_confirmed_questions_by_category(selected_category, 100)
-        if len(all_questions) < 3:
+        # 3 questions from the game's prefetched pack, never repeating earlier rounds
+        selected_questions = question_packs.take(s_id, selected_category, 3)
+        if len(selected_questions) < 3:
             return jsonify({"error": "Not enough questions in category"}), 400
         
-        import random
-        selected_questions = random.sample(all_questions, 3)
-        
         # Create the round with questions
         round_id = round_dao.create_round_with_questions(
             s_id, round_number, user_id, selected_category, selected_questions
         )
+        if round_id is None:
+            return jsonify({"error": "Round already started"}), 409
+        events.publish(s_id, "round_started", {
+            "r_id": round_id,
+            "round_number": round_number,
+            "category_id": selected_category,
+            "started_by": user_id
+        })
+        after_commit(lambda: question_packs.consume(s_id, selected_category, selected_questions))
+        after_commit(metrics.rounds_started.inc)
         
         return jsonify({
             "r_id": round_id,
@@ -63,6 +86,7 @@ def start_new_round(s_id):
         return jsonify({"error": "Failed to start round"}), 500
 
 @round_bp.route("/games/<int:s_id>/quiz-round", methods=["POST"])
+@transactional
 def start_quiz_round(s_id):
     """Start a new quiz round with 3 questions"""
     data = request.get_json()
@@ -89,18 +113,25 @@ def start_quiz_round(s_id):
         
         round_number = round_count + 1
         
-        # Get 3 random questions from the selected category
-        all_questions = question_dao.get_confirmed_questions_by_category(selected_category, 100)
-        if len(all_questions) < 3:
+        # 3 questions from the game's prefetched pack, never repeating earlier rounds
+        selected_questions = question_packs.take(s_id, selected_category, 3)
+        if len(selected_questions) < 3:
             return jsonify({"error": "Not enough questions in category"}), 400
         
-        import random
-        selected_questions = random.sample(all_questions, 3)
-        
         # Create the round with questions
         round_id = round_dao.create_round_with_questions(
             s_id, round_number, user_id, selected_category, selected_questions
         )
+        if round_id is None:
+            return jsonify({"error": "Round already started"}), 409
+        events.publish(s_id, "round_started", {
+            "r_id": round_id,
+            "round_number": round_number,
+            "category_id": selected_category,
+            "started_by": user_id
+        })
+        after_commit(lambda: question_packs.consume(s_id, selected_category, selected_questions))
+        after_commit(metrics.rounds_started.inc)
         
         return jsonify({
             "r_id": round_id,
@@ -115,6 +146,7 @@ def start_quiz_round(s_id):
 
 
 @round_bp.route("/games/<int:s_id>/quiz-answers", methods=["POST"])
+@transactional
 def submit_quiz_answers(s_id):
     """Submit quiz answers for current round"""
     data = request.get_json()
@@ -142,13 +174,19 @@ def submit_quiz_answers(s_id):
         correct_answers = sum(1 for answer in answers if answer.get('is_correct', False))
         
         # Submit answers to round
-        round_dao.submit_player_quiz_answers(
+        submitted = round_dao.submit_player_quiz_answers(
             s_id=s_id,
             round_number=current_round,
             player_id=user_id,
             answers=answers,
             score=correct_answers
         )
+        if not submitted:
+            return jsonify({"error": "Answers already submitted for this round"}), 409
+        
+        events.publish(s_id, "player_submitted", {"round_number": current_round, "user_id": user_id})
+        matchmaking.touch(user_id)
+        after_commit(metrics.answers_submitted.inc)
         
         # CORRECTED LOGIC: Check if the entire game is complete (all 5 rounds have both players' answers)
         game_is_complete = round_dao.is_game_complete(s_id)
@@ -156,9 +194,16 @@ def submit_quiz_answers(s_id):
         if game_is_complete:
             # Update game status to ended only after ALL 5 rounds are complete with both players' answers
             game_session_dao.update_game_status(s_id, "ended")
+            after_commit(lambda: question_packs.discard(s_id))
+            after_commit(leaderboards.request_refresh)
+            after_commit(metrics.games_ended.inc)
         
         # Also check if current round is complete for response
         round_complete = round_dao.is_round_complete(s_id, current_round)
+        if round_complete:
+            events.publish(s_id, "round_complete", {"round_number": current_round})
+        if game_is_complete:
+            events.publish(s_id, "game_ended", {})
         
         return jsonify({
             "message": "Answers submitted successfully",
@@ -174,7 +219,7 @@ def submit_quiz_answers(s_id):
 def get_current_round(s_id):
     """Get current round information"""
     try:
-        current_round = round_dao.get_current_round(s_id)
+        current_round = latest_round(s_id)
         if not current_round:
             return jsonify({"error": "No active round found"}), 404
         
@@ -235,6 +280,9 @@ def submit_round_answers(r_id):
         
         # Submit answers
         result = round_dao.submit_round_answers(r_id, user_id, answers, correct_count)
+        if not result["submitted"]:
+            return jsonify({"error": "Answers already submitted for this round"}), 409
+        metrics.answers_submitted.inc()
         
         return jsonify({
             "message": "Answers submitted successfully",
@@ -246,47 +294,24 @@ def submit_round_answers(r_id):
         return jsonify({"error": "Failed to submit answers"}), 500
 
 @round_bp.route("/games/<int:s_id>/results", methods=["GET"])
+@transactional
 def get_game_results(s_id):
     """Get complete game results with all rounds"""
     try:
-        # Get game info
-        game = game_session_dao.get_game_session(s_id)
+        game = game_session_dao.get_game_snapshot(s_id)
         if not game:
             return jsonify({"error": "Game not found"}), 404
         
-        # Get all rounds
-        rounds = round_dao.get_rounds_by_game_session(s_id)
-        
-        # Calculate final scores
-        player1_score = 0
-        player2_score = 0
-        
-        for round_data in rounds:
-            if round_data.get('players_answers'):
-                answers = round_data['players_answers']
-                if str(game['player1']) in answers:
-                    player1_score += answers[str(game['player1'])].get('score', 0)
-                if str(game['player2']) in answers:
-                    player2_score += answers[str(game['player2'])].get('score', 0)
-        
-        # Determine winner
-        if player1_score > player2_score:
-            winner = game['player1']
-        elif player2_score > player1_score:
-            winner = game['player2']
-        else:
-            winner = None  # Tie
-        
         return jsonify({
             "game_id": s_id,
             "game_status": game['game_status'],
-            "player1": game['player1'],
-            "player2": game['player2'],
-            "player1_score": player1_score,
-            "player2_score": player2_score,
-            "winner": winner,
-            "rounds": rounds,
-            "total_rounds": len(rounds)
+            "player1": game['player1']['id'],
+            "player2": game['player2']['id'],
+            "player1_score": game['player1']['score'],
+            "player2_score": game['player2']['score'],
+            "winner": game['leader_id'],
+            "rounds": game['rounds'],
+            "total_rounds": len(game['rounds'])
         }), 200
         
     except Exception as e:
@@ -297,7 +322,7 @@ def get_game_results(s_id):
 def get_current_round_for_quiz(s_id):
     """Get current round for answering existing questions"""
     try:
-        current_round = round_dao.get_current_round_for_quiz(s_id)
+        current_round = latest_round(s_id)
         if not current_round:
             return jsonify({"error": "No active round found"}), 404
         
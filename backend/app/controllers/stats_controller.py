@@ -1,9 +1,19 @@
 # app/controllers/stats_controller.py
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request, current_app
 from app.dao import stats_dao
+from app.services import leaderboards
 
 stats_bp = Blueprint("stats", __name__)
 
+def leaderboard_response(board):
+    """Serve a cached leaderboard with ETag/Cache-Control so clients can revalidate"""
+    rows, etag = leaderboards.get_leaderboard(board)
+    response = jsonify(rows)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = int(current_app.config["LEADERBOARD_CACHE_TTL"])
+    return response.make_conditional(request)
+
 @stats_bp.route("/user/<int:user_id>", methods=["GET"])
 def get_user_stats(user_id):
     """Get personal statistics for a specific user"""
@@ -20,8 +30,7 @@ def get_user_stats(user_id):
 def get_overall_leaderboard():
     """Get overall leaderboard (top 10 by XP)"""
     try:
-        leaderboard = stats_dao.get_leaderboard_overall()
-        return jsonify(leaderboard), 200
+        return leaderboard_response("overall")
     except Exception as e:
         return jsonify({"error": "Failed to retrieve overall leaderboard"}), 500
 
@@ -29,8 +38,7 @@ def get_overall_leaderboard():
 def get_weekly_leaderboard():
     """Get weekly leaderboard (top 10 by XP, last 7 days)"""
     try:
-        leaderboard = stats_dao.get_leaderboard_weekly()
-        return jsonify(leaderboard), 200
+        return leaderboard_response("weekly")
     except Exception as e:
         return jsonify({"error": "Failed to retrieve weekly leaderboard"}), 500
 
@@ -38,7 +46,6 @@ def get_weekly_leaderboard():
 def get_monthly_leaderboard():
     """Get monthly leaderboard (top 10 by XP, last 30 days)"""
     try:
-        leaderboard = stats_dao.get_leaderboard_monthly()
-        return jsonify(leaderboard), 200
+        return leaderboard_response("monthly")
     except Exception as e:
         return jsonify({"error": "Failed to retrieve monthly leaderboard"}), 500
\ No newline at end of file
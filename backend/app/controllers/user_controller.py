@@ -1,13 +1,26 @@
 from flask import Blueprint, jsonify, request
 from app.dao import user_dao
-import bcrypt
+from app.utils.auth import issue_token
+from app.utils.pagination import InvalidCursorError, page_args, paginated_response
+from app.services import matchmaking, password_hasher
+from app.services.password_hasher import HasherBusyError
 
 user_bp = Blueprint("user_bp", __name__)
 
+def server_busy():
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 429
+
 @user_bp.route("/", methods=["GET"])
 def get_users():
-    users = user_dao.get_all_users()
-    return jsonify(users), 200
+    """Get users in id order, one page at a time (?limit=, ?cursor=)"""
+    try:
+        limit, after_id = page_args()
+    except InvalidCursorError as e:
+        return jsonify({"error": str(e)}), 400
+    users = user_dao.get_all_users(limit, after_id)
+    return paginated_response(users, limit, lambda user: user["u_id"]), 200
 
 @user_bp.route("/<int:user_id>", methods=["GET"])
 def get_user(user_id):
@@ -28,7 +41,11 @@ def create_user():
         return jsonify({"error": "username, email and password are required"}), 400
     
     try:
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        hashed_password = password_hasher.hash_password(password)
+    except HasherBusyError:
+        return server_busy()
+    
+    try:
         user_id = user_dao.create_user(username, email, hashed_password)
         return jsonify({"u_id": user_id}), 201  # Changed from "id" to "u_id"
     except Exception as e:
@@ -45,14 +62,24 @@ def login():
     
     try:
         user = user_dao.get_user_by_username(username)
-        if user and bcrypt.checkpw(password.encode('utf-8'), user["password"].encode('utf-8')):
+        if user and password_hasher.check_password(password, user["password"]):
             # Check if user is banned
             if user_dao.check_user_banned(user["u_id"]):
                 return jsonify({"error": "User is banned"}), 403
             
-            return jsonify({"message": "Login successful", "user_id": user["u_id"]}), 200
+            matchmaking.mark_active(user["u_id"])
+            is_admin = user_dao.is_user_admin(user["u_id"])
+            token = issue_token(user["u_id"], user["user_name"], is_admin, user["token_epoch"])
+            return jsonify({
+                "message": "Login successful",
+                "user_id": user["u_id"],
+                "is_admin": is_admin,
+                "token": token
+            }), 200
         else:
             return jsonify({"error": "Invalid username or password"}), 401
+    except HasherBusyError:
+        return server_busy()
     except Exception as e:
         return jsonify({"error": "Login failed"}), 500
     
@@ -1,5 +1,12 @@
 # app/dao/admin_dao.py
-from app.db import get_db_connection
+from app.db import get_db_connection, after_commit, stream_query
+from app.utils.cache import cache
+
+BANNED_USER_EXPORT_COLUMNS = ("u_id", "user_name", "email", "ban_reason", "ban_date")
+
+def invalidate_user_auth(user_id):
+    cache.invalidate("user_banned", user_id)
+    cache.invalidate("auth_state", user_id)
 
 def ban_user(user_id, ban_reason):
     conn = get_db_connection()
@@ -8,7 +15,12 @@ def ban_user(user_id, ban_reason):
         cursor.execute("""
             INSERT INTO banned_users (u_id, ban_reason) VALUES (%s, %s);
         """, (user_id, ban_reason))
+        # Revoke every token issued before the ban
+        cursor.execute("""
+            UPDATE users SET token_epoch = token_epoch + 1 WHERE u_id = %s;
+        """, (user_id,))
         conn.commit()
+        after_commit(lambda: invalidate_user_auth(user_id))
     except Exception as e:
         conn.rollback()
         raise e
@@ -21,21 +33,45 @@ def unban_user(user_id):
     cursor = conn.cursor()
     cursor.execute("DELETE FROM banned_users WHERE u_id = %s;", (user_id,))
     conn.commit()
+    after_commit(lambda: invalidate_user_auth(user_id))
     cursor.close()
     conn.close()
 
-def get_banned_users():
+def get_banned_users(limit=None, after_id=None):
+    """Banned users in u_id order; one page of limit rows after after_id,
+    plus one extra row to tell whether another page follows"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT u.u_id, u.user_name, u.email, b.ban_reason, b.ban_date
         FROM banned_users b
-        JOIN users u ON b.u_id = u.u_id;
-    """)
+        JOIN users u ON b.u_id = u.u_id
+        WHERE %s IS NULL OR b.u_id > %s
+        ORDER BY b.u_id
+        LIMIT %s;
+    """, (after_id, after_id, limit + 1 if limit else None))
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
     return [
         {"u_id": row[0], "user_name": row[1], "email": row[2], "ban_reason": row[3], "ban_date": row[4]}
         for row in rows
-    ]
\ No newline at end of file
+    ]
+
+def iter_banned_users(batch_size=2000):
+    """Stream every banned user with a server-side cursor"""
+    return stream_query("banned_user_export", """
+        SELECT u.u_id, u.user_name, u.email, b.ban_reason, b.ban_date
+        FROM banned_users b
+        JOIN users u ON b.u_id = u.u_id
+        ORDER BY b.u_id;
+    """, (), batch_size)
+
+def get_banned_user_count():
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM banned_users;")
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
\ No newline at end of file
@@ -0,0 +1,89 @@
+# app/dao/async_dao.py
+# Async (asyncpg) variants of the read-heavy DAO queries served by the ASGI
+# mode. Results have the same shape as their synchronous counterparts.
+from app.dao.round_dao import PLAYERS_ANSWERS_SQL, ROUND_COLUMNS, round_from_row
+
+
+async def get_current_round(db, s_id):
+    """Get current round information"""
+    try:
+        row = await db.fetchrow("""
+            SELECT """ + ROUND_COLUMNS + """
+            FROM rounds r
+            WHERE r.s_id = $1
+            ORDER BY r.round_number DESC
+            LIMIT 1;
+        """, s_id)
+    except Exception:
+        db.logger.exception("Error getting current round of game %s", s_id)
+        return None
+    return round_from_row(row) if row else None
+
+
+async def get_rounds_by_game_session(db, s_id):
+    """Get all rounds for a specific game session (quiz mode)"""
+    try:
+        rows = await db.fetch("""
+            SELECT """ + ROUND_COLUMNS + """
+            FROM rounds r
+            WHERE r.s_id = $1
+            ORDER BY r.round_number;
+        """, s_id)
+    except Exception:
+        db.logger.exception("Error getting rounds of game %s", s_id)
+        return []
+    return [round_from_row(row) for row in rows]
+
+
+async def get_round_status(db, s_id, round_number):
+    """Get status of a specific round"""
+    try:
+        row = await db.fetchrow("""
+            SELECT EXISTS (SELECT 1 FROM round_answers WHERE r_id = r.r_id AND u_id = gs.player1) AS p1,
+                   EXISTS (SELECT 1 FROM round_answers WHERE r_id = r.r_id AND u_id = gs.player2) AS p2,
+                   """ + PLAYERS_ANSWERS_SQL + """ AS players_answers
+            FROM rounds r
+            JOIN game_sessions gs ON r.s_id = gs.s_id
+            WHERE r.s_id = $1 AND r.round_number = $2;
+        """, s_id, round_number)
+    except Exception:
+        db.logger.exception("Error getting status of round %s of game %s", round_number, s_id)
+        return None
+    if not row:
+        return None
+    return {
+        'round_number': round_number,
+        'player1_answered': row['p1'],
+        'player2_answered': row['p2'],
+        'round_complete': row['p1'] and row['p2'],
+        'players_answers': row['players_answers'] or {}
+    }
+
+
+async def get_user_stats(db, user_id):
+    row = await db.fetchrow("""
+        SELECT u.user_name, s.game_count, s.win_count, s.average_accuracy, s.xp,
+               CASE WHEN s.game_count > 0 THEN ROUND((s.win_count::NUMERIC / s.game_count * 100), 1) ELSE 0 END as win_ratio
+        FROM users u
+        JOIN user_stats s ON u.u_id = s.u_id
+        WHERE u.u_id = $1;
+    """, user_id)
+    if row:
+        return {
+            "user_name": row[0], "game_count": row[1], "win_count": row[2],
+            "average_accuracy": row[3], "xp": row[4], "win_ratio": row[5]
+        }
+    return None
+
+
+async def get_user_active_games(db, user_id):
+    rows = await db.fetch("""
+        SELECT gs.s_id, gs.player1, gs.player2, gs.start_time
+        FROM game_participants gp
+        JOIN game_sessions gs ON gs.s_id = gp.s_id
+        WHERE gp.u_id = $1 AND gp.status = 'ongoing';
+    """, user_id)
+    return [
+        {"s_id": row[0], "player1": row[1], "player2": row[2], "start_time": row[3]}
+        for row in rows
+    ]
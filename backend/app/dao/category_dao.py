@@ -1,6 +1,8 @@
 # app/dao/category_dao.py
-from app.db import get_db_connection
+from app.db import get_db_connection, after_commit
+from app.utils.cache import cache, cached
 
+@cached("categories")
 def get_all_categories():
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -13,6 +15,7 @@ def get_all_categories():
         for row in rows
     ]
 
+@cached("categories")
 def get_category_by_id(c_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -34,6 +37,7 @@ def create_category(category_name):
         )
         category_id = cursor.fetchone()[0]
         conn.commit()
+        after_commit(lambda: cache.invalidate("categories"))
         return category_id
     except Exception as e:
         conn.rollback()
@@ -1,33 +1,20 @@
+import random
+from datetime import datetime
+from flask import current_app
 from app.db import get_db_connection
+from app.dao.round_dao import PLAYERS_ANSWERS_SQL, invalidate_game_snapshot
+from app.utils.cache import cache
 
-def create_game_session_with_random_opponent(player1_id):
+def create_game_session(player1_id, player2_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    
     try:
-        # Find a random opponent that is not the same as player1 and not banned
-        cursor.execute("""
-            SELECT u.u_id FROM users u
-            LEFT JOIN banned_users b ON u.u_id = b.u_id
-            WHERE u.u_id != %s AND b.u_id IS NULL
-            ORDER BY RANDOM()
-            LIMIT 1;
-        """, (player1_id,))
-        opponent = cursor.fetchone()
-
-        if opponent is None:
-            return None  # No opponent found
-
-        player2_id = opponent[0]
-
-        # Create the game session
         cursor.execute("""
             INSERT INTO game_sessions (player1, player2, game_status, start_time)
             VALUES (%s, %s, 'ongoing', CURRENT_TIMESTAMP)
             RETURNING s_id;
         """, (player1_id, player2_id))
         session_id = cursor.fetchone()[0]
-
         conn.commit()
         return session_id
     except Exception as e:
@@ -37,6 +24,52 @@ def create_game_session_with_random_opponent(player1_id):
         cursor.close()
         conn.close()
 
+def count_active_games(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM game_participants WHERE u_id = %s AND status = 'ongoing';
+    """, (user_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+def find_random_opponent(player_id, max_active_games=0):
+    """Pick a non-banned opponent below the active-game cap without scanning users.
+
+    Starts at a random point in the users primary key and walks forward to
+    the first eligible user, wrapping around once, so each probe is an
+    index range scan instead of ORDER BY RANDOM() over the whole table.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT MIN(u_id), MAX(u_id) FROM users;")
+        low, high = cursor.fetchone()
+        if low is None:
+            return None
+        start = random.randint(low, high)
+
+        for condition in ("u.u_id >= %s", "u.u_id < %s"):
+            cursor.execute("""
+                SELECT u.u_id FROM users u
+                WHERE """ + condition + """ AND u.u_id != %s
+                  AND NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+                  AND (%s <= 0 OR
+                       (SELECT COUNT(*) FROM game_participants gp
+                        WHERE gp.u_id = u.u_id AND gp.status = 'ongoing') < %s)
+                ORDER BY u.u_id
+                LIMIT 1;
+            """, (start, player_id, max_active_games, max_active_games))
+            row = cursor.fetchone()
+            if row:
+                return row[0]
+        return None
+    finally:
+        cursor.close()
+        conn.close()
+
 def create_game_session_with_selected_opponent(player1_id, opponent_username):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -91,92 +124,151 @@ def get_game_session(session_id):
         }
     return None
 
-def get_game_session_with_details(session_id):
+# Session, both players, every round with its answers, score totals and the
+# score leader, assembled by Postgres in a single round-trip
+GAME_SNAPSHOT_SQL = """
+    SELECT gs.s_id, gs.player1, u1.user_name, gs.player2, u2.user_name,
+           gs.game_status, gs.start_time, gs.end_time, gs.winner_id,
+           COALESCE(rs.rounds, '[]'::jsonb),
+           COALESCE(sc.player1_score, 0), COALESCE(sc.player2_score, 0)
+    FROM game_sessions gs
+    JOIN users u1 ON u1.u_id = gs.player1
+    JOIN users u2 ON u2.u_id = gs.player2
+    LEFT JOIN LATERAL (
+        SELECT jsonb_agg(jsonb_build_object(
+                   'r_id', r.r_id,
+                   's_id', r.s_id,
+                   'round_number', r.round_number,
+                   'round_starter', r.category_selector,
+                   'category_id', r.selected_category,
+                   'questions', r.questions,
+                   'players_answers', """ + PLAYERS_ANSWERS_SQL + """,
+                   'created_at', r.created_at
+               ) ORDER BY r.round_number) AS rounds
+        FROM rounds r
+        WHERE r.s_id = gs.s_id
+    ) rs ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT SUM(ra.score) FILTER (WHERE ra.u_id = gs.player1) AS player1_score,
+               SUM(ra.score) FILTER (WHERE ra.u_id = gs.player2) AS player2_score
+        FROM rounds r
+        JOIN round_answers ra ON ra.r_id = r.r_id
+        WHERE r.s_id = gs.s_id
+    ) sc ON TRUE
+    WHERE gs.s_id = %s;
+"""
+
+def _snapshot_round(round_data):
+    created_at = round_data.get('created_at')
+    return {
+        'r_id': round_data['r_id'],
+        's_id': round_data['s_id'],
+        'round_number': round_data['round_number'],
+        'round_starter': round_data['round_starter'],
+        'category_id': round_data['category_id'],
+        'questions': round_data.get('questions') or [],
+        'players_answers': round_data.get('players_answers') or {},
+        'created_at': datetime.fromisoformat(created_at) if created_at else None
+    }
+
+def _load_game_snapshot(session_id):
     conn = get_db_connection()
     cursor = conn.cursor()
-    
     try:
-        # Get game session basic info
-        cursor.execute("""
-            SELECT gs.s_id, gs.player1, gs.player2, gs.game_status, gs.start_time, gs.end_time, gs.winner_id
-            FROM game_sessions gs
-            WHERE gs.s_id = %s;
-        """, (session_id,))
-        game_session = cursor.fetchone()
-        
-        if not game_session:
-            return None
-        
-        # Get player names
-        cursor.execute("""
-            SELECT u.user_name FROM users u WHERE u.u_id = %s;
-        """, (game_session[1],))
-        player1_name = cursor.fetchone()[0]
-        
-        cursor.execute("""
-            SELECT u.user_name FROM users u WHERE u.u_id = %s;
-        """, (game_session[2],))
-        player2_name = cursor.fetchone()[0]
-        
-        # Get rounds data
-        cursor.execute("""
-            SELECT r.r_id, r.players_answers
-            FROM rounds r
-            WHERE r.s_id = %s
-            ORDER BY r.round_number ASC;
-        """, (session_id,))
-        rounds_data = cursor.fetchall()
-        
-        # Process rounds
-        rounds = []
-        for round_data in rounds_data:
-            players_answers = round_data[1] if round_data[1] else {}
-            
-            # Default to empty arrays if no answers exist
-            player1_answers = players_answers.get(str(game_session[1]), [])
-            player2_answers = players_answers.get(str(game_session[2]), [])
-            
-            rounds.append({
-                "player1_answers": player1_answers,
-                "player2_answers": player2_answers
-            })
-        
-        # Determine whose turn it is (simple logic: alternating turns)
-        # You can implement more complex logic based on your game rules
-        current_round = len(rounds)
-        is_player1_turn = current_round % 2 == 0  # Player 1 starts odd rounds (0, 2, 4...)
-        
-        return {
-            "s_id": game_session[0],
-            "player1": {
-                "id": game_session[1],
-                "name": player1_name
-            },
-            "player2": {
-                "id": game_session[2], 
-                "name": player2_name
-            },
-            "game_status": game_session[3],
-            "start_time": game_session[4],
-            "end_time": game_session[5],
-            "winner_id": game_session[6],
-            "rounds": rounds,
-            "is_player1_turn": is_player1_turn,
-            "current_round": current_round
-        }
-        
+        cursor.execute(GAME_SNAPSHOT_SQL, (session_id,))
+        row = cursor.fetchone()
     finally:
         cursor.close()
         conn.close()
 
+    if not row:
+        return None
+
+    player1_score, player2_score = row[10], row[11]
+    if player1_score > player2_score:
+        leader = row[1]
+    elif player2_score > player1_score:
+        leader = row[3]
+    else:
+        leader = None  # Tie
+
+    return {
+        "s_id": row[0],
+        "player1": {"id": row[1], "name": row[2], "score": player1_score},
+        "player2": {"id": row[3], "name": row[4], "score": player2_score},
+        "game_status": row[5],
+        "start_time": row[6],
+        "end_time": row[7],
+        "winner_id": row[8],
+        "rounds": [_snapshot_round(round_data) for round_data in row[9]],
+        "leader_id": leader
+    }
+
+def is_snapshot_cached():
+    """Whether get_game_snapshot is served from the cache; without it, callers
+    needing only part of a game should use the narrower queries"""
+    return current_app.config["GAME_SNAPSHOT_CACHE_TTL"] > 0
+
+def get_game_snapshot(session_id):
+    """Everything the game screens show for one session, from one query.
+
+    Served from a short-lived per-game cache when GAME_SNAPSHOT_CACHE_TTL is
+    set; round creation, submissions and game end invalidate it. Each caller
+    gets its own copy, so the cached entry cannot be altered through it.
+    """
+    if is_snapshot_cached():
+        return cache.get_or_load("game_snapshot", (session_id,), lambda: _load_game_snapshot(session_id))
+    return _load_game_snapshot(session_id)
+
+def get_game_session_with_details(session_id):
+    snapshot = get_game_snapshot(session_id)
+    if not snapshot:
+        return None
+
+    player1_key = str(snapshot["player1"]["id"])
+    player2_key = str(snapshot["player2"]["id"])
+    rounds = [
+        {
+            # Default to empty arrays if no answers exist
+            "player1_answers": round_data["players_answers"].get(player1_key, []),
+            "player2_answers": round_data["players_answers"].get(player2_key, [])
+        }
+        for round_data in snapshot["rounds"]
+    ]
+
+    # Determine whose turn it is (simple logic: alternating turns)
+    # You can implement more complex logic based on your game rules
+    current_round = len(rounds)
+    is_player1_turn = current_round % 2 == 0  # Player 1 starts odd rounds (0, 2, 4...)
+
+    return {
+        "s_id": snapshot["s_id"],
+        "player1": {
+            "id": snapshot["player1"]["id"],
+            "name": snapshot["player1"]["name"]
+        },
+        "player2": {
+            "id": snapshot["player2"]["id"],
+            "name": snapshot["player2"]["name"]
+        },
+        "game_status": snapshot["game_status"],
+        "start_time": snapshot["start_time"],
+        "end_time": snapshot["end_time"],
+        "winner_id": snapshot["winner_id"],
+        "rounds": rounds,
+        "is_player1_turn": is_player1_turn,
+        "current_round": current_round
+    }
+
 def get_user_active_games(user_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT s_id, player1, player2, start_time
-        FROM game_sessions 
-        WHERE (player1 = %s OR player2 = %s) AND game_status = 'ongoing';
-    """, (user_id, user_id))
+        SELECT gs.s_id, gs.player1, gs.player2, gs.start_time
+        FROM game_participants gp
+        JOIN game_sessions gs ON gs.s_id = gp.s_id
+        WHERE gp.u_id = %s AND gp.status = 'ongoing';
+    """, (user_id,))
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
@@ -197,6 +289,7 @@ def update_game_status(session_id, status):
             WHERE s_id = %s;
         """, (status, session_id))
         conn.commit()
+        invalidate_game_snapshot(session_id)
         return True
     except Exception as e:
         conn.rollback()
@@ -1,5 +1,12 @@
 # app/dao/question_dao.py
-from app.db import get_db_connection
+from psycopg2.extras import execute_values
+from app.db import get_db_connection, after_commit, stream_query
+from app.utils.cache import cache
+
+QUESTION_EXPORT_COLUMNS = (
+    "q_id", "q_text", "c_id", "category_name", "option_a", "option_b", "option_c",
+    "option_d", "correct_answer", "difficulty_level", "author", "confirmation_status"
+)
 
 def create_question(q_text, c_id, option_a, option_b, option_c, option_d, correct_answer, difficulty_level, author='User'):
     conn = get_db_connection()
@@ -17,27 +24,109 @@ def create_question(q_text, c_id, option_a, option_b, option_c, option_d, correc
         cursor.close()
         conn.close()
 
-def get_confirmed_questions_by_category(c_id, limit=1):
+def get_confirmed_question_ids(c_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT q_id FROM questions
+        WHERE c_id = %s AND confirmation_status = TRUE;
+    """, (c_id,))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return [row[0] for row in rows]
+
+def get_confirmed_question_id_set(q_ids):
+    """The q_ids that still exist and are confirmed, read past the cache"""
+    if not q_ids:
+        return set()
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT q_id, q_text, option_a, option_b, option_c, option_d, correct_answer, difficulty_level
-        FROM questions 
-        WHERE c_id = %s AND confirmation_status = TRUE
-        ORDER BY RANDOM() LIMIT %s;
-    """, (c_id, limit))
+        SELECT q_id FROM questions
+        WHERE q_id = ANY(%s) AND confirmation_status = TRUE;
+    """, (list(q_ids),))
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return {row[0] for row in rows}
+
+def get_confirmed_questions_by_ids(q_ids):
+    """Fetch confirmed questions by primary key, keeping the order of q_ids.
+
+    Confirmed questions never change, so rows are served from the
+    "questions" cache and only the missing ids are queried.
+    """
+    if not q_ids:
+        return []
+    questions = {}
+    for q_id in q_ids:
+        question = cache.get("questions", q_id)
+        if question is not None:
+            questions[q_id] = question
+    
+    missing = [q_id for q_id in q_ids if q_id not in questions]
+    if missing:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT q_id, q_text, option_a, option_b, option_c, option_d, correct_answer, difficulty_level
+            FROM questions
+            WHERE q_id = ANY(%s) AND confirmation_status = TRUE;
+        """, (missing,))
+        rows = cursor.fetchall()
+        cursor.close()
+        conn.close()
+        for row in rows:
+            question = {
+                "q_id": row[0], "q_text": row[1], "option_a": row[2], "option_b": row[3],
+                "option_c": row[4], "option_d": row[5], "correct_answer": row[6], "difficulty_level": row[7]
+            }
+            cache.set("questions", question, row[0])
+            questions[row[0]] = question
+    
+    # Callers may edit the dicts (e.g. drop correct_answer), so hand out copies
+    return [dict(questions[q_id]) for q_id in q_ids if q_id in questions]
+
+def get_confirmed_question_count(c_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT COUNT(*) FROM questions
+        WHERE c_id = %s AND confirmation_status = TRUE;
+    """, (c_id,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    conn.close()
+    return count
+
+def get_question_counts_by_category():
+    """Confirmed and pending question counts for every category in one query"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT c.c_id, c.category_name,
+               COUNT(q.q_id) FILTER (WHERE q.confirmation_status = TRUE),
+               COUNT(q.q_id) FILTER (WHERE q.confirmation_status = FALSE)
+        FROM categories c
+        LEFT JOIN questions q ON q.c_id = c.c_id
+        GROUP BY c.c_id, c.category_name
+        ORDER BY c.category_name;
+    """)
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
     return [
         {
-            "q_id": row[0], "q_text": row[1], "option_a": row[2], "option_b": row[3],
-            "option_c": row[4], "option_d": row[5], "correct_answer": row[6], "difficulty_level": row[7]
+            "c_id": row[0], "category_name": row[1],
+            "confirmed_question_count": row[2], "pending_question_count": row[3]
         }
         for row in rows
     ]
 
-def get_pending_questions():
+def get_pending_questions(limit=None, after_id=None):
+    """Pending questions in q_id order; one page of limit rows after
+    after_id, plus one extra row to tell whether another page follows"""
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
@@ -45,8 +134,10 @@ def get_pending_questions():
                q.correct_answer, q.difficulty_level, q.author, c.category_name
         FROM questions q
         JOIN categories c ON q.c_id = c.c_id
-        WHERE q.confirmation_status = FALSE;
-    """)
+        WHERE q.confirmation_status = FALSE AND (%s IS NULL OR q.q_id > %s)
+        ORDER BY q.q_id
+        LIMIT %s;
+    """, (after_id, after_id, limit + 1 if limit else None))
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
@@ -60,12 +151,118 @@ def get_pending_questions():
     ]
 
 def confirm_question(q_id, status):
+    from app.services import question_sampler  # Import here to avoid circular imports
+
     conn = get_db_connection()
     cursor = conn.cursor()
     if status:
-        cursor.execute("UPDATE questions SET confirmation_status = TRUE WHERE q_id = %s;", (q_id,))
+        cursor.execute("UPDATE questions SET confirmation_status = TRUE WHERE q_id = %s RETURNING c_id;", (q_id,))
     else:
-        cursor.execute("DELETE FROM questions WHERE q_id = %s;", (q_id,))
+        cursor.execute("DELETE FROM questions WHERE q_id = %s RETURNING c_id;", (q_id,))
+    row = cursor.fetchone()
     conn.commit()
     cursor.close()
-    conn.close()
\ No newline at end of file
+    conn.close()
+
+    def sync_indexes():
+        # Keep the in-process sampling index and question cache in step
+        cache.invalidate("questions", q_id)
+        if row:
+            if status:
+                question_sampler.on_question_confirmed(q_id, row[0])
+            else:
+                question_sampler.on_question_removed(q_id, row[0])
+    after_commit(sync_indexes)
+
+def bulk_insert_questions(rows, confirmed=False, page_size=1000):
+    """Insert many validated question tuples in batched multi-row INSERTs.
+
+    Each row is (q_text, c_id, option_a, option_b, option_c, option_d,
+    correct_answer, difficulty_level, author). Returns the number inserted.
+    """
+    if not rows:
+        return 0
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        execute_values(cursor, """
+            INSERT INTO questions (q_text, c_id, option_a, option_b, option_c, option_d,
+                                   correct_answer, difficulty_level, author, confirmation_status)
+            VALUES %s;
+        """, rows, template="(%s, %s, %s, %s, %s, %s, %s, %s, %s, " + ("TRUE" if confirmed else "FALSE") + ")",
+            page_size=page_size)
+        conn.commit()
+        return len(rows)
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        conn.close()
+
+def bulk_review_questions(status, q_ids=None, c_id=None):
+    """Confirm (status True) or reject and delete (False) pending questions.
+
+    Targets the given q_ids, else every pending question in c_id, else every
+    pending question. Returns the (q_id, c_id) pairs that were changed.
+    """
+    from app.services import question_sampler  # Import here to avoid circular imports
+
+    conditions = ["confirmation_status = FALSE"]
+    params = []
+    if q_ids is not None:
+        conditions.append("q_id = ANY(%s)")
+        params.append(list(q_ids))
+    if c_id is not None:
+        conditions.append("c_id = %s")
+        params.append(c_id)
+    where = " AND ".join(conditions)
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        if status:
+            cursor.execute("UPDATE questions SET confirmation_status = TRUE WHERE " + where + " RETURNING q_id, c_id;", params)
+        else:
+            cursor.execute("DELETE FROM questions WHERE " + where + " RETURNING q_id, c_id;", params)
+        changed = cursor.fetchall()
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        conn.close()
+
+    def sync_indexes():
+        # Pending questions are never in the sampling index or question cache,
+        # so only confirmations need to reach them
+        if status:
+            for changed_q_id, changed_c_id in changed:
+                question_sampler.on_question_confirmed(changed_q_id, changed_c_id)
+    after_commit(sync_indexes)
+    return changed
+
+def iter_questions(status=None, c_id=None, batch_size=2000):
+    """Stream questions with a server-side cursor, batch_size rows at a time.
+
+    status is True (confirmed), False (pending) or None (all).
+    """
+    conditions = []
+    params = []
+    if status is not None:
+        conditions.append("q.confirmation_status = %s")
+        params.append(status)
+    if c_id is not None:
+        conditions.append("q.c_id = %s")
+        params.append(c_id)
+    where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    return stream_query("question_export", """
+        SELECT q.q_id, q.q_text, q.c_id, c.category_name, q.option_a, q.option_b, q.option_c,
+               q.option_d, q.correct_answer, q.difficulty_level, q.author, q.confirmation_status
+        FROM questions q
+        JOIN categories c ON q.c_id = c.c_id
+        """ + where + """
+        ORDER BY q.q_id;
+    """, params, batch_size)
@@ -1,8 +1,136 @@
 # app/dao/round_dao.py
-from app.db import get_db_connection
-import json
+from psycopg2 import errors
+from app.db import get_db_connection, after_commit
+from app.utils.cache import cache
+from app.utils.json_provider import json_param
 from datetime import datetime
 
+# Per-player answers live in round_answers; this expression rebuilds the
+# players_answers document the API has always returned for a round "r"
+PLAYERS_ANSWERS_SQL = """
+    (SELECT jsonb_object_agg(ra.u_id::TEXT, jsonb_build_object(
+                'answers', ra.answers,
+                'score', ra.score,
+                'submitted_at', ra.submitted_at))
+     FROM round_answers ra
+     WHERE ra.r_id = r.r_id)
+"""
+
+# Columns every round read selects, in round_from_row's order
+ROUND_COLUMNS = """
+    r.r_id, r.s_id, r.round_number, r.category_selector, r.selected_category,
+    r.questions, """ + PLAYERS_ANSWERS_SQL + """, r.created_at
+"""
+
+def round_from_row(row):
+    """API shape of a round read with ROUND_COLUMNS"""
+    return {
+        'r_id': row[0],
+        's_id': row[1],
+        'round_number': row[2],
+        'round_starter': row[3],
+        'category_id': row[4],
+        'questions': row[5] or [],
+        'players_answers': row[6] or {},
+        'created_at': row[7]
+    }
+
+def _fetch_rounds(where_sql, params):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT " + ROUND_COLUMNS + " FROM rounds r " + where_sql, params)
+        return [round_from_row(row) for row in cursor.fetchall()]
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_rounds(r_ids):
+    """Rounds for many round IDs in one query, keyed by r_id"""
+    if not r_ids:
+        return {}
+    rounds = _fetch_rounds("WHERE r.r_id = ANY(%s);", (list(r_ids),))
+    return {round_data["r_id"]: round_data for round_data in rounds}
+
+def get_rounds_for_games(s_ids):
+    """Rounds of many game sessions in one query, keyed by s_id in round order"""
+    result = {s_id: [] for s_id in s_ids}
+    if not result:
+        return result
+    rounds = _fetch_rounds("""
+        WHERE r.s_id = ANY(%s)
+        ORDER BY r.s_id, r.round_number;
+    """, (list(result),))
+    for round_data in rounds:
+        result[round_data["s_id"]].append(round_data)
+    return result
+
+def get_rounds_by_game_session(s_id):
+    """Get all rounds for a specific game session (quiz mode)"""
+    try:
+        return get_rounds_for_games([s_id])[s_id]
+    except Exception as e:
+        print(f"Error getting rounds by game session: {e}")
+        return []
+
+def get_current_round(s_id):
+    """Get current round information"""
+    try:
+        rounds = _fetch_rounds("""
+            WHERE r.s_id = %s
+            ORDER BY r.round_number DESC
+            LIMIT 1;
+        """, (s_id,))
+        return rounds[0] if rounds else None
+    except Exception as e:
+        print(f"Error getting current round: {e}")
+        return None
+
+# Answering existing questions reads the same latest round
+get_current_round_for_quiz = get_current_round
+
+def get_round_by_id(r_id):
+    """Get round information by round ID"""
+    try:
+        return get_rounds([r_id]).get(r_id)
+    except Exception as e:
+        print(f"Error getting round by ID: {e}")
+        return None
+
+def get_used_question_ids(s_id):
+    """Ids of every question already asked in a game"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("""
+            SELECT DISTINCT (question->>'q_id')::INT
+            FROM rounds r, jsonb_array_elements(r.questions) AS question
+            WHERE r.s_id = %s;
+        """, (s_id,))
+        return {row[0] for row in cursor.fetchall()}
+    finally:
+        cursor.close()
+        conn.close()
+
+def get_round_questions(r_id):
+    """Get questions for a specific round"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT questions FROM rounds WHERE r_id = %s;", (r_id,))
+        result = cursor.fetchone()
+        return (result[0] or []) if result else []
+    except Exception as e:
+        print(f"Error getting round questions: {e}")
+        return []
+    finally:
+        cursor.close()
+        conn.close()
+
+def invalidate_game_snapshot(s_id):
+    """Drop the cached game snapshot once the current transaction commits"""
+    after_commit(lambda: cache.invalidate("game_snapshot", s_id))
+
 def create_round(s_id, q_id, round_number, category_selector, selected_category):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -13,6 +141,7 @@ def create_round(s_id, q_id, round_number, category_selector, selected_category)
         """, (s_id, q_id, round_number, category_selector, selected_category))
         round_id = cursor.fetchone()[0]
         conn.commit()
+        invalidate_game_snapshot(s_id)
         return round_id
     except Exception as e:
         conn.rollback()
@@ -22,7 +151,11 @@ def create_round(s_id, q_id, round_number, category_selector, selected_category)
         conn.close()
 
 def create_round_with_questions(s_id, round_number, round_starter, category_id, questions):
-    """Create a new round with questions for quiz mode"""
+    """Create a new round with questions for quiz mode.
+
+    Returns None if the game already has a round with this number, e.g.
+    when both players start the same round at once.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
@@ -36,11 +169,16 @@ def create_round_with_questions(s_id, round_number, round_starter, category_id,
         cursor.execute("""
             INSERT INTO rounds (s_id, q_id, round_number, category_selector, selected_category, questions, created_at)
             VALUES (%s, %s, %s, %s, %s, %s, %s) RETURNING r_id;
-        """, (s_id, primary_q_id, round_number, round_starter, category_id, json.dumps(questions), datetime.now()))
+        """, (s_id, primary_q_id, round_number, round_starter, category_id, json_param(questions), datetime.now()))
         
         round_id = cursor.fetchone()[0]
         conn.commit()
+        invalidate_game_snapshot(s_id)
         return round_id
+    except errors.UniqueViolation:
+        # Rejected by the unique (s_id, round_number) index
+        conn.rollback()
+        return None
     except Exception as e:
         conn.rollback()
         print(f"Error creating round with questions: {e}")
@@ -49,15 +187,31 @@ def create_round_with_questions(s_id, round_number, round_starter, category_id,
         cursor.close()
         conn.close()
 
-def submit_round_answers(r_id, player1_answer, player2_answer):
+def submit_round_answers(r_id, player_id, answers, score):
+    """Submit player answers for a round identified by its ID (legacy mode).
+
+    "submitted" is False if the player had already answered the round.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        answers = {"player1": player1_answer, "player2": player2_answer}
         cursor.execute("""
-            UPDATE rounds SET players_answers = %s WHERE r_id = %s;
-        """, (json.dumps(answers), r_id))
+            INSERT INTO round_answers (r_id, u_id, answers, score)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (r_id, u_id) DO NOTHING;
+        """, (r_id, player_id, json_param(answers), score))
+        submitted = cursor.rowcount == 1
+        
+        cursor.execute("""
+            SELECT r.s_id, (SELECT COUNT(*) FROM round_answers ra WHERE ra.r_id = r.r_id)
+            FROM rounds r WHERE r.r_id = %s;
+        """, (r_id,))
+        s_id, answer_count = cursor.fetchone()
         conn.commit()
+        if submitted:
+            invalidate_game_snapshot(s_id)
+        
+        return {"submitted": submitted, "round_complete": answer_count >= 2}
     except Exception as e:
         conn.rollback()
         raise e
@@ -66,42 +220,34 @@ def submit_round_answers(r_id, player1_answer, player2_answer):
         conn.close()
 
 def submit_player_quiz_answers(s_id, round_number, player_id, answers, score):
-    """Submit player answers for a quiz round"""
+    """Submit player answers for a quiz round.
+
+    Each player's submission is its own row, so concurrent submits never
+    overwrite each other. Returns False if the player already answered.
+    """
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # First, get the round ID and existing answers
         cursor.execute("""
-            SELECT r_id, players_answers FROM rounds 
-            WHERE s_id = %s AND round_number = %s;
-        """, (s_id, round_number))
-        result = cursor.fetchone()
-        
-        if not result:
-            raise Exception(f"Round {round_number} not found for game {s_id}")
+            INSERT INTO round_answers (r_id, u_id, answers, score)
+            SELECT r_id, %s, %s, %s FROM rounds
+            WHERE s_id = %s AND round_number = %s
+            ON CONFLICT (r_id, u_id) DO NOTHING
+            RETURNING r_id;
+        """, (player_id, json_param(answers), score, s_id, round_number))
+        inserted = cursor.fetchone() is not None
+        
+        if not inserted:
+            cursor.execute("""
+                SELECT 1 FROM rounds WHERE s_id = %s AND round_number = %s;
+            """, (s_id, round_number))
+            if cursor.fetchone() is None:
+                raise Exception(f"Round {round_number} not found for game {s_id}")
         
-        round_id = result[0]
-        existing_answers = result[1]
-        
-        # Get existing players_answers or create new structure
-        players_answers = {}
-        if existing_answers:
-            players_answers = json.loads(existing_answers) if isinstance(existing_answers, str) else existing_answers
-        
-        # Add this player's answers
-        players_answers[str(player_id)] = {
-            'answers': answers,
-            'score': score,
-            'submitted_at': datetime.now().isoformat()
-        }
-        
-        # Update the round with new answers
-        cursor.execute("""
-            UPDATE rounds SET players_answers = %s WHERE r_id = %s;
-        """, (json.dumps(players_answers), round_id))
         conn.commit()
-        
-        return True
+        if inserted:
+            invalidate_game_snapshot(s_id)
+        return inserted
         
     except Exception as e:
         conn.rollback()
@@ -116,30 +262,13 @@ def is_round_complete(s_id, round_number):
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Get the round's players_answers and game players
         cursor.execute("""
-            SELECT r.players_answers, gs.player1, gs.player2
-            FROM rounds r
-            JOIN game_sessions gs ON r.s_id = gs.s_id
+            SELECT COUNT(*)
+            FROM round_answers ra
+            JOIN rounds r ON ra.r_id = r.r_id
             WHERE r.s_id = %s AND r.round_number = %s;
         """, (s_id, round_number))
-        result = cursor.fetchone()
-        
-        if not result or not result[0]:
-            return False
-        
-        players_answers_data = result[0]
-        player1 = result[1]
-        player2 = result[2]
-        
-        # Handle both string and dict formats
-        if isinstance(players_answers_data, str):
-            players_answers = json.loads(players_answers_data)
-        else:
-            players_answers = players_answers_data
-        
-        # Check if we have answers from both players
-        return str(player1) in players_answers and str(player2) in players_answers
+        return cursor.fetchone()[0] >= 2
         
     except Exception as e:
         print(f"Error checking round completion: {e}")
@@ -152,7 +281,7 @@ def get_game_rounds(s_id):
     conn = get_db_connection()
     cursor = conn.cursor()
     cursor.execute("""
-        SELECT r.r_id, r.round_number, r.players_answers, q.q_text, q.option_a, 
+        SELECT r.r_id, r.round_number, """ + PLAYERS_ANSWERS_SQL + """, q.q_text, q.option_a, 
                q.option_b, q.option_c, q.option_d, q.correct_answer, c.category_name
         FROM rounds r
         JOIN questions q ON r.q_id = q.q_id
@@ -176,55 +305,6 @@ def get_game_rounds(s_id):
         for row in rows
     ]
 
-def get_rounds_by_game_session(s_id):
-    """Get all rounds for a specific game session (quiz mode)"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT r_id, s_id, round_number, category_selector, selected_category, 
-                   questions, players_answers, created_at
-            FROM rounds 
-            WHERE s_id = %s 
-            ORDER BY round_number;
-        """, (s_id,))
-        rows = cursor.fetchall()
-        
-        rounds = []
-        for row in rows:
-            # Handle both string and dict formats for JSON fields
-            questions_data = row[5]
-            if isinstance(questions_data, str):
-                questions = json.loads(questions_data) if questions_data else []
-            else:
-                questions = questions_data or []
-            
-            answers_data = row[6]
-            if isinstance(answers_data, str):
-                players_answers = json.loads(answers_data) if answers_data else {}
-            else:
-                players_answers = answers_data or {}
-            
-            round_data = {
-                'r_id': row[0],
-                's_id': row[1],
-                'round_number': row[2],
-                'round_starter': row[3],
-                'category_id': row[4],
-                'questions': questions,
-                'players_answers': players_answers,
-                'created_at': row[7]
-            }
-            rounds.append(round_data)
-        
-        return rounds
-    except Exception as e:
-        print(f"Error getting rounds by game session: {e}")
-        return []
-    finally:
-        cursor.close()
-        conn.close()
-
 def get_round_count(s_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -239,62 +319,15 @@ def get_round_count(s_id):
         cursor.close()
         conn.close()
 
-def get_current_round(s_id):
-    """Get current round information"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT r_id, s_id, round_number, category_selector, selected_category, 
-                   questions, players_answers, created_at
-            FROM rounds 
-            WHERE s_id = %s 
-            ORDER BY round_number DESC 
-            LIMIT 1;
-        """, (s_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return None
-        
-        # Handle JSON fields
-        questions_data = result[5]
-        if isinstance(questions_data, str):
-            questions = json.loads(questions_data) if questions_data else []
-        else:
-            questions = questions_data or []
-        
-        answers_data = result[6]
-        if isinstance(answers_data, str):
-            players_answers = json.loads(answers_data) if answers_data else {}
-        else:
-            players_answers = answers_data or {}
-        
-        return {
-            'r_id': result[0],
-            's_id': result[1],
-            'round_number': result[2],
-            'round_starter': result[3],
-            'category_id': result[4],
-            'questions': questions,
-            'players_answers': players_answers,
-            'created_at': result[7]
-        }
-        
-    except Exception as e:
-        print(f"Error getting current round: {e}")
-        return None
-    finally:
-        cursor.close()
-        conn.close()
-
 def get_round_status(s_id, round_number):
     """Get status of a specific round"""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
         cursor.execute("""
-            SELECT r.players_answers, gs.player1, gs.player2
+            SELECT EXISTS (SELECT 1 FROM round_answers WHERE r_id = r.r_id AND u_id = gs.player1),
+                   EXISTS (SELECT 1 FROM round_answers WHERE r_id = r.r_id AND u_id = gs.player2),
+                   """ + PLAYERS_ANSWERS_SQL + """
             FROM rounds r
             JOIN game_sessions gs ON r.s_id = gs.s_id
             WHERE r.s_id = %s AND r.round_number = %s;
@@ -304,22 +337,15 @@ def get_round_status(s_id, round_number):
         if not result:
             return None
         
-        players_answers_data = result[0]
-        player1 = result[1]
-        player2 = result[2]
-        
-        # Handle JSON data
-        if isinstance(players_answers_data, str):
-            players_answers = json.loads(players_answers_data) if players_answers_data else {}
-        else:
-            players_answers = players_answers_data or {}
+        player1_answered = result[0]
+        player2_answered = result[1]
         
         return {
             'round_number': round_number,
-            'player1_answered': str(player1) in players_answers,
-            'player2_answered': str(player2) in players_answers,
-            'round_complete': str(player1) in players_answers and str(player2) in players_answers,
-            'players_answers': players_answers
+            'player1_answered': player1_answered,
+            'player2_answered': player2_answered,
+            'round_complete': player1_answered and player2_answered,
+            'players_answers': result[2] or {}
         }
         
     except Exception as e:
@@ -329,77 +355,6 @@ def get_round_status(s_id, round_number):
         cursor.close()
         conn.close()
 
-def get_round_by_id(r_id):
-    """Get round information by round ID"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT r_id, s_id, round_number, category_selector, selected_category, 
-                   questions, players_answers, created_at
-            FROM rounds 
-            WHERE r_id = %s;
-        """, (r_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return None
-        
-        # Handle JSON fields
-        questions_data = result[5]
-        if isinstance(questions_data, str):
-            questions = json.loads(questions_data) if questions_data else []
-        else:
-            questions = questions_data or []
-        
-        answers_data = result[6]
-        if isinstance(answers_data, str):
-            players_answers = json.loads(answers_data) if answers_data else {}
-        else:
-            players_answers = answers_data or {}
-        
-        return {
-            'r_id': result[0],
-            's_id': result[1],
-            'round_number': result[2],
-            'round_starter': result[3],
-            'category_id': result[4],
-            'questions': questions,
-            'players_answers': players_answers,
-            'created_at': result[7]
-        }
-        
-    except Exception as e:
-        print(f"Error getting round by ID: {e}")
-        return None
-    finally:
-        cursor.close()
-        conn.close()
-
-def get_round_questions(r_id):
-    """Get questions for a specific round"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("SELECT questions FROM rounds WHERE r_id = %s;", (r_id,))
-        result = cursor.fetchone()
-        
-        if not result or not result[0]:
-            return []
-        
-        questions_data = result[0]
-        if isinstance(questions_data, str):
-            return json.loads(questions_data)
-        else:
-            return questions_data or []
-        
-    except Exception as e:
-        print(f"Error getting round questions: {e}")
-        return []
-    finally:
-        cursor.close()
-        conn.close()
-
 def get_next_category_selector(s_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -429,110 +384,20 @@ def get_next_category_selector(s_id):
         conn.close()
 
 
-def get_current_round_for_quiz(s_id):
-    """Get current round information for answering existing questions"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-            SELECT r_id, s_id, round_number, category_selector, selected_category, 
-                   questions, players_answers, created_at
-            FROM rounds 
-            WHERE s_id = %s 
-            ORDER BY round_number DESC 
-            LIMIT 1;
-        """, (s_id,))
-        result = cursor.fetchone()
-        
-        if not result:
-            return None
-        
-        # Handle JSON fields
-        questions_data = result[5]
-        if isinstance(questions_data, str):
-            questions = json.loads(questions_data) if questions_data else []
-        else:
-            questions = questions_data or []
-        
-        answers_data = result[6]
-        if isinstance(answers_data, str):
-            players_answers = json.loads(answers_data) if answers_data else {}
-        else:
-            players_answers = answers_data or {}
-        
-        return {
-            'r_id': result[0],
-            's_id': result[1],
-            'round_number': result[2],
-            'round_starter': result[3],
-            'category_id': result[4],
-            'questions': questions,
-            'players_answers': players_answers,
-            'created_at': result[7]
-        }
-        
-    except Exception as e:
-        print(f"Error getting current round for quiz: {e}")
-        return None
-    finally:
-        cursor.close()
-        conn.close()
-
-
 def is_game_complete(s_id):
     """Check if all 5 rounds have answers from both players"""
     conn = get_db_connection()
     cursor = conn.cursor()
     try:
-        # Get game players and all rounds
         cursor.execute("""
-            SELECT gs.player1, gs.player2
-            FROM game_sessions gs
-            WHERE gs.s_id = %s;
+            SELECT COUNT(*)
+            FROM round_answers ra
+            JOIN rounds r ON ra.r_id = r.r_id
+            WHERE r.s_id = %s AND r.round_number <= 5;
         """, (s_id,))
-        game_result = cursor.fetchone()
-        
-        if not game_result:
-            return False
-        
-        player1_id = game_result[0]
-        player2_id = game_result[1]
-        
-        # Get all rounds for this game
-        cursor.execute("""
-            SELECT r.players_answers
-            FROM rounds r
-            WHERE r.s_id = %s
-            ORDER BY r.round_number ASC
-            LIMIT 5;
-        """, (s_id,))
-        rounds_data = cursor.fetchall()
-        
-        if len(rounds_data) < 5:
-            return False
-        
-        # Check if all 5 rounds have answers from both players
-        completed_rounds = 0
-        for round_data in rounds_data:
-            players_answers_data = round_data[0]
-            
-            if not players_answers_data:
-                continue
-            
-            # Handle JSON data
-            if isinstance(players_answers_data, str):
-                players_answers = json.loads(players_answers_data)
-            else:
-                players_answers = players_answers_data
-            
-            # Check if both players have answered
-            player1_has_answered = str(player1_id) in players_answers
-            player2_has_answered = str(player2_id) in players_answers
-            
-            if player1_has_answered and player2_has_answered:
-                completed_rounds += 1
         
-        return completed_rounds == 5
+        # 5 rounds x 2 players
+        return cursor.fetchone()[0] >= 10
         
     except Exception as e:
         print(f"Error checking if game is complete: {e}")
@@ -22,10 +22,22 @@ def get_user_stats(user_id):
         }
     return None
 
+def get_user_xp(user_id):
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT xp FROM user_stats WHERE u_id = %s;", (user_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    return row[0] if row else 0
+
 def get_leaderboard_overall():
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM leaderboard_overall;")
+    cursor.execute("""
+        SELECT user_name, xp, win_count, game_count, win_ratio
+        FROM leaderboard_overall_mv ORDER BY xp DESC LIMIT 10;
+    """)
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
@@ -37,7 +49,10 @@ def get_leaderboard_overall():
 def get_leaderboard_weekly():
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM leaderboard_weekly;")
+    cursor.execute("""
+        SELECT user_name, xp, win_count, game_count
+        FROM leaderboard_weekly_mv ORDER BY xp DESC LIMIT 10;
+    """)
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
@@ -49,11 +64,39 @@ def get_leaderboard_weekly():
 def get_leaderboard_monthly():
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM leaderboard_monthly;")
+    cursor.execute("""
+        SELECT user_name, xp, win_count, game_count
+        FROM leaderboard_monthly_mv ORDER BY xp DESC LIMIT 10;
+    """)
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
     return [
         {"user_name": row[0], "xp": row[1], "win_count": row[2], "game_count": row[3]}
         for row in rows
-    ]
\ No newline at end of file
+    ]
+
+def refresh_leaderboards():
+    """Rebuild the materialized leaderboards without blocking readers.
+
+    An advisory lock keeps concurrent workers from refreshing at the same
+    time; returns False if another refresh was already running.
+    """
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT pg_try_advisory_xact_lock(hashtext('refresh_leaderboards'));")
+        if not cursor.fetchone()[0]:
+            conn.rollback()
+            return False
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_overall_mv;")
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_weekly_mv;")
+        cursor.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY leaderboard_monthly_mv;")
+        conn.commit()
+        return True
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        cursor.close()
+        conn.close()
\ No newline at end of file
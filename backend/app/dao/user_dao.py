@@ -1,10 +1,20 @@
 # app/dao/user_dao.py
-from app.db import get_db_connection
+from app.db import get_db_connection, after_commit, stream_query
+from app.utils.cache import cache, cached
 
-def get_all_users():
+USER_EXPORT_COLUMNS = ("u_id", "user_name", "email", "signup_date")
+
+def get_all_users(limit=None, after_id=None):
+    """Users in u_id order; one page of limit rows after after_id, plus
+    one extra row to tell whether another page follows"""
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT u_id, user_name, email FROM users;")
+    cursor.execute("""
+        SELECT u_id, user_name, email FROM users
+        WHERE %s IS NULL OR u_id > %s
+        ORDER BY u_id
+        LIMIT %s;
+    """, (after_id, after_id, limit + 1 if limit else None))
     rows = cursor.fetchall()
     cursor.close()
     conn.close()
@@ -13,6 +23,13 @@ def get_all_users():
         for row in rows
     ]
 
+def iter_users(batch_size=2000):
+    """Stream every user with a server-side cursor"""
+    return stream_query("user_export", """
+        SELECT u_id, user_name, email, signup_date FROM users ORDER BY u_id;
+    """, (), batch_size)
+
+@cached("users")
 def get_user_by_id(user_id):
     conn = get_db_connection()
     cursor = conn.cursor()
@@ -27,12 +44,12 @@ def get_user_by_id(user_id):
 def get_user_by_username(username):
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("SELECT u_id, user_name, email, password FROM users WHERE user_name = %s;", (username,))
+    cursor.execute("SELECT u_id, user_name, email, password, token_epoch FROM users WHERE user_name = %s;", (username,))
     row = cursor.fetchone()
     cursor.close()
     conn.close()
     if row:
-        return {"u_id": row[0], "user_name": row[1], "email": row[2], "password": row[3]}
+        return {"u_id": row[0], "user_name": row[1], "email": row[2], "password": row[3], "token_epoch": row[4]}
     return None
 
 def create_user(username, email, hashed_password):
@@ -52,6 +69,8 @@ def create_user(username, email, hashed_password):
         )
         
         conn.commit()
+        # Drop any cached "not found" for the new id
+        after_commit(lambda: cache.invalidate("users", user_id))
         return user_id
     except Exception as e:
         conn.rollback()
@@ -60,6 +79,25 @@ def create_user(username, email, hashed_password):
         cursor.close()
         conn.close()
 
+@cached("auth_state")
+def get_auth_state(user_id):
+    """Ban flag and token epoch used to revoke issued tokens"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT u.token_epoch, b.u_id IS NOT NULL
+        FROM users u
+        LEFT JOIN banned_users b ON b.u_id = u.u_id
+        WHERE u.u_id = %s;
+    """, (user_id,))
+    row = cursor.fetchone()
+    cursor.close()
+    conn.close()
+    if row:
+        return {"token_epoch": row[0], "banned": row[1]}
+    return None
+
+@cached("user_banned")
 def check_user_banned(user_id):
     conn = get_db_connection()
     cursor = conn.cursor()
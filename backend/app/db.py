@@ -1,12 +1,443 @@
+import os
+import threading
+import time
+from functools import wraps
+
 import psycopg2
-from flask import current_app
+import psycopg2.extensions
+from flask import current_app, g, has_request_context, jsonify, request
 
-def get_db_connection():
-    conn = psycopg2.connect(
-        host=current_app.config["DB_HOST"],
-        port=current_app.config["DB_PORT"],
-        dbname=current_app.config["DB_NAME"],
-        user=current_app.config["DB_USER"],
-        password=current_app.config["DB_PASSWORD"]
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection frees up before the checkout timeout"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections.
+
+    Connections are opened lazily up to ``max_size``. Callers that find the
+    pool exhausted wait up to ``timeout`` seconds for a connection to be
+    returned. Idle connections are health-checked on checkout, and the pool
+    resets itself in a forked child so workers never share sockets.
+    """
+
+    def __init__(self, connect_kwargs, max_size=10, timeout=5.0,
+                 health_check_interval=30.0, max_lifetime=3600.0):
+        self.connect_kwargs = connect_kwargs
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+
+        # Hooks receive the raw psycopg2 connection; on_acquire hooks also
+        # receive the seconds getconn took, waiting and connecting included
+        self.on_connect = []
+        self.on_checkout = []
+        self.on_return = []
+        self.on_acquire = []
+
+        self._cond = threading.Condition()
+        self._reset_state()
+
+    def _reset_state(self):
+        self._pid = os.getpid()
+        self._idle = []  # (conn, created_at, returned_at)
+        self._created_at = {}
+        self._size = 0
+        self._in_use = 0
+        self._waiters = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _check_pid(self):
+        # Connections inherited from the parent process must not be used or
+        # closed here: closing would terminate the parent's session.
+        if self._pid != os.getpid():
+            with self._cond:
+                if self._pid != os.getpid():
+                    self._reset_state()
+
+    def after_fork(self):
+        """Drop connections inherited from the parent; call in each new worker"""
+        self._check_pid()
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        try:
+            for hook in self.on_connect:
+                hook(conn)
+        except Exception:
+            self._close_quietly(conn)
+            raise
+        return conn
+
+    def _is_healthy(self, conn, created_at, returned_at):
+        if conn.closed:
+            return False
+        now = time.monotonic()
+        if self.max_lifetime and now - created_at > self.max_lifetime:
+            return False
+        if now - returned_at < self.health_check_interval:
+            return True
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1;")
+            cursor.close()
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _close_quietly(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def getconn(self):
+        self._check_pid()
+        start = time.monotonic()
+        deadline = start + self.timeout
+        idle_entry = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    idle_entry = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"No database connection available within {self.timeout}s"
+                    )
+                self._waiters += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiters -= 1
+            self._in_use += 1
+
+        # Connecting and pinging happen outside the lock
+        try:
+            conn = None
+            if idle_entry is not None:
+                conn, created_at, returned_at = idle_entry
+                if not self._is_healthy(conn, created_at, returned_at):
+                    self._close_quietly(conn)
+                    with self._cond:
+                        self._created_at.pop(id(conn), None)
+                        self._discarded += 1
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+                with self._cond:
+                    self._created_at[id(conn)] = time.monotonic()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        try:
+            for hook in self.on_checkout:
+                hook(conn)
+            waited = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            for hook in self.on_acquire:
+                hook(conn, waited)
+        except Exception:
+            # Close the connection and free its slot rather than leak both
+            self.putconn(conn, discard=True)
+            raise
+        return conn
+
+    def putconn(self, conn, discard=False):
+        if self._pid != os.getpid():
+            return
+
+        for hook in self.on_return:
+            try:
+                hook(conn)
+            except Exception:
+                discard = True
+
+        if not discard and not conn.closed:
+            # Never hand out a connection with a half-finished transaction
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                discard = True
+            elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed:
+                self._size -= 1
+                self._discarded += 1
+                self._created_at.pop(id(conn), None)
+            else:
+                created_at = self._created_at.get(id(conn), time.monotonic())
+                self._idle.append((conn, created_at, time.monotonic()))
+                conn = None
+            self._cond.notify()
+
+        if conn is not None:
+            self._close_quietly(conn)
+
+    def closeall(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _, _ in idle:
+            self._close_quietly(conn)
+            self._created_at.pop(id(conn), None)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "open": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiters": self._waiters,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_time_total_ms": round(self._wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+                "wait_time_avg_ms": round(
+                    self._wait_time_total * 1000 / self._checkouts, 3
+                ) if self._checkouts else 0.0,
+            }
+
+
+class PooledConnection:
+    """Proxy around a pooled connection; ``close()`` returns it to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get("_conn")
+        if conn is None:
+            raise psycopg2.InterfaceError("connection already returned to pool")
+        return getattr(conn, name)
+
+    @property
+    def closed(self):
+        return self._conn is None or self._conn.closed
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+    def __del__(self):
+        # Safety net for DAO paths that raise before reaching close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class UnitOfWork:
+    """One connection and one transaction shared by every DAO call in a request.
+
+    DAO functions keep calling ``get_db_connection()``; while a unit of work
+    is bound to ``g`` they receive a ``RequestConnection`` whose ``commit()``
+    and ``close()`` are deferred to the end of the request.
+    """
+
+    def __init__(self, pool):
+        self._pool = pool
+        self._conn = None
+        self._after_commit = []
+        self.rollback_only = False
+
+    def connection(self):
+        if self._conn is None:
+            self._conn = self._pool.getconn()
+        return RequestConnection(self)
+
+    def add_after_commit(self, callback):
+        self._after_commit.append(callback)
+
+    def commit(self):
+        if self._conn is not None:
+            self._conn.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                current_app.logger.exception("after_commit callback failed")
+
+    def rollback(self):
+        self._after_commit = []
+        if self._conn is not None and not self._conn.closed:
+            self._conn.rollback()
+
+    def close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            self._pool.putconn(conn)
+
+
+class RequestConnection:
+    """Connection handed to DAOs inside a unit of work"""
+
+    def __init__(self, unit_of_work):
+        self._uow = unit_of_work
+
+    def __getattr__(self, name):
+        return getattr(self._uow._conn, name)
+
+    def commit(self):
+        # Committed once by the unit of work when the request finishes
+        pass
+
+    def rollback(self):
+        # A DAO gave up: nothing from this request may be committed
+        self._uow.rollback_only = True
+        self._uow.rollback()
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Like psycopg2's `with conn:`, an exception undoes the transaction;
+        # otherwise the commit stays deferred to the unit of work
+        if exc_type is not None:
+            self.rollback()
+
+
+def transactional(f):
+    """Run a view on one pooled connection inside a single transaction.
+
+    The transaction commits when the view returns a non-5xx response and
+    rolls back otherwise. If a DAO rolled back part way through and the view
+    still reports success, its response is replaced by a 500 so no client is
+    told that discarded writes were saved. Nested use joins the outer unit
+    of work.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if g.get("unit_of_work") is not None:
+            return f(*args, **kwargs)
+
+        uow = UnitOfWork(get_db_pool())
+        g.unit_of_work = uow
+        try:
+            response = current_app.make_response(f(*args, **kwargs))
+            if uow.rollback_only and response.status_code < 400:
+                current_app.logger.error(
+                    "%s %s rolled back by a failed DAO call; replacing its %s response with 500",
+                    request.method, request.path, response.status_code
+                )
+                uow.rollback()
+                return current_app.make_response(
+                    (jsonify({"error": "The request could not be completed"}), 500)
+                )
+            if response.status_code >= 500 or uow.rollback_only:
+                uow.rollback()
+            else:
+                uow.commit()
+            return response
+        except Exception:
+            uow.rollback()
+            raise
+        finally:
+            g.unit_of_work = None
+            uow.close()
+
+    return decorated
+
+
+def init_db(app):
+    """Create the application's connection pool from its config"""
+    pool = ConnectionPool(
+        connect_kwargs={
+            "host": app.config["DB_HOST"],
+            "port": app.config["DB_PORT"],
+            "dbname": app.config["DB_NAME"],
+            "user": app.config["DB_USER"],
+            "password": app.config["DB_PASSWORD"],
+        },
+        max_size=app.config["DB_POOL_MAX_SIZE"],
+        timeout=app.config["DB_POOL_TIMEOUT"],
+        health_check_interval=app.config["DB_POOL_HEALTH_CHECK_INTERVAL"],
+        max_lifetime=app.config["DB_POOL_MAX_LIFETIME"],
     )
-    return conn
+    app.extensions["db_pool"] = pool
+    return pool
+
+
+def get_db_pool():
+    return current_app.extensions["db_pool"]
+
+
+def get_pool_stats():
+    return get_db_pool().stats()
+
+
+def after_commit(callback):
+    """Run callback once the request's transaction commits, or right away
+    when no unit of work is active"""
+    uow = g.get("unit_of_work") if has_request_context() else None
+    if uow is None:
+        callback()
+    else:
+        uow.add_after_commit(callback)
+
+
+def stream_query(name, sql, params=(), batch_size=2000):
+    """Yield the rows of sql through a server-side cursor, batch_size at a time.
+
+    Uses its own pooled connection, held until the generator is exhausted
+    or closed, so memory stays flat regardless of the result size.
+    """
+    pool = get_db_pool()
+    conn = pool.getconn()
+    cursor = conn.cursor(name=name)
+    cursor.itersize = batch_size
+    try:
+        cursor.execute(sql, params)
+        for row in cursor:
+            yield row
+    finally:
+        cursor.close()
+        # Returning the connection rolls back the read-only transaction
+        pool.putconn(conn)
+
+
+def get_db_connection():
+    if has_request_context():
+        uow = g.get("unit_of_work")
+        if uow is not None:
+            return uow.connection()
+    pool = get_db_pool()
+    return PooledConnection(pool, pool.getconn())
@@ -0,0 +1,2 @@
+# app/services/__init__.py
+# In-process engines shared by controllers and DAOs
\ No newline at end of file
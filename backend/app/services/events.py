@@ -0,0 +1,206 @@
+# app/services/events.py
+import asyncio
+import queue
+import select
+import threading
+from collections import defaultdict
+
+import psycopg2
+import psycopg2.extensions
+from flask import current_app
+
+from app.db import after_commit, get_db_connection
+from app.utils.json_provider import dumps, loads
+
+CHANNEL = "game_events"
+
+
+class Subscription:
+    """One client's queue of events for a game session"""
+
+    def __init__(self, broker, s_id, max_pending):
+        self.broker = broker
+        self.s_id = s_id
+        self.queue = queue.Queue(maxsize=max_pending)
+
+    def get(self, timeout):
+        """Next (event, data) pair, or None if nothing arrived in time"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except queue.Full:
+            # A stalled client loses events rather than blocking publishers
+            pass
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class AsyncSubscription(Subscription):
+    """Subscription read from an event loop; publishers on other threads
+    hand their events to the loop"""
+
+    def __init__(self, broker, s_id, max_pending, loop):
+        self.broker = broker
+        self.s_id = s_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=max_pending)
+
+    async def get(self, timeout):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            pass  # the loop has shut down
+
+    def _put(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+
+class EventBroker:
+    """In-process pub/sub keyed by game session id"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, s_id, max_pending=100, loop=None):
+        if loop is None:
+            subscription = Subscription(self, s_id, max_pending)
+        else:
+            subscription = AsyncSubscription(self, s_id, max_pending, loop)
+        with self._lock:
+            self._subscribers[s_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.s_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.s_id]
+
+    def dispatch(self, s_id, event, data):
+        with self._lock:
+            subscribers = list(self._subscribers.get(s_id, ()))
+        for subscription in subscribers:
+            subscription.deliver((event, data))
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+
+class PostgresListener:
+    """Relays NOTIFY game_events messages from every process to the local broker.
+
+    Uses its own connection outside the pool, since it sits in LISTEN for
+    the lifetime of the process.
+    """
+
+    def __init__(self, app, broker, connect_kwargs):
+        self.app = app
+        self.broker = broker
+        self.connect_kwargs = connect_kwargs
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(**self.connect_kwargs)
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                cursor = conn.cursor()
+                cursor.execute(f"LISTEN {CHANNEL};")
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        message = loads(notify.payload)
+                        self.broker.dispatch(message["s_id"], message["event"], message["data"])
+            except Exception:
+                self.app.logger.exception("Game event listener failed; reconnecting")
+                if conn is not None:
+                    conn.close()
+                threading.Event().wait(1)
+
+
+_broker = EventBroker()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _use_postgres():
+    return current_app.config["EVENTS_BACKEND"] == "postgres"
+
+
+def publish(s_id, event, data=None):
+    """Announce a game event once the current transaction commits.
+
+    With the postgres backend the NOTIFY joins the request's transaction,
+    so Postgres itself delivers it on commit to every worker process.
+    """
+    data = data or {}
+    if _use_postgres():
+        payload = dumps({"s_id": s_id, "event": event, "data": data})
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT pg_notify(%s, %s);", (CHANNEL, payload))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+    else:
+        after_commit(lambda: _broker.dispatch(s_id, event, data))
+
+
+def subscribe(s_id, loop=None):
+    """Subscribe to a game's events; pass the running event loop to read
+    them with await from an async handler"""
+    global _listener
+    if _use_postgres():
+        if _listener is None:
+            with _listener_lock:
+                if _listener is None:
+                    config = current_app.config
+                    _listener = PostgresListener(current_app._get_current_object(), _broker, {
+                        "host": config["DB_HOST"], "port": config["DB_PORT"], "dbname": config["DB_NAME"],
+                        "user": config["DB_USER"], "password": config["DB_PASSWORD"],
+                    })
+        _listener.ensure_started()
+    return _broker.subscribe(s_id, current_app.config["EVENTS_MAX_PENDING"], loop)
+
+
+def format_event(event, data):
+    """One server-sent events frame"""
+    return f"event: {event}\ndata: {dumps(data)}\n\n"
+
+
+def subscriber_count():
+    return _broker.subscriber_count()
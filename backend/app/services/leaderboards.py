@@ -0,0 +1,97 @@
+# app/services/leaderboards.py
+import hashlib
+import json
+import threading
+import time
+
+from flask import current_app
+
+from app.dao import stats_dao
+
+_LOADERS = {
+    "overall": stats_dao.get_leaderboard_overall,
+    "weekly": stats_dao.get_leaderboard_weekly,
+    "monthly": stats_dao.get_leaderboard_monthly,
+}
+
+
+def _compute_etag(rows):
+    payload = json.dumps(rows, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()
+
+
+class LeaderboardCache:
+    """Leaderboards served from memory with bounded staleness.
+
+    Rows read from the materialized views are kept for
+    ``LEADERBOARD_CACHE_TTL`` seconds. Ending a game or banning a player
+    schedules a background ``REFRESH ... CONCURRENTLY`` of the views, at
+    most once per ``LEADERBOARD_REFRESH_INTERVAL``; views older than
+    ``LEADERBOARD_MAX_STALENESS`` are refreshed too, so the weekly and
+    monthly windows keep moving on a quiet server.
+    """
+
+    def __init__(self):
+        self._entries = {}  # board -> (rows, etag, loaded_at)
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._pending = False
+        self._last_refresh = 0.0
+
+    def get(self, board):
+        config = current_app.config
+        now = time.monotonic()
+        if now - self._last_refresh > config["LEADERBOARD_MAX_STALENESS"]:
+            self.request_refresh()
+
+        entry = self._entries.get(board)
+        if entry is not None and now - entry[2] < config["LEADERBOARD_CACHE_TTL"]:
+            return entry[0], entry[1]
+
+        rows = _LOADERS[board]()
+        etag = _compute_etag(rows)
+        self._entries[board] = (rows, etag, now)
+        return rows, etag
+
+    def request_refresh(self):
+        app = current_app._get_current_object()
+        with self._lock:
+            if self._refreshing:
+                # The running refresher will go round once more
+                self._pending = True
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_loop, args=(app,), daemon=True).start()
+
+    def _refresh_loop(self, app):
+        with app.app_context():
+            while True:
+                wait = self._last_refresh + app.config["LEADERBOARD_REFRESH_INTERVAL"] - time.monotonic()
+                if wait > 0:
+                    time.sleep(wait)
+                with self._lock:
+                    self._pending = False
+
+                try:
+                    stats_dao.refresh_leaderboards()
+                except Exception:
+                    app.logger.exception("Leaderboard refresh failed")
+                self._last_refresh = time.monotonic()
+                self._entries.clear()
+
+                with self._lock:
+                    if not self._pending:
+                        self._refreshing = False
+                        return
+
+
+_cache = LeaderboardCache()
+
+
+def get_leaderboard(board):
+    """Return (rows, etag) for the "overall", "weekly" or "monthly" board"""
+    return _cache.get(board)
+
+
+def request_refresh():
+    _cache.request_refresh()
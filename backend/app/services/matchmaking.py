@@ -0,0 +1,221 @@
+# app/services/matchmaking.py
+import random
+import threading
+import time
+
+from flask import current_app
+
+from app.dao import game_session_dao, stats_dao, user_dao
+from app.utils import metrics
+
+
+class PlayerBucket:
+    """Player ids of one XP bucket with O(1) add, remove and pick"""
+
+    __slots__ = ("ids", "positions")
+
+    def __init__(self):
+        self.ids = []
+        self.positions = {}
+
+    def add(self, user_id):
+        if user_id not in self.positions:
+            self.positions[user_id] = len(self.ids)
+            self.ids.append(user_id)
+
+    def remove(self, user_id):
+        pos = self.positions.pop(user_id, None)
+        if pos is None:
+            return
+        last = self.ids.pop()
+        if pos < len(self.ids):
+            # Move the last id into the freed slot
+            self.ids[pos] = last
+            self.positions[last] = pos
+
+    def sample(self, k):
+        """Up to k distinct random ids"""
+        if len(self.ids) <= k:
+            return random.sample(self.ids, len(self.ids))
+        return list({self.ids[random.randrange(len(self.ids))] for _ in range(k)})
+
+
+class Matchmaker:
+    """Queue of recently active players that random games are paired from.
+
+    Players join when they log in, start a game or submit answers, and drop
+    out after ``MATCHMAKING_ACTIVE_TTL`` seconds without activity. With
+    ``MATCHMAKING_XP_BUCKET`` set, players are grouped by XP and opponents
+    are searched in the nearest buckets first. Candidates that are banned
+    or already at ``MATCHMAKING_MAX_ACTIVE_GAMES`` are skipped. The queue
+    is per process; when it has no eligible opponent the database is used.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._players = {}  # user_id -> [bucket, queued_at, last_seen]
+        self._lock = threading.Lock()
+        self._matches = 0
+        self._fallback_matches = 0
+        self._no_opponent = 0
+        self._skipped = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def _config(self, name):
+        return current_app.config[name]
+
+    def _bucket_for(self, xp):
+        size = self._config("MATCHMAKING_XP_BUCKET")
+        return xp // size if size > 0 else 0
+
+    def mark_active(self, user_id, xp=None):
+        if xp is None:
+            xp = stats_dao.get_user_xp(user_id)
+        bucket = self._bucket_for(xp)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._players.get(user_id)
+            if entry is None:
+                self._players[user_id] = [bucket, now, now]
+            else:
+                if entry[0] != bucket:
+                    old_bucket = self._buckets.get(entry[0])
+                    if old_bucket is not None:
+                        old_bucket.remove(user_id)
+                        if not old_bucket.ids:
+                            del self._buckets[entry[0]]
+                    entry[0] = bucket
+                entry[2] = now
+            self._buckets.setdefault(bucket, PlayerBucket()).add(user_id)
+
+    def touch(self, user_id):
+        """Refresh a queued player's activity time. XP is only read, through
+        mark_active, when the player is not queued or has gone stale"""
+        active_ttl = self._config("MATCHMAKING_ACTIVE_TTL")
+        now = time.monotonic()
+        with self._lock:
+            entry = self._players.get(user_id)
+            if entry is not None and now - entry[2] <= active_ttl:
+                entry[2] = now
+                return
+        self.mark_active(user_id)
+
+    def remove(self, user_id):
+        with self._lock:
+            self._remove_locked(user_id)
+
+    def _remove_locked(self, user_id):
+        entry = self._players.pop(user_id, None)
+        if entry is not None:
+            bucket = self._buckets.get(entry[0])
+            if bucket is not None:
+                bucket.remove(user_id)
+                if not bucket.ids:
+                    del self._buckets[entry[0]]
+
+    def _is_eligible(self, user_id):
+        return not user_dao.check_user_banned(user_id) and has_capacity(user_id)
+
+    def _candidates(self, user_id, home_bucket):
+        """Random queued players, nearest XP bucket first"""
+        attempts = self._config("MATCHMAKING_MAX_ATTEMPTS")
+        active_ttl = self._config("MATCHMAKING_ACTIVE_TTL")
+        with self._lock:
+            buckets = sorted(self._buckets, key=lambda bucket: abs(bucket - home_bucket))
+        for bucket_key in buckets:
+            with self._lock:
+                bucket = self._buckets.get(bucket_key)
+                picks = bucket.sample(attempts) if bucket is not None else []
+            for candidate in picks:
+                if candidate == user_id:
+                    continue
+                with self._lock:
+                    entry = self._players.get(candidate)
+                    if entry is None:
+                        continue
+                    if time.monotonic() - entry[2] > active_ttl:
+                        # Inactive for too long; leave the queue
+                        self._remove_locked(candidate)
+                        continue
+                yield candidate
+
+    def find_opponent(self, user_id):
+        """Return an opponent id for user_id, or None if nobody is eligible"""
+        xp = stats_dao.get_user_xp(user_id)
+        self.mark_active(user_id, xp)
+
+        for candidate in self._candidates(user_id, self._bucket_for(xp)):
+            if not self._is_eligible(candidate):
+                with self._lock:
+                    self._skipped += 1
+                continue
+            now = time.monotonic()
+            with self._lock:
+                entry = self._players.get(candidate)
+                if entry is None:
+                    continue
+                waited = now - entry[1]
+                # Back of the queue for its next match
+                entry[1] = now
+                self._matches += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            metrics.matchmaking_wait.observe(waited)
+            metrics.matchmaking_matches.inc(("queue",))
+            return candidate
+
+        opponent = game_session_dao.find_random_opponent(
+            user_id, self._config("MATCHMAKING_MAX_ACTIVE_GAMES")
+        )
+        with self._lock:
+            if opponent is None:
+                self._no_opponent += 1
+            else:
+                self._fallback_matches += 1
+        metrics.matchmaking_matches.inc(("none",) if opponent is None else ("database",))
+        return opponent
+
+    def stats(self):
+        with self._lock:
+            return {
+                "queued_players": len(self._players),
+                "buckets": {str(key): len(bucket.ids) for key, bucket in self._buckets.items()},
+                "matches": self._matches,
+                "fallback_matches": self._fallback_matches,
+                "no_opponent": self._no_opponent,
+                "skipped_candidates": self._skipped,
+                "wait_time_avg_ms": round(
+                    self._wait_time_total * 1000 / self._matches, 3
+                ) if self._matches else 0.0,
+                "wait_time_max_ms": round(self._wait_time_max * 1000, 3),
+            }
+
+
+_matchmaker = Matchmaker()
+
+
+def mark_active(user_id, xp=None):
+    _matchmaker.mark_active(user_id, xp)
+
+
+def touch(user_id):
+    _matchmaker.touch(user_id)
+
+
+def remove(user_id):
+    _matchmaker.remove(user_id)
+
+
+def find_opponent(user_id):
+    return _matchmaker.find_opponent(user_id)
+
+
+def has_capacity(user_id):
+    """Whether user_id may start another game under the active-game cap"""
+    max_games = current_app.config["MATCHMAKING_MAX_ACTIVE_GAMES"]
+    return max_games <= 0 or game_session_dao.count_active_games(user_id) < max_games
+
+
+def get_stats():
+    return _matchmaker.stats()
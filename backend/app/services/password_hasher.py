@@ -0,0 +1,170 @@
+# app/services/password_hasher.py
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+
+class HasherBusyError(Exception):
+    """Raised when the hashing queue is full; callers should answer 429"""
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool off the request thread.
+
+    At most ``workers + queue_size`` hashes are admitted at once; further
+    calls fail fast with HasherBusyError instead of piling up, so a login
+    burst cannot starve the gameplay endpoints of CPU.
+    """
+
+    def __init__(self, workers=2, queue_size=32, rounds=12, timeout=10.0, executor="process"):
+        self._executor = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._latency_total = 0.0
+        self._latency_max = 0.0
+        self.configure(workers, queue_size, rounds, timeout, executor)
+
+    def configure(self, workers, queue_size, rounds, timeout, executor):
+        self.shutdown()
+        self.workers = workers
+        self.queue_size = queue_size
+        self.rounds = rounds
+        self.timeout = timeout
+        self.executor_kind = executor
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+
+    def _get_executor(self):
+        # Executors do not survive fork; each worker process builds its own
+        if self._executor is None or self._pid != os.getpid():
+            with self._lock:
+                if self._executor is None or self._pid != os.getpid():
+                    if self.executor_kind == "thread":
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    self._pid = os.getpid()
+        return self._executor
+
+    def _run(self, fn, *args):
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise HasherBusyError("Password hashing queue is full")
+
+        start = time.monotonic()
+        with self._lock:
+            self._in_flight += 1
+
+        def release(_future=None):
+            # The slot is held until the work itself ends, not until the
+            # caller stops waiting, so timed-out hashes still count as load
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BaseException:
+            release()
+            raise
+        future.add_done_callback(release)
+
+        try:
+            result = future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Drops the call if it is still queued; a running hash finishes
+            future.cancel()
+            with self._lock:
+                self._timeouts += 1
+            raise HasherBusyError("Password hashing timed out")
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next call
+            with self._lock:
+                self._executor = None
+                self._failed += 1
+            raise
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+        elapsed = time.monotonic() - start
+        with self._lock:
+            self._completed += 1
+            self._latency_total += elapsed
+            self._latency_max = max(self._latency_max, elapsed)
+        return result
+
+    def hash_password(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check_password(self, password, hashed):
+        return self._run(_check_password, password, hashed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "rounds": self.rounds,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "latency_avg_ms": round(
+                    self._latency_total * 1000 / self._completed, 3
+                ) if self._completed else 0.0,
+                "latency_max_ms": round(self._latency_max * 1000, 3),
+            }
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False)
+        self._executor = None
+
+
+_hasher = PasswordHasher()
+
+
+def init_password_hasher(app):
+    _hasher.configure(
+        workers=app.config["PASSWORD_HASH_WORKERS"],
+        queue_size=app.config["PASSWORD_HASH_QUEUE_SIZE"],
+        rounds=app.config["PASSWORD_HASH_ROUNDS"],
+        timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+        executor=app.config["PASSWORD_HASH_EXECUTOR"],
+    )
+    return _hasher
+
+
+def hash_password(password):
+    return _hasher.hash_password(password)
+
+
+def check_password(password, hashed):
+    return _hasher.check_password(password, hashed)
+
+
+def get_stats():
+    return _hasher.stats()
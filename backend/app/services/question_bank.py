@@ -0,0 +1,138 @@
+# app/services/question_bank.py
+import csv
+
+from flask import current_app
+
+from app.dao import category_dao, question_dao
+from app.db import after_commit
+from app.services import question_sampler
+from app.utils.export import encode_rows
+from app.utils.json_provider import loads
+
+REQUIRED_FIELDS = ("q_text", "option_a", "option_b", "option_c", "option_d", "correct_answer")
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFormatError(Exception):
+    """Raised when an upload is not CSV or JSONL"""
+
+
+def _read_csv(stream):
+    # Decode line by line so the upload is never held in memory as a whole
+    reader = csv.DictReader(line.decode("utf-8-sig") for line in stream)
+    for record in reader:
+        yield reader.line_num, record
+
+
+def _read_jsonl(stream):
+    for line_no, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = loads(line)
+        except ValueError:
+            yield line_no, None
+            continue
+        yield line_no, record if isinstance(record, dict) else None
+
+
+def _category_map():
+    """Category names and ids, resolved once per import"""
+    by_name = {}
+    ids = set()
+    for category in category_dao.get_all_categories():
+        by_name[category["category_name"].strip().lower()] = category["c_id"]
+        ids.add(category["c_id"])
+    return by_name, ids
+
+
+def _validate(record, categories):
+    """Return (row tuple, None) for a valid record, else (None, error message)"""
+    if record is None:
+        return None, "Malformed record"
+
+    values = {field: str(record.get(field) or "").strip() for field in REQUIRED_FIELDS}
+    missing = [field for field, value in values.items() if not value]
+    if missing:
+        return None, "Missing " + ", ".join(missing)
+
+    correct_answer = values["correct_answer"].upper()
+    if correct_answer not in ("A", "B", "C", "D"):
+        return None, "correct_answer must be A, B, C, or D"
+
+    by_name, ids = categories
+    c_id = record.get("c_id")
+    if c_id not in (None, ""):
+        try:
+            c_id = int(c_id)
+        except (TypeError, ValueError):
+            return None, "c_id must be an integer"
+        if c_id not in ids:
+            return None, "Category not found"
+    else:
+        c_id = by_name.get(str(record.get("category_name") or "").strip().lower())
+        if c_id is None:
+            return None, "Category not found"
+
+    difficulty_level = record.get("difficulty_level")
+    if difficulty_level in (None, ""):
+        difficulty_level = None
+    else:
+        try:
+            difficulty_level = int(difficulty_level)
+        except (TypeError, ValueError):
+            return None, "difficulty_level must be an integer"
+
+    author = record.get("author") or "Admin"
+    if author not in ("Admin", "User"):
+        return None, "author must be 'Admin' or 'User'"
+
+    return (
+        values["q_text"], c_id, values["option_a"], values["option_b"], values["option_c"],
+        values["option_d"], correct_answer, difficulty_level, author
+    ), None
+
+
+def import_questions(stream, fmt, confirmed=False):
+    """Validate and load a CSV or JSONL question bank in one streaming pass.
+
+    Valid rows are inserted in batches of ``QUESTION_IMPORT_BATCH_SIZE``;
+    invalid rows are skipped and reported by line number.
+    """
+    if fmt == "csv":
+        records = _read_csv(stream)
+    elif fmt == "jsonl":
+        records = _read_jsonl(stream)
+    else:
+        raise ImportFormatError("format must be csv or jsonl")
+
+    batch_size = current_app.config["QUESTION_IMPORT_BATCH_SIZE"]
+    categories = _category_map()
+    batch = []
+    imported = 0
+    rejected = 0
+    errors = []
+    for line_no, record in records:
+        row, error = _validate(record, categories)
+        if error:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_no, "error": error})
+            continue
+        batch.append(row)
+        if len(batch) >= batch_size:
+            imported += question_dao.bulk_insert_questions(batch, confirmed, batch_size)
+            batch = []
+    imported += question_dao.bulk_insert_questions(batch, confirmed, batch_size)
+
+    if confirmed and imported:
+        # Sampling indexes reload with the new questions on next use
+        after_commit(question_sampler.invalidate)
+
+    return {"imported": imported, "rejected": rejected, "errors": errors}
+
+
+def export_questions(fmt, status=None, c_id=None):
+    """Yield a CSV or JSONL dump of questions chunk by chunk"""
+    return encode_rows(fmt, question_dao.QUESTION_EXPORT_COLUMNS, question_dao.iter_questions(status, c_id))
@@ -0,0 +1,198 @@
+# app/services/question_packs.py
+import threading
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.dao import question_dao, round_dao
+from app.services import question_sampler
+
+QUESTIONS_PER_ROUND = 3
+
+
+class GamePack:
+    """Prefetched questions of one game, keyed by category"""
+
+    __slots__ = ("questions", "used_ids", "last_used")
+
+    def __init__(self):
+        self.questions = {}  # c_id -> [question, ...]
+        self.used_ids = set()
+        self.last_used = time.monotonic()
+
+
+class QuestionPackStore:
+    """Question sets prepared in the background when a game is created.
+
+    Starting a round takes its questions from the game's pack instead of
+    sampling on the request path; one primary-key query confirms they were
+    not deleted since. Questions already used by the game are never handed
+    out again, so rounds in the same category do not repeat. ``take`` only
+    picks questions; the caller hands them to ``consume`` once the round
+    that uses them has committed, so a rejected or rolled back round
+    leaves the pack as it was.
+    Packs are evicted least recently used beyond ``QUESTION_PACK_MAX_GAMES``,
+    after ``QUESTION_PACK_TTL`` idle seconds, and when their game ends.
+    """
+
+    def __init__(self):
+        self._packs = OrderedDict()  # s_id -> GamePack
+        self._lock = threading.Lock()
+        self._executor = None
+        self._popularity = Counter()
+        self._categories = ([], 0.0)  # (c_ids with enough questions, loaded_at)
+        self._hits = 0
+        self._misses = 0
+        self._prefetched = 0
+        self._evicted = 0
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=current_app.config["QUESTION_PACK_WORKERS"],
+                        thread_name_prefix="question-packs",
+                    )
+        return self._executor
+
+    def _candidate_categories(self):
+        """Categories to prefetch, most picked first"""
+        c_ids, loaded_at = self._categories
+        if time.monotonic() - loaded_at > current_app.config["QUESTION_INDEX_TTL"]:
+            c_ids = [
+                row["c_id"] for row in question_dao.get_question_counts_by_category()
+                if row["confirmed_question_count"] >= QUESTIONS_PER_ROUND
+            ]
+            self._categories = (c_ids, time.monotonic())
+        with self._lock:
+            popularity = dict(self._popularity)
+        ranked = sorted(c_ids, key=lambda c_id: -popularity.get(c_id, 0))
+        return ranked[:current_app.config["QUESTION_PACK_CATEGORIES"]]
+
+    def prefetch(self, s_id):
+        """Build the game's pack on a worker thread"""
+        app = current_app._get_current_object()
+        with self._lock:
+            if s_id in self._packs:
+                return
+            self._packs[s_id] = GamePack()
+            self._evict_locked(app.config)
+        self._get_executor().submit(self._fill, app, s_id)
+
+    def _fill(self, app, s_id):
+        with app.app_context():
+            try:
+                size = app.config["QUESTION_PACK_SIZE"]
+                for c_id in self._candidate_categories():
+                    questions = question_sampler.sample_questions(c_id, size)
+                    with self._lock:
+                        pack = self._packs.get(s_id)
+                        if pack is None:
+                            return  # evicted or finished meanwhile
+                        pack.questions[c_id] = questions
+                        self._prefetched += len(questions)
+            except Exception:
+                app.logger.exception("Question pack prefetch failed for game %s", s_id)
+
+    def take(self, s_id, c_id, k=QUESTIONS_PER_ROUND):
+        """Questions for the next round of game s_id in category c_id.
+
+        The pack is left unchanged; call consume with the result once the
+        round is saved.
+        """
+        with self._lock:
+            self._popularity[c_id] += 1
+            self._evict_locked(current_app.config)
+            pack = self._packs.get(s_id)
+            available = None
+            if pack is not None:
+                self._packs.move_to_end(s_id)
+                pack.last_used = time.monotonic()
+                available = [q for q in pack.questions.get(c_id, ()) if q["q_id"] not in pack.used_ids]
+
+        if available and len(available) >= k:
+            # Questions can be deleted after the pack was filled
+            valid_ids = question_dao.get_confirmed_question_id_set([q["q_id"] for q in available])
+            available = [q for q in available if q["q_id"] in valid_ids]
+
+        with self._lock:
+            pack = self._packs.get(s_id)
+            if pack is not None and available is not None:
+                available = [q for q in available if q["q_id"] not in pack.used_ids]
+                if len(available) >= k:
+                    self._hits += 1
+                    return available[:k]
+                used_ids = set(pack.used_ids)
+            else:
+                used_ids = None
+            self._misses += 1
+
+        if used_ids is None:
+            # Pack built by another process or already evicted; recover the
+            # game's used questions from its rounds
+            used_ids = round_dao.get_used_question_ids(s_id)
+        return question_sampler.sample_questions(c_id, k, exclude_ids=used_ids)
+
+    def consume(self, s_id, c_id, questions):
+        """Mark questions as used by game s_id and drop them from its pack"""
+        q_ids = {q["q_id"] for q in questions}
+        with self._lock:
+            pack = self._packs.get(s_id)
+            if pack is None:
+                return
+            pack.used_ids.update(q_ids)
+            if c_id in pack.questions:
+                pack.questions[c_id] = [q for q in pack.questions[c_id] if q["q_id"] not in q_ids]
+
+    def discard(self, s_id):
+        with self._lock:
+            self._packs.pop(s_id, None)
+
+    def _evict_locked(self, config):
+        now = time.monotonic()
+        while self._packs:
+            s_id, pack = next(iter(self._packs.items()))
+            if len(self._packs) <= config["QUESTION_PACK_MAX_GAMES"] and \
+                    now - pack.last_used <= config["QUESTION_PACK_TTL"]:
+                break
+            del self._packs[s_id]
+            self._evicted += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "games": len(self._packs),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 4) if lookups else 0.0,
+                "prefetched_questions": self._prefetched,
+                "evicted": self._evicted,
+                "popular_categories": [c_id for c_id, _ in self._popularity.most_common(10)],
+            }
+
+
+_store = QuestionPackStore()
+
+
+def prefetch(s_id):
+    _store.prefetch(s_id)
+
+
+def take(s_id, c_id, k=QUESTIONS_PER_ROUND):
+    return _store.take(s_id, c_id, k)
+
+
+def consume(s_id, c_id, questions):
+    _store.consume(s_id, c_id, questions)
+
+
+def discard(s_id):
+    _store.discard(s_id)
+
+
+def get_stats():
+    return _store.stats()
@@ -0,0 +1,144 @@
+# app/services/question_sampler.py
+import random
+import threading
+import time
+
+from flask import current_app
+
+from app.dao import question_dao
+
+
+class CategoryIndex:
+    """Confirmed question ids of one category with O(1) add, remove and pick"""
+
+    __slots__ = ("ids", "positions", "loaded_at")
+
+    def __init__(self, q_ids):
+        self.ids = list(q_ids)
+        self.positions = {q_id: i for i, q_id in enumerate(self.ids)}
+        self.loaded_at = time.monotonic()
+
+    def add(self, q_id):
+        if q_id not in self.positions:
+            self.positions[q_id] = len(self.ids)
+            self.ids.append(q_id)
+
+    def remove(self, q_id):
+        pos = self.positions.pop(q_id, None)
+        if pos is None:
+            return
+        last = self.ids.pop()
+        if pos < len(self.ids):
+            # Move the last id into the freed slot
+            self.ids[pos] = last
+            self.positions[last] = pos
+
+    def sample(self, k, exclude_ids):
+        """Draw up to k distinct ids that are not in exclude_ids"""
+        excluded = sum(1 for q_id in exclude_ids if q_id in self.positions)
+        available = len(self.ids) - excluded
+        if available <= k or available * 2 < len(self.ids):
+            # Small or mostly excluded pools: filter once instead of rejecting
+            candidates = [q_id for q_id in self.ids if q_id not in exclude_ids]
+            return random.sample(candidates, min(k, len(candidates)))
+
+        picked = []
+        seen = set(exclude_ids)
+        while len(picked) < k:
+            q_id = self.ids[random.randrange(len(self.ids))]
+            if q_id not in seen:
+                seen.add(q_id)
+                picked.append(q_id)
+        return picked
+
+
+class QuestionSampler:
+    """Per-category index of confirmed question ids used to sample rounds.
+
+    Each category's ids are loaded once and then kept current by
+    ``question_dao.confirm_question``. Indexes are reloaded after
+    ``QUESTION_INDEX_TTL`` seconds to pick up changes made by other
+    processes.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _ttl(self):
+        return current_app.config.get("QUESTION_INDEX_TTL", 300)
+
+    def _get_index(self, c_id):
+        index = self._indexes.get(c_id)
+        if index is not None and time.monotonic() - index.loaded_at < self._ttl():
+            return index
+
+        index = CategoryIndex(question_dao.get_confirmed_question_ids(c_id))
+        with self._lock:
+            self._indexes[c_id] = index
+        return index
+
+    def sample(self, c_id, k, exclude_ids=None):
+        exclude_ids = set(exclude_ids or ())
+        index = self._get_index(c_id)
+        questions = []
+
+        # A sampled id can vanish if another process deleted the question;
+        # drop it from the index and draw again
+        for _ in range(3):
+            with self._lock:
+                q_ids = index.sample(k - len(questions), exclude_ids)
+            if not q_ids:
+                break
+            fetched = question_dao.get_confirmed_questions_by_ids(q_ids)
+            questions.extend(fetched)
+            exclude_ids.update(q_ids)
+
+            found = {question["q_id"] for question in fetched}
+            missing = [q_id for q_id in q_ids if q_id not in found]
+            if not missing:
+                break
+            with self._lock:
+                for q_id in missing:
+                    index.remove(q_id)
+
+        return questions
+
+    def on_question_confirmed(self, q_id, c_id):
+        with self._lock:
+            index = self._indexes.get(c_id)
+            if index is not None:
+                index.add(q_id)
+
+    def on_question_removed(self, q_id, c_id):
+        with self._lock:
+            index = self._indexes.get(c_id)
+            if index is not None:
+                index.remove(q_id)
+
+    def invalidate(self, c_id=None):
+        with self._lock:
+            if c_id is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(c_id, None)
+
+
+_sampler = QuestionSampler()
+
+
+def sample_questions(c_id, k, exclude_ids=None):
+    """Return up to k distinct random confirmed questions from a category"""
+    return _sampler.sample(c_id, k, exclude_ids)
+
+
+def on_question_confirmed(q_id, c_id):
+    _sampler.on_question_confirmed(q_id, c_id)
+
+
+def on_question_removed(q_id, c_id):
+    _sampler.on_question_removed(q_id, c_id)
+
+
+def invalidate(c_id=None):
+    _sampler.invalidate(c_id)
@@ -1,14 +1,51 @@
 # app/utils/auth.py
+from datetime import datetime, timedelta, timezone
 from functools import wraps
 from flask import request, jsonify, current_app
 import jwt
 from app.dao import user_dao
 
+# Keys that are public (defaults, samples in .env); tokens signed with them
+# can be forged by anyone
+PLACEHOLDER_SECRET_KEYS = {"", "dev-secret-key", "change_me", "changeme", "secret", "your_secret_key"}
+DEBUG_SECRET_KEY = "dev-secret-key"
+
+
+class AuthUser:
+    """Authenticated user built from signed token claims"""
+
+    __slots__ = ("user_id", "username", "is_admin", "token_epoch")
+
+    def __init__(self, user_id, username, is_admin, token_epoch):
+        self.user_id = user_id
+        self.username = username
+        self.is_admin = is_admin
+        self.token_epoch = token_epoch
+
+
+def issue_token(user_id, username, is_admin, token_epoch):
+    """Create a signed token carrying everything protected endpoints need.
+
+    ``epoch`` is the user's token_epoch at login; banning a user bumps it,
+    which revokes every token issued before the ban.
+    """
+    now = datetime.now(timezone.utc)
+    payload = {
+        "user_id": user_id,
+        "username": username,
+        "is_admin": is_admin,
+        "epoch": token_epoch,
+        "iat": now,
+        "exp": now + timedelta(minutes=current_app.config["JWT_EXPIRES_MINUTES"]),
+    }
+    return jwt.encode(payload, current_app.config["SECRET_KEY"], algorithm="HS256")
+
+
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
-        
+
         # Check for token in Authorization header
         if 'Authorization' in request.headers:
             auth_header = request.headers['Authorization']
@@ -16,35 +53,42 @@ def token_required(f):
                 token = auth_header.split(" ")[1]  # Bearer <token>
             except IndexError:
                 return jsonify({'error': 'Invalid token format'}), 401
-        
+
         if not token:
             return jsonify({'error': 'Token is missing'}), 401
-        
+
         try:
-            # Decode the token
+            # Decode the token; its claims are trusted for the token lifetime
             data = jwt.decode(token, current_app.config['SECRET_KEY'], algorithms=['HS256'])
-            current_user_id = data['user_id']
-            
-            # Get user from database
-            current_user = user_dao.get_user_by_id(current_user_id)
-            if not current_user:
-                return jsonify({'error': 'Invalid token'}), 401
-                
+            current_user = AuthUser(data['user_id'], data['username'], data['is_admin'], data['epoch'])
         except jwt.ExpiredSignatureError:
             return jsonify({'error': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
+        except (jwt.InvalidTokenError, KeyError):
             return jsonify({'error': 'Invalid token'}), 401
+
+        try:
+            # Revocation check against the cached ban/epoch state, not the users row
+            auth_state = user_dao.get_auth_state(current_user.user_id)
         except Exception as e:
             return jsonify({'error': 'Token validation failed'}), 401
-        
-        # Create a simple user object
-        class User:
-            def __init__(self, user_data):
-                self.user_id = user_data['user_id']
-                self.username = user_data['username']
-                self.email = user_data.get('email', '')
-        
-        current_user_obj = User(current_user)
-        return f(current_user_obj, *args, **kwargs)
-    
-    return decorated
\ No newline at end of file
+
+        if not auth_state or auth_state['token_epoch'] != current_user.token_epoch:
+            return jsonify({'error': 'Token has been revoked'}), 401
+        if auth_state['banned']:
+            return jsonify({'error': 'User is banned'}), 403
+
+        return f(current_user, *args, **kwargs)
+
+    return decorated
+
+
+def init_auth(app):
+    """Check the token signing key; only debug mode may run with a placeholder"""
+    if app.config["SECRET_KEY"] not in PLACEHOLDER_SECRET_KEYS:
+        return
+    if not (app.debug or app.testing):
+        raise RuntimeError(
+            "SECRET_KEY is unset or a known placeholder; set it to a long random value"
+        )
+    app.logger.warning("SECRET_KEY is a placeholder; login tokens can be forged (debug mode only)")
+    app.config["SECRET_KEY"] = app.config["SECRET_KEY"] or DEBUG_SECRET_KEY
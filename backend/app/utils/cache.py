@@ -0,0 +1,264 @@
+# app/utils/cache.py
+import copy
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from functools import wraps
+
+_MISSING = object()
+
+
+class MemoryBackend:
+    """Process-local store with one LRU-ordered dict per namespace.
+
+    Values are copied in and out, so a caller that edits a result cannot
+    change the cached entry, just as with the pickling SQLite backend.
+    """
+
+    def __init__(self):
+        self._data = defaultdict(OrderedDict)
+        self._versions = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entries = self._data[namespace]
+            entry = entries.get(key)
+            if entry is None:
+                return _MISSING
+            value, expires_at = entry
+            if expires_at < time.time():
+                del entries[key]
+                return _MISSING
+            entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, namespace, key, value, ttl, max_entries):
+        value = copy.deepcopy(value)
+        with self._lock:
+            entries = self._data[namespace]
+            entries[key] = (value, time.time() + ttl)
+            entries.move_to_end(key)
+            while len(entries) > max_entries:
+                entries.popitem(last=False)
+
+    def delete(self, namespace, key):
+        with self._lock:
+            self._data[namespace].pop(key, None)
+
+    def get_version(self, namespace):
+        return self._versions[namespace]
+
+    def bump_version(self, namespace):
+        with self._lock:
+            self._versions[namespace] += 1
+            # Old versions are unreachable; drop them right away
+            self._data[namespace].clear()
+
+    def size(self, namespace):
+        return len(self._data[namespace])
+
+
+class SQLiteBackend:
+    """Host-local stand-in for a shared cache such as Redis.
+
+    Every process on the machine reads and writes the same SQLite file, so
+    an invalidation in one worker is seen by all of them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_versions (
+                namespace TEXT PRIMARY KEY,
+                version INTEGER NOT NULL
+            )
+        """)
+        conn.commit()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace, key):
+        conn = self._connect()
+        now = time.time()
+        row = conn.execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?;",
+            (namespace, key)
+        ).fetchone()
+        if row is None:
+            return _MISSING
+        if row[1] < now:
+            self.delete(namespace, key)
+            return _MISSING
+        conn.execute(
+            "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?;",
+            (now, namespace, key)
+        )
+        return pickle.loads(row[0])
+
+    def set(self, namespace, key, value, ttl, max_entries):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("""
+            INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at)
+            VALUES (?, ?, ?, ?, ?);
+        """, (namespace, key, pickle.dumps(value), now + ttl, now))
+        # Evict least recently used entries beyond the namespace bound
+        conn.execute("""
+            DELETE FROM cache_entries
+            WHERE namespace = ? AND key IN (
+                SELECT key FROM cache_entries WHERE namespace = ?
+                ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+            );
+        """, (namespace, namespace, max_entries))
+
+    def delete(self, namespace, key):
+        self._connect().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?;", (namespace, key)
+        )
+
+    def get_version(self, namespace):
+        row = self._connect().execute(
+            "SELECT version FROM cache_versions WHERE namespace = ?;", (namespace,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def bump_version(self, namespace):
+        conn = self._connect()
+        conn.execute("""
+            INSERT INTO cache_versions (namespace, version) VALUES (?, 1)
+            ON CONFLICT (namespace) DO UPDATE SET version = version + 1;
+        """, (namespace,))
+        conn.execute("DELETE FROM cache_entries WHERE namespace = ?;", (namespace,))
+
+    def size(self, namespace):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?;", (namespace,)
+        ).fetchone()[0]
+
+
+class Cache:
+    """Versioned read-through cache with per-namespace TTL and LRU bounds.
+
+    Keys are prefixed with the namespace's version, so invalidating a whole
+    namespace is a single version bump. Results are cached even when they
+    are None, so lookups of missing rows are absorbed too.
+    """
+
+    def __init__(self, backend=None, namespaces=None):
+        self.backend = backend or MemoryBackend()
+        self.namespaces = dict(namespaces or {})
+        self.default_ttl = 60
+        self.default_max_entries = 1024
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "invalidations": 0})
+        self._stats_lock = threading.Lock()
+
+    def configure(self, backend=None, namespaces=None):
+        if backend is not None:
+            self.backend = backend
+        if namespaces:
+            self.namespaces.update(namespaces)
+
+    def _settings(self, namespace):
+        return self.namespaces.get(namespace, (self.default_ttl, self.default_max_entries))
+
+    def _count(self, namespace, field):
+        with self._stats_lock:
+            self._stats[namespace][field] += 1
+
+    def _key(self, namespace, args):
+        version = self.backend.get_version(namespace)
+        return f"v{version}:" + ":".join(str(arg) for arg in args)
+
+    def get_or_load(self, namespace, args, loader):
+        key = self._key(namespace, args)
+        value = self.backend.get(namespace, key)
+        if value is not _MISSING:
+            self._count(namespace, "hits")
+            return value
+
+        self._count(namespace, "misses")
+        value = loader()
+        ttl, max_entries = self._settings(namespace)
+        self.backend.set(namespace, key, value, ttl, max_entries)
+        return value
+
+    def get(self, namespace, *args):
+        value = self.backend.get(namespace, self._key(namespace, args))
+        if value is _MISSING:
+            self._count(namespace, "misses")
+            return None
+        self._count(namespace, "hits")
+        return value
+
+    def set(self, namespace, value, *args):
+        ttl, max_entries = self._settings(namespace)
+        self.backend.set(namespace, self._key(namespace, args), value, ttl, max_entries)
+
+    def invalidate(self, namespace, *args):
+        """Drop one key, or the whole namespace when no key is given"""
+        self._count(namespace, "invalidations")
+        if args:
+            self.backend.delete(namespace, self._key(namespace, args))
+        else:
+            self.backend.bump_version(namespace)
+
+    def stats(self):
+        with self._stats_lock:
+            counters = {
+                namespace: dict(self._stats[namespace])
+                for namespace in set(self.namespaces) | set(self._stats)
+            }
+        result = {}
+        for namespace, stats in counters.items():
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+            stats["size"] = self.backend.size(namespace)
+            stats["ttl"], stats["max_entries"] = self._settings(namespace)
+            result[namespace] = stats
+        return result
+
+
+cache = Cache()
+
+
+def cached(namespace):
+    """Cache a DAO read keyed on its positional arguments"""
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args):
+            return cache.get_or_load(namespace, args, lambda: f(*args))
+        return decorated
+    return decorator
+
+
+def init_cache(app):
+    if app.config["CACHE_BACKEND"] == "sqlite":
+        backend = SQLiteBackend(app.config["CACHE_SQLITE_PATH"])
+    else:
+        backend = MemoryBackend()
+    cache.configure(backend=backend, namespaces=app.config["CACHE_NAMESPACES"])
+    return cache
@@ -0,0 +1,37 @@
+# app/utils/export.py
+import csv
+import io
+
+from flask import Response, stream_with_context
+
+from app.utils.json_provider import dumps
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+
+def encode_rows(fmt, columns, rows):
+    """Yield rows as CSV (with a header line) or JSONL, chunk by chunk"""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            if buffer.tell() > 65536:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+    else:
+        for row in rows:
+            yield dumps(dict(zip(columns, row))) + "\n"
+
+
+def export_response(chunks, fmt, name):
+    """Streaming attachment response for chunks produced by encode_rows"""
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={name}.{fmt}"}
+    )
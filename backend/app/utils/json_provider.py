@@ -0,0 +1,76 @@
+# app/utils/json_provider.py
+import json
+from datetime import date
+from decimal import Decimal
+
+import psycopg2.extras
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+if orjson is not None:
+    # Naive timestamps are UTC, as Flask's default encoder assumed; int keys
+    # are allowed because the stdlib encoder allowed them
+    _OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # Flask's default encoder renders NUMERIC columns as strings; keep that
+    if isinstance(obj, Decimal):
+        return str(obj)
+    # Only reached by the stdlib fallback; orjson encodes dates natively
+    if isinstance(obj, date):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(obj):
+    """Encode to a JSON string with the fastest available encoder"""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+    return json.dumps(obj, default=_default, separators=(",", ":"))
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    datetime values are written natively as ISO 8601 (naive values marked
+    UTC) instead of HTTP dates; keys are emitted in insertion order.
+    """
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=_OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype="application/json")
+
+
+def register_json_adapters(conn):
+    """Decode json/jsonb columns with the fast decoder on this connection"""
+    psycopg2.extras.register_default_json(conn, loads=loads)
+    psycopg2.extras.register_default_jsonb(conn, loads=loads)
+
+
+def json_param(obj):
+    """Parameter adapter that writes obj as a json/jsonb value"""
+    return psycopg2.extras.Json(obj, dumps=dumps)
+
+
+def init_json(app):
+    if app.config["JSON_PROVIDER"] == "orjson" and orjson is not None:
+        app.json = OrjsonProvider(app)
+    app.extensions["db_pool"].on_connect.append(register_json_adapters)
@@ -0,0 +1,450 @@
+# app/utils/metrics.py
+import json
+import math
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+
+from flask import Response, g, has_request_context, request
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_ARCHIVE = "archive.json"
+_LOCK_FILE = ".lock"
+
+
+class Metric:
+    """One metric family; samples are keyed by their label values"""
+
+    def __init__(self, registry, kind, name, help, labelnames=(), buckets=None):
+        self.registry = registry
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets) if buckets else None
+
+
+class Counter(Metric):
+    def inc(self, labels=(), amount=1):
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    def inc(self, labels=(), amount=1):
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    def observe(self, value, labels=()):
+        shard = self.registry.shard()
+        key = (self.name, labels)
+        counts = shard.get(key)
+        if counts is None:
+            # One slot per bucket, one for +Inf, then the sum
+            counts = shard[key] = [0] * (len(self.buckets) + 2)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+
+class _ShardOwner:
+    """Kept in a thread's locals; collected with them when the thread exits"""
+
+    __slots__ = ("__weakref__",)
+
+
+class Registry:
+    """Metrics recorded without locks and exposed in Prometheus text format.
+
+    Each thread writes to its own shard, so recording is a dict update with
+    no contention; shards are only summed when metrics are collected. The
+    shard of a thread that exits is folded into a shared retired shard, so
+    short-lived threads do not pile up. Values computed on demand (pool
+    size, queue length) come from callbacks.
+
+    With a ``multiproc_dir`` every process also writes its samples to
+    ``<pid>.json`` there every ``flush_interval`` seconds, and a scrape of
+    any process reports the sum over all of them. An exiting process folds
+    its counters into an archive file so totals survive worker recycling;
+    gauges of processes that are gone are dropped.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self._callbacks = []  # (metric, fn returning {labels: value})
+        self._shards = []
+        self._retired = {}
+        # Shards of exited threads, appended by finalizers without locking
+        self._dead = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+        self.configure(None, 5.0)
+
+    def configure(self, multiproc_dir, flush_interval):
+        self.multiproc_dir = multiproc_dir or None
+        self.flush_interval = flush_interval
+        if self.multiproc_dir:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter(self, "counter", name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge(self, "gauge", name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, "histogram", name, help, labelnames, buckets))
+
+    def callback(self, kind, name, help, fn, labelnames=()):
+        """Metric whose {labels: value} are read from fn at collection time"""
+        metric = self._register(Metric(self, kind, name, help, labelnames))
+        # A new app replaces the callbacks of the previous one
+        self._callbacks = [(m, f) for m, f in self._callbacks if m.name != name]
+        self._callbacks.append((metric, fn))
+        return metric
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = {}
+            owner = self._local.owner = _ShardOwner()
+            weakref.finalize(owner, self._dead.append, shard).atexit = False
+            with self._lock:
+                self._retire_dead_locked()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_dead_locked(self):
+        dead = []
+        while self._dead:
+            dead.append(self._dead.pop())
+        if not dead:
+            return
+        dead_ids = {id(shard) for shard in dead}
+        self._shards = [shard for shard in self._shards if id(shard) not in dead_ids]
+        for shard in dead:
+            _merge(self._retired, shard)
+
+    def after_fork(self):
+        """Forget samples inherited from the parent; call in each new worker"""
+        with self._lock:
+            self._retire_dead_locked()
+            self._retired.clear()
+            for shard in self._shards:
+                shard.clear()
+
+    def _local_samples(self, live=True):
+        """{(name, labels): value} of this process"""
+        samples = {}
+        with self._lock:
+            self._retire_dead_locked()
+            shards = list(self._shards)
+            _merge(samples, self._retired)
+        for shard in shards:
+            _merge(samples, dict(shard))
+        for metric, fn in self._callbacks:
+            if metric.kind == "gauge" and not live:
+                continue
+            try:
+                values = fn()
+            except Exception:
+                continue
+            for labels, value in values.items():
+                samples[(metric.name, labels)] = value
+        if not live:
+            samples = {
+                key: value for key, value in samples.items()
+                if self.metrics[key[0]].kind != "gauge"
+            }
+        return samples
+
+    # Multi-process files
+
+    def _path(self, name):
+        return os.path.join(self.multiproc_dir, name)
+
+    def _write(self, name, samples):
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump([[name_, list(labels), value] for (name_, labels), value in samples.items()], f)
+        os.replace(tmp, path)
+
+    def _read(self, name):
+        try:
+            with open(self._path(name)) as f:
+                return {(n, tuple(labels)): value for n, labels, value in json.load(f)}
+        except (OSError, ValueError):
+            return {}
+
+    def _locked(self, exclusive):
+        import fcntl
+        f = open(self._path(_LOCK_FILE), "a")
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return f
+
+    def flush(self):
+        if self.multiproc_dir:
+            self._write(f"{os.getpid()}.json", self._local_samples())
+
+    def ensure_flusher(self):
+        """Start this process's background flush thread if it is not running"""
+        if not self.multiproc_dir or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def run():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        threading.Thread(target=run, name="metrics-flush", daemon=True).start()
+
+    def shutdown(self):
+        """Fold this process's counters into the archive and remove its file"""
+        if not self.multiproc_dir:
+            return
+        own = f"{os.getpid()}.json"
+        lock = self._locked(exclusive=True)
+        try:
+            archive = self._read(_ARCHIVE)
+            _merge(archive, self._local_samples(live=False))
+            self._write(_ARCHIVE, archive)
+            try:
+                os.remove(self._path(own))
+            except FileNotFoundError:
+                pass
+        finally:
+            lock.close()
+
+    def clear(self):
+        """Delete every multi-process file; call once before workers start"""
+        if not self.multiproc_dir:
+            return
+        for name in os.listdir(self.multiproc_dir):
+            if name.endswith(".json") or name.endswith(".tmp"):
+                os.remove(self._path(name))
+
+    def collect(self):
+        """{(name, labels): value} over every process"""
+        samples = self._local_samples()
+        if not self.multiproc_dir:
+            return samples
+        own = f"{os.getpid()}.json"
+        lock = self._locked(exclusive=False)
+        try:
+            for name in os.listdir(self.multiproc_dir):
+                if not name.endswith(".json") or name == own:
+                    continue
+                other = self._read(name)
+                if name != _ARCHIVE and not _is_alive(int(name[:-len(".json")])):
+                    # Killed without shutting down: keep its counters only
+                    other = {key: value for key, value in other.items()
+                             if key[0] in self.metrics and self.metrics[key[0]].kind != "gauge"}
+                _merge(samples, other)
+        finally:
+            lock.close()
+        return samples
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        by_name = {}
+        for (name, labels), value in self.collect().items():
+            by_name.setdefault(name, []).append((tuple(labels), value))
+
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            samples = by_name.get(name)
+            if samples is None and not metric.labelnames and metric.kind != "histogram":
+                samples = [((), 0)]
+            for labels, value in sorted(samples or (), key=lambda item: item[0]):
+                pairs = list(zip(metric.labelnames, labels))
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(metric.buckets + (math.inf,), value[:-1]):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    lines.append(f"{name}_bucket{_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(value[-1])}")
+                lines.append(f"{name}_count{_labels(pairs)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge(into, samples):
+    for key, value in samples.items():
+        current = into.get(key)
+        if current is None:
+            into[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            into[key] = [a + b for a, b in zip(current, value)]
+        else:
+            into[key] = current + value
+
+
+def _is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+registry = Registry()
+
+# HTTP
+http_requests = registry.counter(
+    "http_requests_total", "HTTP requests by route and response status",
+    ("blueprint", "route", "method", "status"))
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("blueprint", "route", "method"))
+http_requests_in_flight = registry.gauge(
+    "http_requests_in_flight", "HTTP requests being handled", ("blueprint",))
+http_request_exceptions = registry.counter(
+    "http_request_exceptions_total", "Unhandled exceptions by route and type",
+    ("blueprint", "route", "exception"))
+
+# Database
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "DAO statement latency by route and statement type",
+    ("route", "operation"), buckets=DB_BUCKETS)
+db_pool_acquire_duration = registry.histogram(
+    "db_pool_acquire_seconds", "Time to check a connection out of the pool",
+    buckets=DB_BUCKETS)
+
+# Gameplay
+rounds_started = registry.counter("quiz_rounds_started_total", "Rounds started")
+answers_submitted = registry.counter("quiz_answers_submitted_total", "Answer sets submitted for a round")
+games_ended = registry.counter("quiz_games_ended_total", "Games that reached their last round")
+matchmaking_matches = registry.counter(
+    "matchmaking_matches_total", "Random-opponent requests by how they were served",
+    ("source",))
+matchmaking_wait = registry.histogram(
+    "matchmaking_queue_wait_seconds", "Time a queued player waited before being matched",
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 900))
+
+_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+def _route():
+    if not has_request_context():
+        return "background"
+    return request.url_rule.rule if request.url_rule else "<unmatched>"
+
+
+def observe_query(query, seconds):
+    head = query[:64].decode("ascii", "replace") if isinstance(query, bytes) else str(query)[:64]
+    words = head.split(None, 1)
+    operation = words[0].upper() if words else ""
+    db_query_duration.observe(seconds, (_route(), operation if operation in _OPERATIONS else "OTHER"))
+
+
+def observe_acquire(conn, seconds):
+    db_pool_acquire_duration.observe(seconds)
+
+
+def _request_labels():
+    return request.blueprint or "", _route(), request.method
+
+
+def _begin_request():
+    registry.ensure_flusher()
+    g.metrics_started = time.perf_counter()
+    g.metrics_blueprint = request.blueprint or ""
+    http_requests_in_flight.inc((g.metrics_blueprint,))
+
+
+def _finish_request(response):
+    started = g.get("metrics_started")
+    if started is not None:
+        blueprint, route, method = _request_labels()
+        http_request_duration.observe(time.perf_counter() - started, (blueprint, route, method))
+        http_requests.inc((blueprint, route, method, str(response.status_code)))
+    return response
+
+
+def _teardown_request(exc):
+    blueprint = g.pop("metrics_blueprint", None)
+    if blueprint is not None:
+        http_requests_in_flight.dec((blueprint,))
+        if exc is not None:
+            http_request_exceptions.inc((blueprint, _route(), type(exc).__name__))
+
+
+def metrics_response():
+    return Response(registry.render(), content_type=CONTENT_TYPE)
+
+
+def init_metrics(app):
+    registry.configure(app.config["METRICS_MULTIPROC_DIR"], app.config["METRICS_FLUSH_INTERVAL"])
+    app.extensions["metrics"] = registry
+    if not app.config["METRICS_ENABLED"]:
+        return registry
+
+    from app.services import matchmaking
+    from app.utils.sql_profiler import profiler
+    pool = app.extensions["db_pool"]
+    profiler.add_query_hook(pool, observe_query)
+    pool.on_acquire.append(observe_acquire)
+
+    def pool_connections():
+        stats = pool.stats()
+        return {("idle",): stats["idle"], ("in_use",): stats["in_use"]}
+
+    registry.callback("gauge", "db_pool_connections", "Pooled connections by state",
+                      pool_connections, ("state",))
+    registry.callback("gauge", "db_pool_waiters", "Threads waiting for a pooled connection",
+                      lambda: {(): pool.stats()["waiters"]})
+    registry.callback("counter", "db_pool_timeouts_total", "Pool checkouts that timed out",
+                      lambda: {(): pool.stats()["timeouts"]})
+    registry.callback("gauge", "matchmaking_queued_players", "Players waiting in the matchmaking queue",
+                      lambda: {(): matchmaking.get_stats()["queued_players"]})
+
+    app.before_request(_begin_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    return registry
@@ -0,0 +1,60 @@
+# app/utils/pagination.py
+import base64
+import binascii
+from urllib.parse import urlencode
+
+from flask import current_app, jsonify, request
+
+from app.utils.json_provider import dumps, loads
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a ?cursor= token or ?limit= value cannot be used"""
+
+
+def encode_cursor(key):
+    """Opaque next_cursor token for the sort key of a page's last row"""
+    return base64.urlsafe_b64encode(dumps(key).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    try:
+        return loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+def page_args():
+    """(limit, after) of the current request.
+
+    ?limit= defaults to PAGE_SIZE_DEFAULT and is capped at PAGE_SIZE_MAX;
+    after is the decoded ?cursor= key, or None for the first page.
+    """
+    limit = request.args.get("limit", current_app.config["PAGE_SIZE_DEFAULT"], type=int)
+    if limit < 1:
+        raise InvalidCursorError("limit must be a positive integer")
+    limit = min(limit, current_app.config["PAGE_SIZE_MAX"])
+
+    token = request.args.get("cursor")
+    after = decode_cursor(token) if token else None
+    # bool is an int subclass, but true/false never name a row
+    if after is not None and (not isinstance(after, int) or isinstance(after, bool)):
+        raise InvalidCursorError("Invalid cursor")
+    return limit, after
+
+
+def paginated_response(rows, limit, key):
+    """JSON list of the first limit rows; a next_cursor is attached when
+    the DAO returned the extra row that shows another page follows.
+
+    The body stays a plain list so existing clients keep working; the
+    token is sent in the X-Next-Cursor header and as a Link rel="next".
+    """
+    response = jsonify(rows[:limit])
+    if len(rows) > limit:
+        next_cursor = encode_cursor(key(rows[limit - 1]))
+        args = dict(request.args.items(), cursor=next_cursor, limit=limit)
+        next_url = request.base_url + "?" + urlencode(args)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
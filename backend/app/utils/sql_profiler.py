@@ -0,0 +1,257 @@
+# app/utils/sql_profiler.py
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from functools import lru_cache
+
+import psycopg2.extensions
+from flask import g, has_request_context, request
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%(?:\(\w+\))?s")
+_VALUE_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_ROW_LIST = re.compile(r"\([^()]*\)(?:\s*,\s*\([^()]*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(text):
+    text = _STRING_LITERAL.sub("?", text)
+    text = _NUMBER_LITERAL.sub("?", text)
+    text = _PLACEHOLDER.sub("?", text)
+    text = _VALUE_LIST.sub("?, ...", text)
+    text = _ROW_LIST.sub(lambda m: m.group(0)[:m.group(0).index(")") + 1] + ", ...", text)
+    return _WHITESPACE.sub(" ", text).strip().rstrip(";").rstrip()
+
+
+_normalize_cached = lru_cache(maxsize=4096)(_normalize)
+
+
+def statement_shape(query):
+    """query with literals, placeholders and value lists collapsed, so every
+    execution of one DAO statement maps to the same shape"""
+    if isinstance(query, bytes):
+        # execute_values sends each page pre-rendered; pages never repeat
+        return _normalize(query.decode("utf-8", "replace"))
+    return _normalize_cached(str(query))
+
+
+class ProfilingCursor(psycopg2.extensions.cursor):
+    """Cursor that reports the duration of every statement to the profiler"""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        try:
+            return super().execute(query, vars)
+        finally:
+            profiler.record_query(query, time.perf_counter() - start)
+
+    def executemany(self, query, vars_list):
+        start = time.perf_counter()
+        try:
+            return super().executemany(query, vars_list)
+        finally:
+            profiler.record_query(query, time.perf_counter() - start)
+
+
+class RequestProfile:
+    """SQL statements, DB time and connection waits of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.acquires = 0
+        self.acquire_time = 0.0
+        self.shapes = defaultdict(lambda: [0, 0.0])  # shape -> [count, seconds]
+
+    def add_query(self, shape, seconds):
+        self.queries += 1
+        self.db_time += seconds
+        entry = self.shapes[shape]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def add_acquire(self, seconds):
+        self.acquires += 1
+        self.acquire_time += seconds
+
+
+class SqlProfiler:
+    """Per-request SQL instrumentation for the DAO layer.
+
+    Every statement run through a pooled connection is timed and attributed
+    to the current request by its shape. Each response carries the totals in
+    a Server-Timing header; the last ``history`` requests are kept for the
+    debug endpoint. Statements slower than ``slow_query_ms`` are logged, and
+    so is any shape that runs more than ``n_plus_one_threshold`` times in a
+    single request. Statements of streamed responses run after the headers
+    are sent, so they are only covered by the slow-query log.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.logger = None
+        # Hooks receive every statement and its duration, profiling or not;
+        # register them with add_query_hook
+        self.on_query = []
+        self._lock = threading.Lock()
+        self.configure(False, 0, 0, 0, 0)
+
+    def configure(self, enabled, slow_query_ms, n_plus_one_threshold, history, slowest, logger=None):
+        self.enabled = enabled
+        self.slow_query_ms = slow_query_ms
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slowest = slowest
+        self.logger = logger
+        with self._lock:
+            self._history = deque(maxlen=history)
+            self._endpoints = defaultdict(lambda: {
+                "requests": 0, "queries": 0, "max_queries": 0, "db_time": 0.0, "acquire_time": 0.0
+            })
+            self._slow_queries = 0
+            self._n_plus_one = 0
+
+    def record_query(self, query, seconds):
+        for hook in self.on_query:
+            hook(query, seconds)
+        if not self.enabled:
+            return
+        profile = g.get("sql_profile") if has_request_context() else None
+        slow = self.slow_query_ms and seconds * 1000 >= self.slow_query_ms
+        if profile is None and not slow:
+            return
+        shape = statement_shape(query)
+        if profile is not None:
+            profile.add_query(shape, seconds)
+        if slow:
+            with self._lock:
+                self._slow_queries += 1
+            if self.logger is not None:
+                where = f"{request.method} {request.path}" if has_request_context() else "background"
+                self.logger.warning("Slow query (%.1f ms) in %s: %s", seconds * 1000, where, shape)
+
+    def record_acquire(self, conn, seconds):
+        profile = g.get("sql_profile") if has_request_context() else None
+        if profile is not None:
+            profile.add_acquire(seconds)
+
+    def install(self, conn):
+        conn.cursor_factory = ProfilingCursor
+
+    def attach(self, pool):
+        """Time every statement run on the pool's new connections"""
+        if self.install not in pool.on_connect:
+            pool.on_connect.append(self.install)
+
+    def add_query_hook(self, pool, hook):
+        """Call hook(query, seconds) for every statement run through pool"""
+        if hook not in self.on_query:
+            self.on_query.append(hook)
+        self.attach(pool)
+
+    def begin_request(self):
+        g.sql_profile = RequestProfile()
+
+    def finish_request(self, response):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return response
+        duration = time.perf_counter() - profile.started
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={profile.db_time * 1000:.2f};desc="{profile.queries} queries", '
+            f'db-acquire;dur={profile.acquire_time * 1000:.2f};desc="{profile.acquires} checkouts", '
+            f'app;dur={duration * 1000:.2f}'
+        )
+
+        repeated = [
+            {"statement": shape, "count": count, "ms": round(seconds * 1000, 3)}
+            for shape, (count, seconds) in profile.shapes.items()
+            if self.n_plus_one_threshold and count > self.n_plus_one_threshold
+        ]
+        endpoint = f"{request.method} {request.url_rule.rule if request.url_rule else request.path}"
+        for entry in repeated:
+            if self.logger is not None:
+                self.logger.warning("Possible N+1 in %s: %d runs of %s",
+                                    endpoint, entry["count"], entry["statement"])
+
+        slowest = sorted(profile.shapes.items(), key=lambda item: item[1][1], reverse=True)[:self.slowest]
+        summary = {
+            "endpoint": endpoint,
+            "path": request.full_path.rstrip("?"),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "queries": profile.queries,
+            "db_ms": round(profile.db_time * 1000, 3),
+            "acquires": profile.acquires,
+            "acquire_ms": round(profile.acquire_time * 1000, 3),
+            "slowest": [
+                {"statement": shape, "count": count, "ms": round(seconds * 1000, 3)}
+                for shape, (count, seconds) in slowest
+            ],
+            "n_plus_one": repeated,
+        }
+        with self._lock:
+            self._history.append(summary)
+            totals = self._endpoints[endpoint]
+            totals["requests"] += 1
+            totals["queries"] += profile.queries
+            totals["max_queries"] = max(totals["max_queries"], profile.queries)
+            totals["db_time"] += profile.db_time
+            totals["acquire_time"] += profile.acquire_time
+            if repeated:
+                self._n_plus_one += 1
+        return response
+
+    def stats(self, limit=None):
+        with self._lock:
+            recent = list(self._history)[::-1][:limit]
+            endpoints = {
+                endpoint: {
+                    "requests": totals["requests"],
+                    "queries_per_request": round(totals["queries"] / totals["requests"], 2),
+                    "max_queries": totals["max_queries"],
+                    "db_ms_per_request": round(totals["db_time"] * 1000 / totals["requests"], 3),
+                    "acquire_ms_per_request": round(totals["acquire_time"] * 1000 / totals["requests"], 3),
+                }
+                for endpoint, totals in sorted(self._endpoints.items())
+            }
+            return {
+                "enabled": self.enabled,
+                "slow_query_ms": self.slow_query_ms,
+                "n_plus_one_threshold": self.n_plus_one_threshold,
+                "slow_queries": self._slow_queries,
+                "n_plus_one_requests": self._n_plus_one,
+                "endpoints": endpoints,
+                "recent": recent,
+            }
+
+
+profiler = SqlProfiler()
+
+
+def init_sql_profiler(app):
+    profiler.configure(
+        enabled=app.config["SQL_PROFILING"],
+        slow_query_ms=app.config["SQL_SLOW_QUERY_MS"],
+        n_plus_one_threshold=app.config["SQL_N_PLUS_ONE_THRESHOLD"],
+        history=app.config["SQL_PROFILE_HISTORY"],
+        slowest=app.config["SQL_PROFILE_SLOWEST"],
+        logger=app.logger,
+    )
+    pool = app.extensions["db_pool"]
+    # Without profiling, connections keep the plain cursor unless a query
+    # hook (such as the metrics) attaches the timing one
+    if profiler.enabled:
+        profiler.attach(pool)
+        pool.on_acquire.append(profiler.record_acquire)
+        app.before_request(profiler.begin_request)
+        app.after_request(profiler.finish_request)
+    return profiler
+
+
+def get_stats(limit=None):
+    return profiler.stats(limit)
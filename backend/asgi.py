@@ -0,0 +1,8 @@
+# backend/asgi.py
+# Production entry point: gunicorn -c gunicorn.conf.py asgi:app
+# (or uvicorn asgi:app --workers 4 --timeout-graceful-shutdown 30; without
+# the timeout, a shutdown waits for every open game event stream to close)
+from app.asgi import create_asgi_app
+from wsgi import app as flask_app
+
+app = create_asgi_app(flask_app)
@@ -0,0 +1,155 @@
+# benchmarks/bench_asgi_vs_wsgi.py
+"""Compare throughput of the sync (WSGI) and async (ASGI) serving modes.
+
+Drives the same endpoints against two running servers at a fixed
+concurrency and reports requests/second and latency percentiles for each,
+once for the read-heavy GET routes and once for POST routes, while
+--streams game event streams are held open on servers that serve them (the
+stream is only served by the ASGI app). Start both against the same
+database first, for example:
+
+    gunicorn -k gthread --threads 4 -b 127.0.0.1:5000 wsgi:app  # sync, port 5000
+    uvicorn asgi:app --port 8000 --workers 1                     # async, port 8000
+
+    python benchmarks/bench_asgi_vs_wsgi.py --session 1 --user 1 \\
+        --targets wsgi=http://127.0.0.1:5000 asgi=http://127.0.0.1:8000
+
+Use the same worker count for both servers so the comparison is per process.
+The POST mix resubmits the user's answers to the session's current round, so
+submit them once first; every measured request then takes the write path and
+is answered 409 without changing anything.
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+
+def endpoints(session_id, user_id):
+    """(method, path, body) requests of each mix"""
+    answers = {"user_id": user_id, "answers": [{"is_correct": True}] * 3}
+    return {
+        "get": [
+            ("GET", f"/api/rounds/game/{session_id}", None),
+            ("GET", f"/api/rounds/games/{session_id}/current-round", None),
+            ("GET", f"/api/rounds/games/{session_id}/round/1/status", None),
+            ("GET", f"/api/games/user/{user_id}/active", None),
+            ("GET", f"/api/stats/user/{user_id}", None),
+        ],
+        "post": [
+            ("POST", f"/api/rounds/games/{session_id}/quiz-answers", answers),
+        ],
+    }
+
+
+def open_streams(base_url, session_id, count):
+    """Open `count` game event streams and wait until each is being served"""
+    streams = []
+    for _ in range(count):
+        try:
+            response = urllib.request.urlopen(f"{base_url}/api/games/{session_id}/events", timeout=30)
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                break  # not served by this server
+            raise
+        response.readline()  # the retry: line, sent once the stream is open
+        streams.append(response)
+    return streams
+
+
+def build_request(base_url, method, path, body):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    return urllib.request.Request(base_url + path, data=data, method=method,
+                                  headers={"Content-Type": "application/json"})
+
+
+def run_load(base_url, requests, concurrency, duration):
+    """Send `requests` round-robin from `concurrency` threads for `duration` seconds"""
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    timings = []
+    errors = [0]
+
+    def worker(offset):
+        local_timings = []
+        local_errors = 0
+        i = offset
+        while time.monotonic() < deadline:
+            request = build_request(base_url, *requests[i % len(requests)])
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=30) as response:
+                    response.read()
+            except urllib.error.HTTPError as e:
+                # 404s for missing rounds and 409s for resubmits are still served responses
+                if e.code >= 500:
+                    local_errors += 1
+            except Exception:
+                local_errors += 1
+                continue
+            local_timings.append(time.perf_counter() - start)
+        with lock:
+            timings.extend(local_timings)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    timings.sort()
+    if not timings:
+        return {"requests": 0, "errors": errors[0], "rps": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0}
+    return {
+        "requests": len(timings),
+        "errors": errors[0],
+        "rps": round(len(timings) / elapsed, 1),
+        "p50_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)] * 1000, 2),
+        "p99_ms": round(timings[max(0, int(len(timings) * 0.99) - 1)] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--targets", nargs="+", required=True,
+                        help="name=base_url pairs, e.g. wsgi=http://127.0.0.1:5000")
+    parser.add_argument("--session", type=int, required=True, help="game session id to read")
+    parser.add_argument("--user", type=int, required=True, help="user id to read")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 16, 64],
+                        help="concurrent clients to measure at")
+    parser.add_argument("--duration", type=float, default=10.0,
+                        help="seconds per measurement")
+    parser.add_argument("--streams", type=int, default=1,
+                        help="game event streams held open while measuring")
+    args = parser.parse_args()
+
+    mixes = endpoints(args.session, args.user)
+    targets = [(name, base_url.rstrip("/")) for name, base_url in
+               (target.split("=", 1) for target in args.targets)]
+
+    print(f"{'target':>8} {'mix':>5} {'clients':>8} {'rps':>10} {'p50 ms':>10} {'p95 ms':>10} "
+          f"{'p99 ms':>10} {'errors':>8}")
+    for mix, requests in mixes.items():
+        for concurrency in args.concurrency:
+            for name, base_url in targets:
+                streams = open_streams(base_url, args.session, args.streams)
+                try:
+                    # Warm up connections and caches before measuring
+                    run_load(base_url, requests, concurrency, 1.0)
+                    row = run_load(base_url, requests, concurrency, args.duration)
+                finally:
+                    for stream in streams:
+                        stream.close()
+                print(f"{name:>8} {mix:>5} {concurrency:>8} {row['rps']:>10} {row['p50_ms']:>10} "
+                      f"{row['p95_ms']:>10} {row['p99_ms']:>10} {row['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/bench_json_results.py
+"""Measure JSON encode/decode cost of the game results payload.
+
+Builds a /api/rounds/games/<s_id>/results response shaped like a finished
+game (five rounds, their questions and both players' answers) and times:
+
+  * encoding the response with Flask's default provider and with the
+    orjson provider, via jsonify inside a request context
+  * decoding the round JSON columns (questions and players_answers text)
+    with json.loads and with the fast loader the DAOs use
+
+No database is needed.
+
+    python benchmarks/bench_json_results.py --questions 10 --iterations 5000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask, jsonify
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.utils import json_provider  # noqa: E402
+
+
+def build_results(questions_per_round, rounds=5):
+    started = datetime(2024, 1, 1, 12, 0, 0)
+    game_rounds = []
+    for number in range(1, rounds + 1):
+        questions = [
+            {
+                "q_id": number * 100 + i,
+                "q_text": f"Question {i} of round {number}, long enough to be realistic?",
+                "option_a": "First option", "option_b": "Second option",
+                "option_c": "Third option", "option_d": "Fourth option",
+                "correct_answer": "ABCD"[i % 4],
+            }
+            for i in range(questions_per_round)
+        ]
+        answers = [
+            {"q_id": question["q_id"], "selected": "A", "is_correct": i % 2 == 0}
+            for i, question in enumerate(questions)
+        ]
+        game_rounds.append({
+            "r_id": number, "s_id": 1, "round_number": number,
+            "round_starter": 1 + number % 2, "category_id": 3,
+            "questions": questions,
+            "players_answers": {
+                player: {
+                    "answers": answers,
+                    "score": questions_per_round // 2,
+                    "submitted_at": (started + timedelta(minutes=number)).isoformat(),
+                }
+                for player in ("1", "2")
+            },
+            "created_at": started + timedelta(minutes=number),
+        })
+    return {
+        "game_id": 1, "game_status": "ended", "player1": 1, "player2": 2,
+        "player1_score": 25, "player2_score": 25, "winner": None,
+        "rounds": game_rounds, "total_rounds": rounds,
+    }
+
+
+def time_per_call(fn, iterations):
+    fn()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--questions", type=int, default=10, help="questions per round")
+    parser.add_argument("--iterations", type=int, default=5000, help="calls per measurement")
+    args = parser.parse_args()
+
+    payload = build_results(args.questions)
+
+    default_app = Flask("default")
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask("orjson")
+    if json_provider.orjson is None:
+        sys.exit("orjson is not installed")
+    fast_app.json = json_provider.OrjsonProvider(fast_app)
+
+    rows = []
+    for name, app in (("default", default_app), ("orjson", fast_app)):
+        with app.test_request_context():
+            body = jsonify(payload).get_data()
+            rows.append((f"encode jsonify ({name})",
+                         time_per_call(lambda: jsonify(payload).get_data(), args.iterations),
+                         len(body)))
+
+    # Round JSON columns arrive as text (see round_dao.ROUND_COLUMNS)
+    column_texts = [json.dumps(r["questions"]) for r in payload["rounds"]]
+    column_texts += [json.dumps(r["players_answers"]) for r in payload["rounds"]]
+    size = sum(len(text) for text in column_texts)
+    rows.append(("decode columns (json)",
+                 time_per_call(lambda: [json.loads(t) for t in column_texts], args.iterations), size))
+    rows.append(("decode columns (orjson)",
+                 time_per_call(lambda: [json_provider.loads(t) for t in column_texts], args.iterations), size))
+
+    print(f"{'measurement':<28} {'us/call':>10} {'bytes':>10}")
+    for label, micros, nbytes in rows:
+        print(f"{label:<28} {micros:>10.1f} {nbytes:>10}")
+
+
+if __name__ == "__main__":
+    main()
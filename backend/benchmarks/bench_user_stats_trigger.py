@@ -0,0 +1,131 @@
+# benchmarks/bench_user_stats_trigger.py
+"""Measure per-submission cost of the user_stats triggers as history grows.
+
+Seeds a player with an increasing number of past round answers and times
+single round_answers inserts (which fire update_user_stats and
+update_game_winner) at each history size. With incremental counters the
+per-insert time should stay flat.
+
+Everything runs inside one transaction that is rolled back at the end, so
+the target database is left untouched.
+
+    python benchmarks/bench_user_stats_trigger.py --sizes 0 1000 10000 50000
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import psycopg2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.config import Config  # noqa: E402
+
+
+def connect():
+    return psycopg2.connect(
+        host=Config.DB_HOST, port=Config.DB_PORT, dbname=Config.DB_NAME,
+        user=Config.DB_USER, password=Config.DB_PASSWORD
+    )
+
+
+def seed_fixtures(cursor):
+    cursor.execute("""
+        INSERT INTO users (user_name, email, password)
+        VALUES ('bench_p1', 'bench_p1@example.com', 'x'),
+               ('bench_p2', 'bench_p2@example.com', 'x')
+        RETURNING u_id;
+    """)
+    p1, p2 = [row[0] for row in cursor.fetchall()]
+    cursor.execute("INSERT INTO user_stats (u_id) VALUES (%s), (%s);", (p1, p2))
+    cursor.execute("INSERT INTO categories (category_name) VALUES ('bench_category') RETURNING c_id;")
+    c_id = cursor.fetchone()[0]
+    cursor.execute("""
+        INSERT INTO questions (q_text, c_id, option_a, option_b, option_c, option_d,
+                               correct_answer, confirmation_status)
+        VALUES ('bench', %s, 'a', 'b', 'c', 'd', 'A', TRUE)
+        RETURNING q_id;
+    """, (c_id,))
+    q_id = cursor.fetchone()[0]
+    return p1, p2, q_id
+
+
+def grow_history(cursor, p1, p2, q_id, count):
+    """Add `count` finished single-round games answered by p1"""
+    if count <= 0:
+        return
+    cursor.execute("""
+        WITH games AS (
+            INSERT INTO game_sessions (player1, player2, game_status)
+            SELECT %s, %s, 'ended' FROM generate_series(1, %s)
+            RETURNING s_id
+        ), new_rounds AS (
+            INSERT INTO rounds (s_id, q_id, round_number)
+            SELECT s_id, %s, 1 FROM games
+            RETURNING r_id
+        )
+        INSERT INTO round_answers (r_id, u_id, answers, score)
+        SELECT r_id, %s, '[{"is_correct": true}, {"is_correct": false}, {"is_correct": true}]', 2
+        FROM new_rounds;
+    """, (p1, p2, count, q_id, p1))
+
+
+def time_submissions(cursor, p1, p2, q_id, samples):
+    cursor.execute("""
+        INSERT INTO game_sessions (player1, player2) VALUES (%s, %s) RETURNING s_id;
+    """, (p1, p2))
+    s_id = cursor.fetchone()[0]
+    answers = json.dumps([{"is_correct": True}, {"is_correct": False}, {"is_correct": True}])
+
+    timings = []
+    for i in range(samples):
+        cursor.execute("""
+            INSERT INTO rounds (s_id, q_id, round_number) VALUES (%s, %s, %s) RETURNING r_id;
+        """, (s_id, q_id, 100 + i))
+        r_id = cursor.fetchone()[0]
+        start = time.perf_counter()
+        cursor.execute("""
+            INSERT INTO round_answers (r_id, u_id, answers, score) VALUES (%s, %s, %s, 2);
+        """, (r_id, p1, answers))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 50000],
+                        help="history sizes (rounds answered) to measure at")
+    parser.add_argument("--samples", type=int, default=200,
+                        help="timed submissions per history size")
+    args = parser.parse_args()
+
+    conn = connect()
+    cursor = conn.cursor()
+    results = []
+    try:
+        p1, p2, q_id = seed_fixtures(cursor)
+        history = 0
+        for size in sorted(args.sizes):
+            grow_history(cursor, p1, p2, q_id, size - history)
+            history = size
+            timings = sorted(time_submissions(cursor, p1, p2, q_id, args.samples))
+            results.append({
+                "history_rounds": size,
+                "mean_ms": round(sum(timings) / len(timings) * 1000, 3),
+                "p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+                "p95_ms": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+            })
+            history += args.samples
+    finally:
+        conn.rollback()
+        cursor.close()
+        conn.close()
+
+    print(f"{'history':>10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for row in results:
+        print(f"{row['history_rounds']:>10} {row['mean_ms']:>10} {row['p50_ms']:>10} {row['p95_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
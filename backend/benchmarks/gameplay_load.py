@@ -0,0 +1,324 @@
+# benchmarks/gameplay_load.py
+"""Load-test the full gameplay flow and report per-endpoint latency.
+
+Every virtual game signs up and logs in a new player, starts a game against
+a random opponent and plays it to the end: five rounds of quiz-round, each
+answered by both players through quiz-answers, then the game results and
+the three leaderboards. --play games are played by --concurrency threads.
+
+By default the app is built in-process with create_app() and driven through
+Flask's test client; with --base-url a running server is driven over HTTP
+instead. Queries per request are read from the Server-Timing header, so
+they are reported only with SQL_PROFILING=true (in the server's
+environment when driving one over HTTP).
+
+Seed the database first, or pass --seed with the scripts/seed_data.py
+volume options (where --games counts the historical games to seed):
+
+    export SQL_PROFILING=true
+    python benchmarks/gameplay_load.py --seed --users 5000 --games 20000 \\
+        --play 200 --concurrency 8 --output baseline.json
+    python benchmarks/gameplay_load.py --play 200 --concurrency 8 --baseline baseline.json
+
+With --baseline the run exits with status 1 when an endpoint's p95 latency
+or queries per request grows by more than --max-regression.
+
+Signup and login hash passwords with bcrypt; export PASSWORD_HASH_ROUNDS=4
+to keep hashing from dominating short in-process runs. In-process runs sign
+login tokens too, so export a real SECRET_KEY (or FLASK_DEBUG=1).
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import runpy
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(BACKEND_DIR, "scripts"))
+from seed_data import add_seed_arguments, connect, seed  # noqa: E402
+
+ROUNDS = 5
+QUESTIONS_PER_ROUND = 3
+PASSWORD = "load-test-password"
+
+_local = threading.local()
+_DB_TIMING = re.compile(r'(?:^|,)\s*db;[^,]*desc="(\d+) queries"')
+
+
+def query_count(server_timing):
+    """Statements the request ran, from the profiler's Server-Timing entry"""
+    match = _DB_TIMING.search(server_timing or "")
+    return int(match.group(1)) if match else None
+
+
+class InProcessClient:
+    """Drives create_app() through one Flask test client per thread"""
+
+    def __init__(self):
+        self.app = runpy.run_path(os.path.join(BACKEND_DIR, "app.py"))["create_app"]()
+
+    def request(self, method, path, body=None):
+        client = getattr(_local, "client", None)
+        if client is None:
+            client = _local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        return (response.status_code, response.get_json(silent=True),
+                query_count(response.headers.get("Server-Timing")))
+
+
+class HttpClient:
+    """Drives a running server over HTTP"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, path, body=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method,
+            headers={"Content-Type": "application/json"}
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return (response.status, json.loads(response.read() or b"null"),
+                        query_count(response.headers.get("Server-Timing")))
+        except urllib.error.HTTPError as e:
+            return e.code, None, query_count(e.headers.get("Server-Timing"))
+
+
+class FlowError(Exception):
+    """An endpoint answered with an unexpected status; the game is abandoned"""
+
+
+class Recorder:
+    """Latency and query samples per endpoint, shared by every worker"""
+
+    def __init__(self, client):
+        self.client = client
+        self.samples = defaultdict(list)  # label -> [(seconds, queries)]
+        self.errors = Counter()
+        self._lock = threading.Lock()
+
+    def call(self, label, method, path, body=None, expect=(200,)):
+        start = time.perf_counter()
+        status, data, queries = self.client.request(method, path, body)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.samples[label].append((elapsed, queries))
+            if status not in expect:
+                self.errors[label] += 1
+        if status not in expect:
+            raise FlowError(f"{label} returned {status}")
+        return data
+
+
+def answer(questions, user_id, rng):
+    """Answers for a round, each right with probability 0.6"""
+    answers = []
+    for question in questions:
+        correct = rng.random() < 0.6
+        selected = question["correct_answer"] if correct else \
+            rng.choice([option for option in "ABCD" if option != question["correct_answer"]])
+        answers.append({"q_id": question["q_id"], "selected": selected, "is_correct": correct})
+    return {"answers": answers, "user_id": user_id}
+
+
+def play_game(recorder, categories, rng):
+    name = "load_" + uuid.uuid4().hex[:12]
+    recorder.call("POST /api/users/", "POST", "/api/users/",
+                  {"username": name, "email": name + "@example.com", "password": PASSWORD}, expect=(201,))
+    login = recorder.call("POST /api/users/login", "POST", "/api/users/login",
+                          {"username": name, "password": PASSWORD})
+    player = login["user_id"]
+
+    game = recorder.call("POST /api/games/start/random", "POST", "/api/games/start/random",
+                         {"player1_id": player}, expect=(201,))
+    s_id = game["session_id"]
+    session = recorder.call("GET /api/games/<s_id>", "GET", f"/api/games/{s_id}")
+    opponent = session["player2"]["id"]
+
+    for number in range(ROUNDS):
+        starter = player if number % 2 == 0 else opponent
+        round_data = recorder.call(
+            "POST /api/rounds/games/<s_id>/quiz-round", "POST", f"/api/rounds/games/{s_id}/quiz-round",
+            {"category_id": rng.choice(categories), "user_id": starter}, expect=(201,)
+        )
+        for user_id in (starter, opponent if starter == player else player):
+            recorder.call("POST /api/rounds/games/<s_id>/quiz-answers", "POST",
+                          f"/api/rounds/games/{s_id}/quiz-answers",
+                          answer(round_data["questions"], user_id, rng))
+
+    recorder.call("GET /api/rounds/games/<s_id>/results", "GET", f"/api/rounds/games/{s_id}/results")
+    for board in ("overall", "weekly", "monthly"):
+        recorder.call(f"GET /api/stats/leaderboard/{board}", "GET", f"/api/stats/leaderboard/{board}")
+
+
+def playable_categories(client):
+    """Categories with enough confirmed questions for a whole game"""
+    status, counts, _ = client.request("GET", "/api/questions/counts")
+    if status != 200:
+        sys.exit(f"GET /api/questions/counts returned {status}")
+    return [
+        row["c_id"] for row in counts
+        if row["confirmed_question_count"] >= ROUNDS * QUESTIONS_PER_ROUND
+    ]
+
+
+def run(client, games, concurrency, categories, random_seed):
+    recorder = Recorder(client)
+    remaining = [games]
+    outcome = Counter()
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(random_seed * 1000 + index)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            try:
+                play_game(recorder, categories, rng)
+                result = "completed"
+            except FlowError as e:
+                print(f"game abandoned: {e}", file=sys.stderr)
+                result = "failed"
+            with lock:
+                outcome[result] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder, outcome, time.perf_counter() - start
+
+
+def percentile(sorted_values, pct):
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorder, outcome, duration, args):
+    endpoints = {}
+    total_requests = 0
+    for label, samples in sorted(recorder.samples.items()):
+        times = sorted(seconds * 1000 for seconds, _ in samples)
+        queries = [count for _, count in samples if count is not None]
+        total_requests += len(times)
+        endpoints[label] = {
+            "requests": len(times),
+            "errors": recorder.errors[label],
+            "throughput_rps": round(len(times) / duration, 2),
+            "mean_ms": round(sum(times) / len(times), 3),
+            "p50_ms": round(percentile(times, 50), 3),
+            "p95_ms": round(percentile(times, 95), 3),
+            "p99_ms": round(percentile(times, 99), 3),
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "run": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": commit,
+            "mode": "http" if args.base_url else "in-process",
+            "games": args.play,
+            "concurrency": args.concurrency,
+            "completed_games": outcome["completed"],
+            "failed_games": outcome["failed"],
+            "duration_s": round(duration, 3),
+            "throughput_rps": round(total_requests / duration, 2),
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(results, baseline, max_regression):
+    """Regressions of p95 latency and queries per request against baseline"""
+    regressions = []
+    for label, current in results["endpoints"].items():
+        before = baseline["endpoints"].get(label)
+        if before is None:
+            continue
+        for metric in ("p95_ms", "queries_per_request"):
+            old, new = before.get(metric), current.get(metric)
+            if old is not None and new is not None and new > old * (1 + max_regression):
+                regressions.append(f"{label}: {metric} {old} -> {new}")
+    return regressions
+
+
+def print_report(results):
+    run_info = results["run"]
+    print(f"{run_info['completed_games']} games completed, {run_info['failed_games']} failed, "
+          f"{run_info['duration_s']} s, {run_info['throughput_rps']} requests/s ({run_info['mode']})\n")
+    print(f"{'endpoint':<46} {'reqs':>6} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'queries':>8}")
+    for label, row in results["endpoints"].items():
+        queries = "-" if row["queries_per_request"] is None else row["queries_per_request"]
+        print(f"{label:<46} {row['requests']:>6} {row['errors']:>4} {row['throughput_rps']:>8} "
+              f"{row['p50_ms']:>9} {row['p95_ms']:>9} {row['p99_ms']:>9} {queries:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--play", type=int, default=50, help="games to play")
+    parser.add_argument("--concurrency", type=int, default=4, help="games played at once")
+    parser.add_argument("--base-url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--random-seed", type=int, default=1, help="seed of the players' choices")
+    parser.add_argument("--output", help="write machine-readable results to this JSON file")
+    parser.add_argument("--baseline", help="results JSON of an earlier run to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed relative growth of p95 and queries per request")
+    parser.add_argument("--seed", action="store_true", help="seed the database before the run")
+    add_seed_arguments(parser)
+    args = parser.parse_args()
+
+    if args.seed:
+        conn = connect()
+        try:
+            seed(conn, args.users, args.categories, args.questions, args.games)
+        finally:
+            conn.close()
+
+    client = HttpClient(args.base_url) if args.base_url else InProcessClient()
+    categories = playable_categories(client)
+    if not categories:
+        sys.exit("No category has enough confirmed questions; run with --seed first")
+
+    recorder, outcome, duration = run(client, args.play, args.concurrency, categories, args.random_seed)
+    results = summarize(recorder, outcome, duration, args)
+    print_report(results)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.max_regression)
+        if regressions:
+            print("\nRegressions against " + args.baseline + ":")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print("\nNo regressions against " + args.baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,18 @@
 -- Indexes to speed up queries
-CREATE INDEX idx_questions_category ON questions(c_id);
 CREATE INDEX idx_game_sessions_status ON game_sessions(game_status);
-CREATE INDEX idx_rounds_game ON rounds(s_id);
 CREATE INDEX idx_user_stats_xp ON user_stats(xp DESC);
+
+-- One row per (game, round number); also serves every per-game round lookup
+CREATE UNIQUE INDEX idx_rounds_game_round ON rounds(s_id, round_number);
+
+-- Per-category question counts, reviews and sampling
+CREATE INDEX idx_questions_category_status ON questions(c_id, confirmation_status);
+CREATE INDEX idx_questions_confirmed_category_id ON questions(c_id, q_id) WHERE confirmation_status = TRUE;
+
+-- Keyset pages of the review queue
+CREATE INDEX idx_questions_pending_id ON questions(q_id) WHERE confirmation_status = FALSE;
+
+-- A player's games by status ("my games", matchmaking caps) and recent
+-- players for the weekly and monthly leaderboards
+CREATE INDEX idx_game_participants_user_status ON game_participants(u_id, status, s_id);
+CREATE INDEX idx_game_participants_started_at ON game_participants(started_at, u_id);
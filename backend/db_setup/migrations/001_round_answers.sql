@@ -0,0 +1,38 @@
+-- Move per-player round answers out of rounds.players_answers JSONB
+-- into one row per (round, player).
+--
+-- Apply before re-running triggers.sql, so the backfill below does not
+-- fire the new round_answers triggers:
+--   psql -f migrations/001_round_answers.sql && psql -f triggers.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS round_answers (
+    r_id INT NOT NULL REFERENCES rounds(r_id) ON DELETE CASCADE,
+    u_id INT NOT NULL REFERENCES users(u_id) ON DELETE CASCADE,
+    answers JSONB NOT NULL DEFAULT '[]',
+    score INT NOT NULL DEFAULT 0,
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (r_id, u_id)
+);
+
+-- The old triggers fired on UPDATE of rounds.players_answers
+DROP TRIGGER IF EXISTS trg_update_game_winner ON rounds;
+
+-- Backfill: players_answers is keyed by user id, e.g.
+-- {"12": {"answers": [...], "score": 2, "submitted_at": "..."}}
+INSERT INTO round_answers (r_id, u_id, answers, score, submitted_at)
+SELECT r.r_id,
+       pa.key::INT,
+       COALESCE(pa.value -> 'answers', '[]'::JSONB),
+       COALESCE((pa.value ->> 'score')::INT, 0),
+       COALESCE((pa.value ->> 'submitted_at')::TIMESTAMP, r.round_time)
+FROM rounds r
+CROSS JOIN LATERAL jsonb_each(r.players_answers) AS pa
+WHERE jsonb_typeof(r.players_answers) = 'object'
+  AND pa.key ~ '^[0-9]+$'
+  AND jsonb_typeof(pa.value) = 'object'
+  AND EXISTS (SELECT 1 FROM users u WHERE u.u_id = pa.key::INT)
+ON CONFLICT (r_id, u_id) DO NOTHING;
+
+COMMIT;
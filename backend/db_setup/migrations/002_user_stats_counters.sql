@@ -0,0 +1,37 @@
+-- Running answer counters on user_stats, maintained by update_user_stats()
+-- on every round_answers insert.
+--
+-- The UPDATE below is a one-shot backfill that recomputes the counters,
+-- accuracy and XP from round_answers. It is idempotent and safe to re-run.
+-- Apply after 001_round_answers.sql, then re-run triggers.sql:
+--   psql -f migrations/002_user_stats_counters.sql && psql -f triggers.sql
+
+BEGIN;
+
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS answered_count INT DEFAULT 0;
+ALTER TABLE user_stats ADD COLUMN IF NOT EXISTS correct_count INT DEFAULT 0;
+
+-- Block new submissions while the totals are recomputed
+LOCK TABLE round_answers IN SHARE MODE;
+
+UPDATE user_stats s
+SET answered_count = COALESCE(agg.answered, 0),
+    correct_count = COALESCE(agg.correct, 0),
+    average_accuracy = CASE
+                         WHEN COALESCE(agg.answered, 0) > 0
+                         THEN ROUND((agg.correct::NUMERIC / agg.answered * 100), 2)
+                         ELSE 0
+                       END,
+    xp = COALESCE(agg.correct, 0) * 10
+FROM users u
+LEFT JOIN (
+    SELECT ra.u_id,
+           SUM(CASE WHEN jsonb_typeof(ra.answers) = 'array'
+                    THEN jsonb_array_length(ra.answers) ELSE 0 END) AS answered,
+           SUM(ra.score) AS correct
+    FROM round_answers ra
+    GROUP BY ra.u_id
+) agg ON agg.u_id = u.u_id
+WHERE s.u_id = u.u_id;
+
+COMMIT;
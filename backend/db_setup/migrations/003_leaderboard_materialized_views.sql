@@ -0,0 +1,50 @@
+-- Materialized leaderboards read by stats_dao instead of the join views.
+--   psql -f migrations/003_leaderboard_materialized_views.sql
+
+BEGIN;
+
+-- Materialized leaderboards (top 100 per board). Refreshed concurrently by
+-- the app when games end, so readers are never blocked; the unique u_id
+-- indexes are required for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE MATERIALIZED VIEW leaderboard_overall_mv AS
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count,
+       CASE WHEN s.game_count > 0 THEN ROUND((s.win_count::NUMERIC / s.game_count * 100), 1) ELSE 0 END as win_ratio
+FROM users u
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE MATERIALIZED VIEW leaderboard_weekly_mv AS
+WITH active_players AS (
+    SELECT player1 AS u_id FROM game_sessions WHERE start_time >= CURRENT_DATE - INTERVAL '7 days'
+    UNION
+    SELECT player2 FROM game_sessions WHERE start_time >= CURRENT_DATE - INTERVAL '7 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE MATERIALIZED VIEW leaderboard_monthly_mv AS
+WITH active_players AS (
+    SELECT player1 AS u_id FROM game_sessions WHERE start_time >= CURRENT_DATE - INTERVAL '30 days'
+    UNION
+    SELECT player2 FROM game_sessions WHERE start_time >= CURRENT_DATE - INTERVAL '30 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE UNIQUE INDEX idx_leaderboard_overall_mv_user ON leaderboard_overall_mv(u_id);
+CREATE UNIQUE INDEX idx_leaderboard_weekly_mv_user ON leaderboard_weekly_mv(u_id);
+CREATE UNIQUE INDEX idx_leaderboard_monthly_mv_user ON leaderboard_monthly_mv(u_id);
+
+COMMIT;
@@ -0,0 +1,11 @@
+-- Per-user token epoch embedded in login tokens. Banning a user bumps it,
+-- which revokes every token issued before the ban. Login also reads the
+-- admin flag into the token, from an admins table the original schema
+-- never created.
+--   psql -f migrations/004_user_token_epoch.sql
+
+ALTER TABLE users ADD COLUMN IF NOT EXISTS token_epoch INT NOT NULL DEFAULT 0;
+
+CREATE TABLE IF NOT EXISTS admins (
+    u_id INT PRIMARY KEY REFERENCES users(u_id) ON DELETE CASCADE
+);
@@ -0,0 +1,7 @@
+-- Quiz-mode round columns with a fixed type, so DAOs can rely on the JSONB
+-- decoder instead of handling text and JSON alike.
+--   psql -f migrations/005_rounds_jsonb_columns.sql
+
+ALTER TABLE rounds ADD COLUMN IF NOT EXISTS questions JSONB;
+ALTER TABLE rounds ADD COLUMN IF NOT EXISTS created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE rounds ALTER COLUMN questions TYPE JSONB USING questions::JSONB;
@@ -0,0 +1,6 @@
+-- Per-player ongoing-game lookups used by matchmaking's active-game cap and
+-- the active games list.
+--   psql -f migrations/006_game_sessions_player_indexes.sql
+
+CREATE INDEX IF NOT EXISTS idx_game_sessions_player1_ongoing ON game_sessions(player1) WHERE game_status = 'ongoing';
+CREATE INDEX IF NOT EXISTS idx_game_sessions_player2_ongoing ON game_sessions(player2) WHERE game_status = 'ongoing';
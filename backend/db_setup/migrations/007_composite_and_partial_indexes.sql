@@ -0,0 +1,27 @@
+-- Composite and partial indexes for the hot DAO queries, chosen with
+-- scripts/index_advisor.py. Built CONCURRENTLY so a live database keeps
+-- taking writes; run outside a transaction block.
+--   psql -f migrations/007_composite_and_partial_indexes.sql
+--
+-- The unique round index fails if a game already has two rounds with the
+-- same number; list them first with
+--   SELECT s_id, round_number FROM rounds GROUP BY 1, 2 HAVING COUNT(*) > 1;
+
+-- One row per (game, round number): serves the round lookups by number and
+-- the latest-round ORDER BY round_number DESC LIMIT 1 with a backward scan,
+-- and stops two concurrent "start round" requests creating the same round
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS idx_rounds_game_round ON rounds(s_id, round_number);
+DROP INDEX CONCURRENTLY IF EXISTS idx_rounds_game;
+
+-- Per-category counts and reviews read (c_id, confirmation_status) only
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_questions_category_status ON questions(c_id, confirmation_status);
+DROP INDEX CONCURRENTLY IF EXISTS idx_questions_category;
+
+-- Confirmed question ids per category for sampling, as an index-only scan
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_questions_confirmed_category_id ON questions(c_id, q_id) WHERE confirmation_status = TRUE;
+
+-- Keyset pages of the review queue (pending questions in q_id order)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_questions_pending_id ON questions(q_id) WHERE confirmation_status = FALSE;
+
+-- Recent players for the weekly and monthly leaderboard refreshes
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_game_sessions_start_time ON game_sessions(start_time) INCLUDE (player1, player2);
@@ -0,0 +1,127 @@
+-- One row per (game, player) in game_participants, so "my games", the
+-- active-game caps and the weekly/monthly leaderboards are single index
+-- range scans on (u_id, status) or started_at instead of player1/player2 ORs.
+--
+-- The sync triggers are created here, inside the backfill's lock, so no
+-- game is missed between the backfill and the triggers; triggers.sql has the
+-- same definitions for fresh installs.
+--   psql -f migrations/008_game_participants.sql
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS game_participants (
+    s_id INT NOT NULL REFERENCES game_sessions(s_id) ON DELETE CASCADE,
+    u_id INT NOT NULL REFERENCES users(u_id) ON DELETE CASCADE,
+    status VARCHAR(10),
+    started_at TIMESTAMP,
+    PRIMARY KEY (s_id, u_id)
+);
+
+-- Block new games and status changes until the triggers are in place
+LOCK TABLE game_sessions IN SHARE ROW EXCLUSIVE MODE;
+
+INSERT INTO game_participants (s_id, u_id, status, started_at)
+SELECT gs.s_id, p.u_id, gs.game_status, gs.start_time
+FROM game_sessions gs
+CROSS JOIN LATERAL (VALUES (gs.player1), (gs.player2)) AS p(u_id)
+ON CONFLICT (s_id, u_id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION add_game_participants()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO game_participants (s_id, u_id, status, started_at)
+    VALUES (NEW.s_id, NEW.player1, NEW.game_status, NEW.start_time),
+           (NEW.s_id, NEW.player2, NEW.game_status, NEW.start_time)
+    ON CONFLICT (s_id, u_id) DO NOTHING;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_add_game_participants ON game_sessions;
+CREATE TRIGGER trg_add_game_participants
+AFTER INSERT ON game_sessions
+FOR EACH ROW
+EXECUTE FUNCTION add_game_participants();
+
+CREATE OR REPLACE FUNCTION sync_game_participants()
+RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE game_participants
+    SET status = NEW.game_status, started_at = NEW.start_time
+    WHERE s_id = NEW.s_id;
+
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_sync_game_participants ON game_sessions;
+CREATE TRIGGER trg_sync_game_participants
+AFTER UPDATE OF game_status, start_time ON game_sessions
+FOR EACH ROW
+WHEN (OLD.game_status IS DISTINCT FROM NEW.game_status
+      OR OLD.start_time IS DISTINCT FROM NEW.start_time)
+EXECUTE FUNCTION sync_game_participants();
+
+CREATE INDEX IF NOT EXISTS idx_game_participants_user_status ON game_participants(u_id, status, s_id);
+CREATE INDEX IF NOT EXISTS idx_game_participants_started_at ON game_participants(started_at, u_id);
+
+-- Per-player lookups no longer read game_sessions by player
+DROP INDEX IF EXISTS idx_game_sessions_player1_ongoing;
+DROP INDEX IF EXISTS idx_game_sessions_player2_ongoing;
+DROP INDEX IF EXISTS idx_game_sessions_start_time;
+
+-- Rebuild the activity leaderboards on game_participants
+CREATE OR REPLACE VIEW leaderboard_weekly AS
+SELECT u.user_name, s.xp, s.win_count, s.game_count
+FROM users u
+JOIN user_stats s ON u.u_id = s.u_id
+JOIN game_participants gp ON gp.u_id = u.u_id
+WHERE u.u_id NOT IN (SELECT u_id FROM banned_users)
+  AND gp.started_at >= CURRENT_DATE - INTERVAL '7 days'
+GROUP BY u.user_name, s.xp, s.win_count, s.game_count
+ORDER BY s.xp DESC
+LIMIT 10;
+
+CREATE OR REPLACE VIEW leaderboard_monthly AS
+SELECT u.user_name, s.xp, s.win_count, s.game_count
+FROM users u
+JOIN user_stats s ON u.u_id = s.u_id
+JOIN game_participants gp ON gp.u_id = u.u_id
+WHERE u.u_id NOT IN (SELECT u_id FROM banned_users)
+  AND gp.started_at >= CURRENT_DATE - INTERVAL '30 days'
+GROUP BY u.user_name, s.xp, s.win_count, s.game_count
+ORDER BY s.xp DESC
+LIMIT 10;
+
+DROP MATERIALIZED VIEW IF EXISTS leaderboard_weekly_mv;
+DROP MATERIALIZED VIEW IF EXISTS leaderboard_monthly_mv;
+
+CREATE MATERIALIZED VIEW leaderboard_weekly_mv AS
+WITH active_players AS (
+    SELECT DISTINCT u_id FROM game_participants WHERE started_at >= CURRENT_DATE - INTERVAL '7 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE MATERIALIZED VIEW leaderboard_monthly_mv AS
+WITH active_players AS (
+    SELECT DISTINCT u_id FROM game_participants WHERE started_at >= CURRENT_DATE - INTERVAL '30 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE UNIQUE INDEX idx_leaderboard_weekly_mv_user ON leaderboard_weekly_mv(u_id);
+CREATE UNIQUE INDEX idx_leaderboard_monthly_mv_user ON leaderboard_monthly_mv(u_id);
+
+COMMIT;
@@ -4,7 +4,8 @@ CREATE TABLE users (
     user_name VARCHAR(50) NOT NULL UNIQUE,
     email VARCHAR(100) NOT NULL UNIQUE,
     password TEXT NOT NULL,
-    signup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    signup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    token_epoch INT NOT NULL DEFAULT 0
 );
 
 -- Categories Table
@@ -39,6 +40,16 @@ CREATE TABLE game_sessions (
     winner_id INT REFERENCES users(u_id)
 );
 
+-- One row per (game, player), kept in sync with game_sessions by triggers
+-- (see triggers.sql), so per-player lookups need no player1/player2 OR
+CREATE TABLE game_participants (
+    s_id INT NOT NULL REFERENCES game_sessions(s_id) ON DELETE CASCADE,
+    u_id INT NOT NULL REFERENCES users(u_id) ON DELETE CASCADE,
+    status VARCHAR(10),
+    started_at TIMESTAMP,
+    PRIMARY KEY (s_id, u_id)
+);
+
 -- Rounds Table
 CREATE TABLE rounds (
     r_id SERIAL PRIMARY KEY,
@@ -52,6 +63,18 @@ CREATE TABLE rounds (
 ALTER TABLE rounds ADD COLUMN round_number INT NOT NULL DEFAULT 1;
 ALTER TABLE rounds ADD COLUMN category_selector INT REFERENCES users(u_id);
 ALTER TABLE rounds ADD COLUMN selected_category INT REFERENCES categories(c_id);
+ALTER TABLE rounds ADD COLUMN questions JSONB;
+ALTER TABLE rounds ADD COLUMN created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
+
+-- Per-player answers for a round (one row per player per round)
+CREATE TABLE round_answers (
+    r_id INT NOT NULL REFERENCES rounds(r_id) ON DELETE CASCADE,
+    u_id INT NOT NULL REFERENCES users(u_id) ON DELETE CASCADE,
+    answers JSONB NOT NULL DEFAULT '[]',
+    score INT NOT NULL DEFAULT 0,
+    submitted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (r_id, u_id)
+);
 
 -- User Stats Table
 CREATE TABLE user_stats (
@@ -59,7 +82,9 @@ CREATE TABLE user_stats (
     game_count INT DEFAULT 0,
     win_count INT DEFAULT 0,
     average_accuracy NUMERIC(5,2) DEFAULT 0,
-    xp INT DEFAULT 0
+    xp INT DEFAULT 0,
+    answered_count INT DEFAULT 0,
+    correct_count INT DEFAULT 0
 );
 
 -- Banned Users Table
@@ -69,6 +94,11 @@ CREATE TABLE banned_users (
     ban_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Admins Table (read by user_dao.is_user_admin at login)
+CREATE TABLE admins (
+    u_id INT PRIMARY KEY REFERENCES users(u_id) ON DELETE CASCADE
+);
+
 
 -- View for leaderboard (Top 10 players by XP, weekly, monthly, overall)
 -- Overall leaderboard
@@ -86,9 +116,9 @@ CREATE VIEW leaderboard_weekly AS
 SELECT u.user_name, s.xp, s.win_count, s.game_count
 FROM users u
 JOIN user_stats s ON u.u_id = s.u_id
-JOIN game_sessions gs ON (gs.player1 = u.u_id OR gs.player2 = u.u_id)
+JOIN game_participants gp ON gp.u_id = u.u_id
 WHERE u.u_id NOT IN (SELECT u_id FROM banned_users)
-  AND gs.start_time >= CURRENT_DATE - INTERVAL '7 days'
+  AND gp.started_at >= CURRENT_DATE - INTERVAL '7 days'
 GROUP BY u.user_name, s.xp, s.win_count, s.game_count
 ORDER BY s.xp DESC
 LIMIT 10;
@@ -98,13 +128,53 @@ CREATE VIEW leaderboard_monthly AS
 SELECT u.user_name, s.xp, s.win_count, s.game_count
 FROM users u
 JOIN user_stats s ON u.u_id = s.u_id
-JOIN game_sessions gs ON (gs.player1 = u.u_id OR gs.player2 = u.u_id)
+JOIN game_participants gp ON gp.u_id = u.u_id
 WHERE u.u_id NOT IN (SELECT u_id FROM banned_users)
-  AND gs.start_time >= CURRENT_DATE - INTERVAL '30 days'
+  AND gp.started_at >= CURRENT_DATE - INTERVAL '30 days'
 GROUP BY u.user_name, s.xp, s.win_count, s.game_count
 ORDER BY s.xp DESC
 LIMIT 10;
 
+-- Materialized leaderboards (top 100 per board). Refreshed concurrently by
+-- the app when games end, so readers are never blocked; the unique u_id
+-- indexes are required for REFRESH MATERIALIZED VIEW CONCURRENTLY.
+CREATE MATERIALIZED VIEW leaderboard_overall_mv AS
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count,
+       CASE WHEN s.game_count > 0 THEN ROUND((s.win_count::NUMERIC / s.game_count * 100), 1) ELSE 0 END as win_ratio
+FROM users u
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE MATERIALIZED VIEW leaderboard_weekly_mv AS
+WITH active_players AS (
+    SELECT DISTINCT u_id FROM game_participants WHERE started_at >= CURRENT_DATE - INTERVAL '7 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE MATERIALIZED VIEW leaderboard_monthly_mv AS
+WITH active_players AS (
+    SELECT DISTINCT u_id FROM game_participants WHERE started_at >= CURRENT_DATE - INTERVAL '30 days'
+)
+SELECT u.u_id, u.user_name, s.xp, s.win_count, s.game_count
+FROM active_players a
+JOIN users u ON u.u_id = a.u_id
+JOIN user_stats s ON u.u_id = s.u_id
+WHERE NOT EXISTS (SELECT 1 FROM banned_users b WHERE b.u_id = u.u_id)
+ORDER BY s.xp DESC
+LIMIT 100;
+
+CREATE UNIQUE INDEX idx_leaderboard_overall_mv_user ON leaderboard_overall_mv(u_id);
+CREATE UNIQUE INDEX idx_leaderboard_weekly_mv_user ON leaderboard_weekly_mv(u_id);
+CREATE UNIQUE INDEX idx_leaderboard_monthly_mv_user ON leaderboard_monthly_mv(u_id);
+
 -- Create new view showing all categories ranked by popularity
 CREATE VIEW most_popular_categories AS
 SELECT c.category_name, COUNT(*) AS played_count,
@@ -0,0 +1,93 @@
+# backend/gunicorn.conf.py
+# Production launcher:
+#
+#     gunicorn -c gunicorn.conf.py asgi:app
+#
+# Workers are uvicorn workers running the ASGI app (app/asgi.py), which
+# serves game event streams on its event loop and the Flask app on a thread
+# pool.
+#
+# The app is built once in the master (preload_app) and forked into workers,
+# which share its imported code copy-on-write. Each worker then opens its own
+# database connections lazily. Keep workers * DB_POOL_MAX_SIZE below the
+# server's max_connections. Set METRICS_MULTIPROC_DIR so a /metrics scrape
+# reports every worker, not just the one that answered it.
+#
+# Signals: HUP starts fresh workers with the reloaded config and stops the old
+# ones gracefully. Because the app is preloaded, new code is picked up with
+# USR2 (start a new master) followed by WINCH/TERM on the old one.
+import multiprocessing
+import os
+import sys
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+
+# Workers only see each other's game events and cache invalidations through
+# the shared backends, so those are the default with more than one worker;
+# on_starting refuses the per-process ones
+if workers > 1:
+    os.environ.setdefault("EVENTS_BACKEND", "postgres")
+    os.environ.setdefault("CACHE_BACKEND", "sqlite")
+
+# Flask requests overlap Postgres round-trips on ASGI_WSGI_THREADS threads
+# per worker, which default to DB_POOL_MAX_SIZE
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "uvicorn.workers.UvicornWorker")
+
+preload_app = True
+
+# Recycle workers periodically to bound memory growth; the jitter keeps
+# them from all restarting at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+# Open game event streams keep a stopping worker alive until this runs out
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def _flask_app(server):
+    app = server.app.wsgi()
+    # The ASGI app wraps the Flask app; wsgi:app is the Flask app itself
+    return getattr(app, "flask_app", app)
+
+
+def _db_pool(server):
+    return _flask_app(server).extensions["db_pool"]
+
+
+def _metrics(server):
+    return _flask_app(server).extensions["metrics"]
+
+
+def on_starting(server):
+    config = _flask_app(server).config
+    if server.cfg.workers > 1 and (config["EVENTS_BACKEND"] != "postgres"
+                                   or config["CACHE_BACKEND"] == "memory"):
+        sys.exit(
+            f"{server.cfg.workers} workers need EVENTS_BACKEND=postgres and a shared "
+            f"CACHE_BACKEND (got {config['EVENTS_BACKEND']!r} and {config['CACHE_BACKEND']!r})"
+        )
+
+
+def when_ready(server):
+    # Anything the master connected while loading must not leak into workers
+    _db_pool(server).closeall()
+    # Metrics files left by a previous master would be summed into this one's
+    _metrics(server).clear()
+    server.log.info("Quiz Masters ready with %s workers", server.num_workers)
+
+
+def post_fork(server, worker):
+    _db_pool(server).after_fork()
+    _metrics(server).after_fork()
+    server.log.info("Worker %s started", worker.pid)
+
+
+def worker_exit(server, worker):
+    _db_pool(server).closeall()
+    _metrics(server).shutdown()
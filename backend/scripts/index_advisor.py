@@ -0,0 +1,200 @@
+# scripts/index_advisor.py
+"""Flag sequential scans in the plans of the DAO query set.
+
+Calls every read function of the DAO layer against a local database with
+sample ids taken from its data, records the SQL each one executes, and
+runs EXPLAIN (ANALYZE, BUFFERS) on it. Any sequential scan that reads more
+than --threshold rows is reported with its relation and filter; the exit
+status is 1 when something was flagged, so the script can gate CI.
+
+An empty database plans everything as a sequential scan, so seed it first;
+--seed runs scripts/seed_data.py with the same volume options:
+
+    python scripts/index_advisor.py --seed --users 5000 --games 20000
+    python scripts/index_advisor.py --threshold 1000 --verbose
+
+Cached DAO functions are called unwrapped so every query reaches the database.
+"""
+import argparse
+import os
+import runpy
+import sys
+
+import psycopg2
+import psycopg2.extensions
+
+from seed_data import BACKEND_DIR, add_seed_arguments, connect, seed
+from app.dao import (
+    admin_dao, category_dao, game_session_dao, question_dao, round_dao, stats_dao, user_dao
+)
+
+_recorded = []
+
+
+class RecordingCursor(psycopg2.extensions.cursor):
+    """Cursor that keeps the final SQL of every statement it executes"""
+
+    def execute(self, query, vars=None):
+        if self.name is None:
+            _recorded.append(self.mogrify(query, vars).decode("utf-8"))
+        return super().execute(query, vars)
+
+
+def record_cursors(conn):
+    conn.cursor_factory = RecordingCursor
+
+
+def sample_ids(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT gs.s_id, gs.player1, u.user_name, r.r_id
+        FROM game_sessions gs
+        JOIN users u ON u.u_id = gs.player1
+        JOIN rounds r ON r.s_id = gs.s_id AND r.round_number = 1
+        WHERE gs.game_status = 'ongoing'
+        ORDER BY gs.s_id DESC LIMIT 1;
+    """)
+    game = cursor.fetchone()
+    cursor.execute("""
+        SELECT c_id, array_agg(q_id) FROM questions
+        WHERE confirmation_status = TRUE
+        GROUP BY c_id ORDER BY COUNT(*) DESC LIMIT 1;
+    """)
+    category = cursor.fetchone()
+    cursor.close()
+    if game is None or category is None:
+        return None
+    s_id, u_id, user_name, r_id = game
+    c_id, q_ids = category
+    return {"s_id": s_id, "u_id": u_id, "user_name": user_name, "r_id": r_id,
+            "c_id": c_id, "q_ids": q_ids[:10]}
+
+
+def dao_calls(ids):
+    """(label, function, args) for every read function of the DAO layer"""
+    s_id, u_id, r_id, c_id = ids["s_id"], ids["u_id"], ids["r_id"], ids["c_id"]
+    return [
+        ("user_dao.get_all_users", user_dao.get_all_users, (100, None)),
+        ("user_dao.get_user_by_id", user_dao.get_user_by_id, (u_id,)),
+        ("user_dao.get_user_by_username", user_dao.get_user_by_username, (ids["user_name"],)),
+        ("user_dao.get_auth_state", user_dao.get_auth_state, (u_id,)),
+        ("user_dao.check_user_banned", user_dao.check_user_banned, (u_id,)),
+        ("user_dao.is_user_admin", user_dao.is_user_admin, (u_id,)),
+        ("admin_dao.get_banned_users", admin_dao.get_banned_users, (100, None)),
+        ("admin_dao.get_banned_user_count", admin_dao.get_banned_user_count, ()),
+        ("category_dao.get_all_categories", category_dao.get_all_categories, ()),
+        ("category_dao.get_category_by_id", category_dao.get_category_by_id, (c_id,)),
+        ("category_dao.get_most_popular_categories", category_dao.get_most_popular_categories, ()),
+        ("question_dao.get_confirmed_question_ids", question_dao.get_confirmed_question_ids, (c_id,)),
+        ("question_dao.get_confirmed_questions_by_ids",
+         question_dao.get_confirmed_questions_by_ids, (ids["q_ids"],)),
+        ("question_dao.get_confirmed_question_count", question_dao.get_confirmed_question_count, (c_id,)),
+        ("question_dao.get_question_counts_by_category", question_dao.get_question_counts_by_category, ()),
+        ("question_dao.get_pending_questions", question_dao.get_pending_questions, (100, None)),
+        ("game_session_dao.get_game_session", game_session_dao.get_game_session, (s_id,)),
+        ("game_session_dao.get_game_snapshot", game_session_dao._load_game_snapshot, (s_id,)),
+        ("game_session_dao.count_active_games", game_session_dao.count_active_games, (u_id,)),
+        ("game_session_dao.find_random_opponent", game_session_dao.find_random_opponent, (u_id, 10)),
+        ("game_session_dao.get_user_active_games", game_session_dao.get_user_active_games, (u_id,)),
+        ("round_dao.get_rounds_for_games", round_dao.get_rounds_for_games, ([s_id],)),
+        ("round_dao.get_current_round", round_dao.get_current_round, (s_id,)),
+        ("round_dao.get_round_by_id", round_dao.get_round_by_id, (r_id,)),
+        ("round_dao.get_round_questions", round_dao.get_round_questions, (r_id,)),
+        ("round_dao.is_round_complete", round_dao.is_round_complete, (s_id, 1)),
+        ("round_dao.get_game_rounds", round_dao.get_game_rounds, (s_id,)),
+        ("round_dao.get_round_count", round_dao.get_round_count, (s_id,)),
+        ("round_dao.get_round_status", round_dao.get_round_status, (s_id, 1)),
+        ("round_dao.get_next_category_selector", round_dao.get_next_category_selector, (s_id,)),
+        ("round_dao.is_game_complete", round_dao.is_game_complete, (s_id,)),
+        ("stats_dao.get_user_stats", stats_dao.get_user_stats, (u_id,)),
+        ("stats_dao.get_user_xp", stats_dao.get_user_xp, (u_id,)),
+        ("stats_dao.get_leaderboard_overall", stats_dao.get_leaderboard_overall, ()),
+        ("stats_dao.get_leaderboard_weekly", stats_dao.get_leaderboard_weekly, ()),
+        ("stats_dao.get_leaderboard_monthly", stats_dao.get_leaderboard_monthly, ()),
+    ]
+
+
+def capture_queries(ids):
+    """[(label, sql)] for every statement the DAO read functions execute"""
+    # No tokens are issued here, so the development signing key will do
+    os.environ.setdefault("FLASK_DEBUG", "1")
+    app = runpy.run_path(os.path.join(BACKEND_DIR, "app.py"))["create_app"]()
+    app.extensions["db_pool"].on_connect.append(record_cursors)
+    captured = []
+    with app.app_context():
+        for label, function, args in dao_calls(ids):
+            del _recorded[:]
+            try:
+                getattr(function, "__wrapped__", function)(*args)
+            except Exception as e:
+                print(f"{label}: failed ({' '.join(str(e).split())})", file=sys.stderr)
+                continue
+            for n, sql in enumerate(_recorded, start=1):
+                captured.append((label if len(_recorded) == 1 else f"{label} #{n}", sql))
+    app.extensions["db_pool"].closeall()
+    return captured
+
+
+def seq_scans(plan, threshold):
+    """Sequential scan nodes of a plan tree that read more than threshold rows"""
+    found = []
+    if plan.get("Node Type") == "Seq Scan":
+        rows = (plan.get("Actual Rows", 0) + plan.get("Rows Removed by Filter", 0)) * plan.get("Actual Loops", 1)
+        if rows > threshold:
+            found.append((plan.get("Relation Name"), rows, plan.get("Filter")))
+    for child in plan.get("Plans", ()):
+        found.extend(seq_scans(child, threshold))
+    return found
+
+
+def explain(conn, sql):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql.rstrip().rstrip(";"))
+        return cursor.fetchone()[0][0]
+    finally:
+        cursor.close()
+        # ANALYZE really runs the statement; never keep its effects
+        conn.rollback()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seed", action="store_true", help="insert sample data before analysing")
+    add_seed_arguments(parser)
+    parser.add_argument("--threshold", type=int, default=1000,
+                        help="flag sequential scans reading more rows than this")
+    parser.add_argument("--verbose", action="store_true", help="print every query, not just flagged ones")
+    args = parser.parse_args()
+
+    conn = connect()
+    if args.seed:
+        seed(conn, args.users, args.categories, args.questions, args.games)
+    ids = sample_ids(conn)
+    if ids is None:
+        conn.close()
+        sys.exit("No ongoing game with rounds found; run with --seed first")
+
+    flagged = 0
+    for label, sql in capture_queries(ids):
+        try:
+            plan = explain(conn, sql)
+        except psycopg2.Error as e:
+            print(f"{label}: EXPLAIN failed ({' '.join(str(e).split())})", file=sys.stderr)
+            continue
+        scans = seq_scans(plan["Plan"], args.threshold)
+        flagged += len(scans)
+        if scans or args.verbose:
+            root = plan["Plan"]
+            print(f"{'SEQ SCAN' if scans else 'ok':<8} {label:<55} {plan['Execution Time']:>9.2f} ms"
+                  f"  buffers hit={root.get('Shared Hit Blocks', 0)} read={root.get('Shared Read Blocks', 0)}")
+            for relation, rows, condition in scans:
+                print(f"{'':<8} seq scan on {relation}: {rows} rows" + (f", filter {condition}" if condition else ""))
+    conn.close()
+
+    print(f"\n{flagged} sequential scan(s) above {args.threshold} rows")
+    sys.exit(1 if flagged else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# scripts/seed_data.py
+"""Seed a local database with realistic volumes of players and games.
+
+Adds users (with stats), categories, questions (nine in ten confirmed) and
+historical games with all their rounds and answers, one game in ten still
+ongoing. Every name gets a fresh prefix, so seeding can be repeated. Rows
+are committed; only point this at a throwaway local database.
+
+    python scripts/seed_data.py --users 5000 --questions 20000 --games 20000
+
+Used by scripts/index_advisor.py and benchmarks/gameplay_load.py.
+"""
+import argparse
+import os
+import sys
+import uuid
+
+import psycopg2
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from app.config import Config  # noqa: E402
+
+
+def connect():
+    return psycopg2.connect(
+        host=Config.DB_HOST, port=Config.DB_PORT, dbname=Config.DB_NAME,
+        user=Config.DB_USER, password=Config.DB_PASSWORD
+    )
+
+
+def add_seed_arguments(parser):
+    parser.add_argument("--users", type=int, default=2000, help="players to seed")
+    parser.add_argument("--categories", type=int, default=20, help="categories to seed")
+    parser.add_argument("--questions", type=int, default=20000, help="questions to seed")
+    parser.add_argument("--games", type=int, default=10000, help="historical games to seed")
+
+
+def seed(conn, users, categories, questions, games):
+    """Insert a batch of realistic rows under a fresh name prefix"""
+    prefix = "seed_" + uuid.uuid4().hex[:8] + "_"
+    like = prefix + "%"
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO users (user_name, email, password)
+        SELECT %s || i, %s || i || '@example.com', 'x' FROM generate_series(1, %s) i;
+    """, (prefix, prefix, users))
+    cursor.execute("""
+        INSERT INTO user_stats (u_id)
+        SELECT u_id FROM users WHERE user_name LIKE %s
+        ON CONFLICT DO NOTHING;
+    """, (like,))
+    cursor.execute("""
+        INSERT INTO categories (category_name)
+        SELECT %s || i FROM generate_series(1, %s) i;
+    """, (prefix, categories))
+    cursor.execute("""
+        WITH c AS (SELECT array_agg(c_id) AS ids FROM categories WHERE category_name LIKE %s)
+        INSERT INTO questions (q_text, c_id, option_a, option_b, option_c, option_d,
+                               correct_answer, difficulty_level, confirmation_status)
+        SELECT 'Seeded question ' || i, c.ids[1 + (i %% cardinality(c.ids))], 'a', 'b', 'c', 'd',
+               'A', 1 + (i %% 3), random() < 0.9
+        FROM generate_series(1, %s) i, c;
+    """, (like, questions))
+    # Players are paired at random; one game in ten is still ongoing
+    cursor.execute("""
+        WITH u AS (SELECT array_agg(u_id) AS ids FROM users WHERE user_name LIKE %s)
+        INSERT INTO game_sessions (player1, player2, game_status, start_time)
+        SELECT u.ids[1 + p.a], u.ids[1 + (p.a + 1 + p.b) %% cardinality(u.ids)],
+               CASE WHEN random() < 0.1 THEN 'ongoing' ELSE 'ended' END,
+               CURRENT_TIMESTAMP - random() * INTERVAL '90 days'
+        FROM generate_series(1, %s) g, u,
+             LATERAL (SELECT floor(random() * cardinality(u.ids))::INT AS a,
+                             floor(random() * (cardinality(u.ids) - 1))::INT AS b
+                      WHERE g > 0) p;
+    """, (like, games))
+    cursor.execute("""
+        WITH q AS (
+            SELECT array_agg(q.q_id) AS ids, array_agg(q.c_id) AS c_ids
+            FROM questions q JOIN categories c ON c.c_id = q.c_id
+            WHERE c.category_name LIKE %s AND q.confirmation_status = TRUE
+        )
+        INSERT INTO rounds (s_id, q_id, round_number, category_selector, selected_category, questions)
+        SELECT gs.s_id, q.ids[p.i], n, gs.player1, q.c_ids[p.i],
+               jsonb_build_array(jsonb_build_object('q_id', q.ids[p.i]))
+        FROM game_sessions gs
+        JOIN users u ON u.u_id = gs.player1 AND u.user_name LIKE %s
+        CROSS JOIN q
+        CROSS JOIN generate_series(1, 5) n
+        CROSS JOIN LATERAL (SELECT 1 + floor(random() * cardinality(q.ids))::INT AS i
+                            WHERE n > 0) p
+        WHERE gs.game_status = 'ended' OR n <= 3;
+    """, (like, like))
+    # The answer triggers plan their lookups while the tables are still
+    # nearly empty; keep those plans on the indexes or seeding goes quadratic
+    cursor.execute("ANALYZE game_sessions, rounds, round_answers;")
+    cursor.execute("SET enable_seqscan = off;")
+    cursor.execute("""
+        INSERT INTO round_answers (r_id, u_id, answers, score)
+        SELECT r.r_id, player, '[{"is_correct": true}, {"is_correct": false}, {"is_correct": true}]', 2
+        FROM rounds r
+        JOIN game_sessions gs ON gs.s_id = r.s_id
+        JOIN users u ON u.u_id = gs.player1 AND u.user_name LIKE %s
+        CROSS JOIN LATERAL (VALUES (gs.player1), (gs.player2)) AS players(player);
+    """, (like,))
+    cursor.execute("RESET enable_seqscan;")
+    conn.commit()
+    cursor.execute("ANALYZE;")
+    conn.commit()
+    cursor.close()
+    print(f"Seeded {users} users, {questions} questions and {games} games with prefix {prefix}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_seed_arguments(parser)
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        seed(conn, args.users, args.categories, args.questions, args.games)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+# tests/test_cache.py
+import threading
+
+import pytest
+
+from app.utils import cache as cache_module
+from app.utils.cache import Cache, MemoryBackend, SQLiteBackend, cached
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteBackend(str(tmp_path / "cache.sqlite3"))
+    return MemoryBackend()
+
+
+@pytest.fixture
+def cache(backend):
+    return Cache(backend, {"users": (60, 3)})
+
+
+def counting_loader(value):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return value
+    return load, calls
+
+
+def test_keys_carry_the_namespace_version(cache):
+    assert cache._key("users", (1, "a")) == "v0:1:a"
+    cache.invalidate("users")
+    assert cache._key("users", (1, "a")) == "v1:1:a"
+    assert cache._key("questions", (1,)) == "v0:1"
+
+
+def test_get_or_load_caches_results_including_none(cache):
+    load, calls = counting_loader(None)
+    assert cache.get_or_load("users", (1,), load) is None
+    assert cache.get_or_load("users", (1,), load) is None
+    assert len(calls) == 1
+    stats = cache.stats()["users"]
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+
+def test_invalidate_one_key(cache):
+    cache.set("users", "alice", 1)
+    cache.set("users", "bob", 2)
+    cache.invalidate("users", 1)
+    assert cache.get("users", 1) is None
+    assert cache.get("users", 2) == "bob"
+
+
+def test_version_bump_drops_the_whole_namespace(cache):
+    cache.set("users", "alice", 1)
+    cache.set("questions", "q", 1)
+    cache.invalidate("users")
+    assert cache.get("users", 1) is None
+    assert cache.get("questions", 1) == "q"
+    assert cache.backend.size("users") == 0
+
+
+def test_entries_expire_after_their_ttl(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    cache.set("users", "alice", 1)
+    now[0] += 59
+    assert cache.get("users", 1) == "alice"
+    now[0] += 2
+    assert cache.get("users", 1) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: now[0])
+    for key in (1, 2, 3):
+        now[0] += 1
+        cache.set("users", key, key)
+    now[0] += 1
+    cache.get("users", 1)
+    now[0] += 1
+    cache.set("users", 4, 4)
+    assert cache.get("users", 2) is None
+    assert [cache.get("users", key) for key in (1, 3, 4)] == [1, 3, 4]
+    assert cache.backend.size("users") == 3
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    writer = Cache(SQLiteBackend(path))
+    reader = Cache(SQLiteBackend(path))
+    writer.set("users", {"name": "alice"}, 1)
+    assert reader.get("users", 1) == {"name": "alice"}
+    reader.invalidate("users")
+    assert writer.get("users", 1) is None
+
+
+def test_cached_decorator_keys_on_positional_arguments(monkeypatch):
+    monkeypatch.setattr(cache_module, "cache", Cache(MemoryBackend()))
+    calls = []
+
+    @cached("users")
+    def get_user(u_id):
+        calls.append(u_id)
+        return {"u_id": u_id}
+
+    assert get_user(1) == get_user(1) == {"u_id": 1}
+    assert get_user(2) == {"u_id": 2}
+    assert calls == [1, 2]
+
+
+def test_results_are_copies_of_the_cached_entry(cache):
+    rows = [{"c_id": 1, "category_name": "History"}]
+    load, _ = counting_loader(rows)
+    first = cache.get_or_load("users", (1,), load)
+    first[0]["category_name"] = "changed"
+    rows.append({"c_id": 2})
+    cache.get("users", 1).clear()
+    assert cache.get("users", 1) == [{"c_id": 1, "category_name": "History"}]
+
+
+def test_counters_are_exact_under_concurrency(cache):
+    cache.set("users", "alice", 1)
+
+    def work():
+        for _ in range(500):
+            cache.get("users", 1)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["users"]["hits"] == 4000
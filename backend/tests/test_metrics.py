@@ -0,0 +1,85 @@
+# tests/test_metrics.py
+import threading
+
+import pytest
+
+from app.utils.metrics import Registry, _merge
+
+
+@pytest.fixture
+def registry():
+    return Registry()
+
+
+def test_merge_adds_scalars_and_histograms_elementwise():
+    into = {("a", ()): 1, ("h", ("x",)): [1, 0, 0.5]}
+    _merge(into, {("a", ()): 2, ("b", ()): 3, ("h", ("x",)): [0, 2, 1.5]})
+    assert into == {("a", ()): 3, ("b", ()): 3, ("h", ("x",)): [1, 2, 2.0]}
+
+
+def test_merge_copies_new_histograms():
+    counts = [1, 0, 0.1]
+    into = {}
+    _merge(into, {("h", ()): counts})
+    _merge(into, {("h", ()): counts})
+    assert into[("h", ())] == [2, 0, 0.2]
+    assert counts == [1, 0, 0.1]
+
+
+def test_render_counters_and_gauges(registry):
+    requests = registry.counter("requests_total", "Requests", ("method", "status"))
+    registry.gauge("in_flight", "Requests being handled")
+    requests.inc(("GET", "200"), 2)
+    requests.inc(("POST", "500"))
+    requests.inc(("GET", "200"))
+    assert registry.render() == (
+        "# HELP requests_total Requests\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{method="GET",status="200"} 3\n'
+        'requests_total{method="POST",status="500"} 1\n'
+        "# HELP in_flight Requests being handled\n"
+        "# TYPE in_flight gauge\n"
+        "in_flight 0\n"
+    )
+
+
+def test_render_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value, ("/a",))
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_render_escapes_label_values(registry):
+    registry.counter("errors_total", "Errors", ("message",)).inc(('say "hi"\\\n',))
+    assert 'errors_total{message="say \\"hi\\"\\\\\\n"} 1' in registry.render()
+
+
+def test_callbacks_are_read_at_render_time(registry):
+    size = [3]
+    registry.callback("gauge", "pool_size", "Pool size", lambda: {(): size[0]})
+    assert "pool_size 3\n" in registry.render()
+    size[0] = 5
+    assert "pool_size 5\n" in registry.render()
+
+
+def test_shards_of_exited_threads_are_retired(registry):
+    hits = registry.counter("hits_total", "Hits")
+
+    def work():
+        for _ in range(10):
+            hits.inc()
+
+    for _ in range(20):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    hits.inc()
+    assert registry.collect()[("hits_total", ())] == 201
+    assert len(registry._shards) == 1
@@ -0,0 +1,67 @@
+# tests/test_pagination.py
+import pytest
+from flask import Flask
+
+from app.utils.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, page_args, paginated_response
+)
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(PAGE_SIZE_DEFAULT=2, PAGE_SIZE_MAX=5)
+    return app
+
+
+@pytest.mark.parametrize("key", [0, 1, 42, 2**40])
+def test_cursor_round_trip(key):
+    token = encode_cursor(key)
+    assert "=" not in token
+    assert decode_cursor(token) == key
+
+
+@pytest.mark.parametrize("token", ["!!!", "bm90IGpzb24", "é"])
+def test_decode_cursor_rejects_garbage(token):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(token)
+
+
+def test_page_args_defaults_and_cap(app):
+    with app.test_request_context("/"):
+        assert page_args() == (2, None)
+    with app.test_request_context("/?limit=50"):
+        assert page_args() == (5, None)
+    with app.test_request_context(f"/?limit=3&cursor={encode_cursor(7)}"):
+        assert page_args() == (3, 7)
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1"])
+def test_page_args_rejects_bad_limit(app, query):
+    with app.test_request_context("/?" + query):
+        with pytest.raises(InvalidCursorError):
+            page_args()
+
+
+@pytest.mark.parametrize("key", [True, False, "7", 1.5, [7], {"id": 7}])
+def test_page_args_rejects_non_integer_cursor(app, key):
+    with app.test_request_context(f"/?cursor={encode_cursor(key)}"):
+        with pytest.raises(InvalidCursorError):
+            page_args()
+
+
+def test_paginated_response_links_next_page(app):
+    rows = [{"id": 1}, {"id": 2}, {"id": 3}]
+    with app.test_request_context("/items?limit=2&q=x"):
+        response = paginated_response(rows, 2, lambda row: row["id"])
+    assert response.get_json() == rows[:2]
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == 2
+    assert response.headers["Link"].startswith("<http://localhost/items?")
+    assert f"cursor={response.headers['X-Next-Cursor']}" in response.headers["Link"]
+
+
+def test_paginated_response_last_page_has_no_cursor(app):
+    with app.test_request_context("/items"):
+        response = paginated_response([{"id": 1}], 2, lambda row: row["id"])
+    assert "X-Next-Cursor" not in response.headers
+    assert "Link" not in response.headers
@@ -0,0 +1,72 @@
+# tests/test_question_bank.py
+import io
+
+import pytest
+
+from app.services.question_bank import _read_csv, _read_jsonl, _validate
+
+CATEGORIES = ({"history": 1, "science": 2}, {1, 2})
+
+VALID = {
+    "q_text": " Who? ", "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+    "correct_answer": "b", "category_name": "History",
+}
+
+
+def validate(**changes):
+    """_validate VALID with some fields changed; ... removes a field"""
+    record = dict(VALID, **changes)
+    return _validate({k: v for k, v in record.items() if v is not ...}, CATEGORIES)
+
+
+def test_valid_record_is_normalized():
+    row, error = validate()
+    assert error is None
+    assert row == ("Who?", 1, "a", "b", "c", "d", "B", None, "Admin")
+
+
+def test_c_id_takes_precedence_over_category_name():
+    row, error = validate(c_id="2", difficulty_level="3", author="User")
+    assert error is None
+    assert row[1] == 2 and row[7] == 3 and row[8] == "User"
+
+
+@pytest.mark.parametrize("changes, message", [
+    ({"q_text": "  "}, "Missing q_text"),
+    ({"option_a": ..., "option_d": None}, "Missing option_a, option_d"),
+    ({"correct_answer": "E"}, "correct_answer must be A, B, C, or D"),
+    ({"c_id": "x"}, "c_id must be an integer"),
+    ({"c_id": 9}, "Category not found"),
+    ({"category_name": "Sports"}, "Category not found"),
+    ({"category_name": ...}, "Category not found"),
+    ({"difficulty_level": "hard"}, "difficulty_level must be an integer"),
+    ({"author": "Bot"}, "author must be 'Admin' or 'User'"),
+])
+def test_invalid_records_are_rejected(changes, message):
+    assert validate(**changes) == (None, message)
+
+
+def test_malformed_record():
+    assert _validate(None, CATEGORIES) == (None, "Malformed record")
+
+
+def test_csv_records_keep_their_line_numbers():
+    stream = io.BytesIO(
+        "﻿q_text,option_a,option_b,option_c,option_d,correct_answer,category_name\n"
+        "Who?,a,b,c,d,A,science\n"
+        "Why?,a,b,c,d,Z,science\n".encode("utf-8")
+    )
+    results = [(line_no, _validate(record, CATEGORIES)[1]) for line_no, record in _read_csv(stream)]
+    assert results == [(2, None), (3, "correct_answer must be A, B, C, or D")]
+
+
+def test_jsonl_skips_blank_lines_and_flags_bad_json():
+    stream = io.BytesIO(
+        b'{"q_text": "Who?", "option_a": "a", "option_b": "b", "option_c": "c",'
+        b' "option_d": "d", "correct_answer": "d", "c_id": 1}\n'
+        b"\n"
+        b"not json\n"
+        b"[1, 2]\n"
+    )
+    results = [(line_no, _validate(record, CATEGORIES)[1]) for line_no, record in _read_jsonl(stream)]
+    assert results == [(1, None), (3, "Malformed record"), (4, "Malformed record")]
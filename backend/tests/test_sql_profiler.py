@@ -0,0 +1,33 @@
+# tests/test_sql_profiler.py
+import pytest
+
+from app.utils.sql_profiler import statement_shape
+
+
+@pytest.mark.parametrize("query, shape", [
+    ("SELECT * FROM users WHERE u_id = %s;", "SELECT * FROM users WHERE u_id = ?"),
+    ("SELECT * FROM t WHERE x = %(name)s", "SELECT * FROM t WHERE x = ?"),
+    ("SELECT * FROM users WHERE u_id = 42 AND name = 'o''brien'",
+     "SELECT * FROM users WHERE u_id = ? AND name = ?"),
+    ("SELECT score * 1.5 FROM t", "SELECT score * ? FROM t"),
+    ("SELECT col1, t2.id FROM t2", "SELECT col1, t2.id FROM t2"),
+    ("SELECT  *\n    FROM t\n    WHERE x = %s ;", "SELECT * FROM t WHERE x = ?"),
+])
+def test_literals_and_placeholders_collapse(query, shape):
+    assert statement_shape(query) == shape
+
+
+def test_value_lists_of_any_length_share_a_shape():
+    short = statement_shape("SELECT * FROM q WHERE q_id IN (%s, %s)")
+    long = statement_shape("SELECT * FROM q WHERE q_id IN (1, 2, 3, 4, 5)")
+    assert short == long == "SELECT * FROM q WHERE q_id IN (?, ...)"
+
+
+def test_multi_row_inserts_share_a_shape():
+    two = statement_shape("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s)")
+    three = statement_shape(b"INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z')")
+    assert two == three == "INSERT INTO t (a, b) VALUES (?, ...), ..."
+
+
+def test_bytes_and_text_queries_match():
+    assert statement_shape(b"SELECT 1 FROM t WHERE id = 7") == statement_shape("SELECT 1 FROM t WHERE id = %s")
@@ -0,0 +1,9 @@
+# backend/wsgi.py
+# The Flask app, for WSGI servers; production serves it through asgi.py
+import os
+import runpy
+
+# app.py shares its name with the app package, so load it by path
+_entry = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"))
+
+app = _entry["create_app"]()
@@ -16,9 +16,11 @@ const GameSessionPage = () => {
   const [error, setError] = useState('');
   const navigate = useNavigate();
 
-  const fetchGameData = useCallback(async () => {
+  const fetchGameData = useCallback(async (silent = false) => {
     try {
-      setLoading(true);
+      if (!silent) {
+        setLoading(true);
+      }
       
       const gameData = await gameService.getGameSession(sessionId);
       setGameInfo(gameData);
@@ -55,6 +57,14 @@ const GameSessionPage = () => {
     fetchGameData();
   }, [sessionId, navigate, fetchGameData]);
 
+  // Refresh quietly whenever the server reports progress in this game
+  useEffect(() => {
+    const unsubscribe = gameService.subscribeToGameEvents(sessionId, () => {
+      fetchGameData(true);
+    });
+    return unsubscribe;
+  }, [sessionId, fetchGameData]);
+
   if (loading) {
     return (
       <div className="game-session-loading">
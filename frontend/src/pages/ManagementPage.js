@@ -15,6 +15,7 @@ const ManagementPage = () => {
   const [activeTab, setActiveTab] = useState('questions');
   const [categories, setCategories] = useState([]);
   const [pendingQuestions, setPendingQuestions] = useState([]);
+  const [pendingCursor, setPendingCursor] = useState(null);
   const [newCategory, setNewCategory] = useState('');
   const [newQuestion, setNewQuestion] = useState({
     q_text: '',
@@ -70,9 +71,10 @@ const ManagementPage = () => {
       // Load pending questions if user is admin (use the passed userData)
       if (userData?.is_admin) {
         console.log('User is admin, loading pending questions...'); // Debug log
-        const pendingData = await questionService.getPendingQuestions();
-        console.log('Pending questions loaded:', pendingData); // Debug log
-        setPendingQuestions(pendingData);
+        const pendingPage = await questionService.getPendingQuestionsPage();
+        console.log('Pending questions loaded:', pendingPage.questions); // Debug log
+        setPendingQuestions(pendingPage.questions);
+        setPendingCursor(pendingPage.nextCursor);
       } else {
         console.log('User is not admin, skipping pending questions'); // Debug log
       }
@@ -142,6 +144,21 @@ const ManagementPage = () => {
     }
   };
 
+  const handleLoadMorePending = async () => {
+    if (!pendingCursor) return;
+
+    try {
+      setLoading(true);
+      const pendingPage = await questionService.getPendingQuestionsPage(pendingCursor);
+      setPendingQuestions(prev => [...prev, ...pendingPage.questions]);
+      setPendingCursor(pendingPage.nextCursor);
+    } catch (error) {
+      setError('خطا در بارگیری اطلاعات');
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const handleQuestionChange = (field, value) => {
     setNewQuestion(prev => ({
       ...prev,
@@ -426,6 +443,15 @@ const ManagementPage = () => {
                       </div>
                     </div>
                   ))}
+                  {pendingCursor && (
+                    <button
+                      className="submit-btn"
+                      onClick={handleLoadMorePending}
+                      disabled={loading}
+                    >
+                      <FaList /> سوالات بیشتر
+                    </button>
+                  )}
                 </div>
               )}
             </div>
@@ -50,6 +50,21 @@ const QuizExistingPage = () => {
     return () => clearTimeout(timer);
   }, [timeLeft, isTimerRunning, quizPhase]);
 
+  // Follow the game's event stream until the round is loaded: retry when the
+  // opponent submits one, and leave if the game ends meanwhile
+  useEffect(() => {
+    if (quizPhase !== 'loading' || !currentUser) return undefined;
+    const unsubscribe = gameService.subscribeToGameEvents(sessionId, (type, data) => {
+      if (type === 'game_ended') {
+        navigate(`/game/${sessionId}`);
+      } else if (type === 'player_submitted' && data.user_id !== currentUser.user_id) {
+        setError('');
+        loadExistingRound();
+      }
+    });
+    return unsubscribe;
+  }, [sessionId, quizPhase, currentUser, navigate]);
+
   const loadExistingRound = async () => {
     try {
       setLoading(true);
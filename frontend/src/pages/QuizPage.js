@@ -54,6 +54,20 @@ const QuizPage = () => {
     return () => clearTimeout(timer);
   }, [timeLeft, isTimerRunning, quizPhase]);
 
+  // While choosing a category, follow the opponent over the game's event
+  // stream: once they submit a round, answer it here instead
+  useEffect(() => {
+    if (quizPhase !== 'category-selection' || !currentUser) return undefined;
+    const unsubscribe = gameService.subscribeToGameEvents(sessionId, (type, data) => {
+      if (type === 'game_ended') {
+        navigate(`/game/${sessionId}`);
+      } else if (type === 'player_submitted' && data.user_id !== currentUser.user_id) {
+        initializeQuiz();
+      }
+    });
+    return unsubscribe;
+  }, [sessionId, quizPhase, currentUser, navigate]);
+
   const initializeQuiz = async () => {
     try {
       setLoading(true);
@@ -10,6 +10,11 @@ const authService = {
       password
     });
     
+    // The login response already carries the admin flag from the token claims
+    if (typeof response.data.is_admin === 'boolean') {
+      return response.data;
+    }
+    
     // Check if user is admin
     try {
       const adminCheck = await axios.get(`${API_BASE_URL}/users/${response.data.user_id}/admin-status`);
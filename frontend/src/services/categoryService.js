@@ -48,29 +48,16 @@ const getPopularCategories = async () => {
 // Get categories with question counts
 const getAllCategoriesWithCounts = async () => {
   try {
-    const categories = await getAllCategories();
+    // One request returns the counts for every category
+    const response = await axios.get(`${API_BASE_URL}/questions/counts`, {
+      headers: getAuthHeaders()
+    });
     
-    // Get question count for each category
-    const categoriesWithCounts = await Promise.all(
-      categories.map(async (category) => {
-        try {
-          const countResponse = await axios.get(`${API_BASE_URL}/questions/category/${category.c_id}/count`, {
-            headers: getAuthHeaders()
-          });
-          return {
-            ...category,
-            question_count: countResponse.data.confirmed_question_count
-          };
-        } catch (err) {
-          return {
-            ...category,
-            question_count: 0
-          };
-        }
-      })
-    );
-    
-    return categoriesWithCounts;
+    return response.data.map((category) => ({
+      c_id: category.c_id,
+      category_name: category.category_name,
+      question_count: category.confirmed_question_count
+    }));
   } catch (error) {
     console.error('Error fetching categories with counts:', error);
     throw error;
@@ -108,6 +108,24 @@ const gameService = {
     return response.data;
   },
 
+  // Server-sent game events replace polling for the opponent's progress.
+  // Returns a function that closes the stream.
+  subscribeToGameEvents: (sessionId, onEvent) => {
+    const source = new EventSource(`${API_BASE_URL}/games/${sessionId}/events`);
+    const eventTypes = ['round_started', 'player_submitted', 'round_complete', 'game_ended'];
+    
+    eventTypes.forEach((type) => {
+      source.addEventListener(type, (event) => {
+        onEvent(type, JSON.parse(event.data));
+        if (type === 'game_ended') {
+          source.close();
+        }
+      });
+    });
+    
+    return () => source.close();
+  },
+
   getGameStats: async (sessionId) => {
     const response = await axios.get(`${API_BASE_URL}/games/${sessionId}/stats`, {
       headers: getAuthHeaders()
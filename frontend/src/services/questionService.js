@@ -27,6 +27,16 @@ const questionService = {
     return response.data;
   },
 
+  // One page of pending questions; pass the returned nextCursor to get the next page
+  getPendingQuestionsPage: async (cursor = null, limit = 100) => {
+    const params = cursor ? { limit, cursor } : { limit };
+    const response = await axios.get(`${API_BASE_URL}/questions/pending`, { params });
+    return {
+      questions: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null
+    };
+  },
+
   confirmQuestion: async (questionId, status) => {
     const response = await axios.put(`${API_BASE_URL}/questions/${questionId}/confirm`, {
       status: status